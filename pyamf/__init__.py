@@ -24,7 +24,9 @@ __all__ = [
     'register_class_loader',
     'get_adapter',
     'encode',
+    'encode_many',
     'decode',
+    'decode_file',
     '__version__',
     'version'
 ]
@@ -38,6 +40,13 @@ __version__ = version = _version.version
 #: @see: L{register_class}, L{unregister_class}, and L{register_package}
 CLASS_CACHE = {}
 
+#: Serialised AMF3 class traits (the class name and sealed attribute names) of
+#: each class, shared by all encoders. Cleared whenever the registered aliases
+#: change.
+#: @see: L{amf3.Encoder.writeObject<pyamf.amf3.Encoder.writeObject>}
+#: @since: 0.8.9
+TRAITS_CACHE = {}
+
 #: Class loaders. An iterable of callables that are handed a string alias and
 #: return a class object or C{None} it not handled.
 #: @see: L{register_class_loader} and L{unregister_class_loader}
@@ -47,6 +56,19 @@ CLASS_LOADERS = set()
 #: @see: L{get_type}, L{add_type}, and L{remove_type}
 TYPE_MAP = {}
 
+#: The encoder method for each Python type, resolved once per process and
+#: shared by all encoders. Keyed by C{(dispatch key, type)} (see
+#: L{codec.Encoder.getDispatchKey<pyamf.codec.Encoder.getDispatchKey>}).
+#: Cleared whenever L{TYPE_MAP} or the registered aliases change.
+#: @since: 0.8.9
+TYPE_FUNC_CACHE = {}
+
+#: Bumped whenever L{TYPE_FUNC_CACHE} is cleared, so that long lived encoders
+#: (e.g. those held by a L{codec.CodecPool<pyamf.codec.CodecPool>}) know to
+#: discard the type functions they resolved.
+#: @since: 0.8.9
+TYPE_GENERATION = 0
+
 #: Maps error classes to string codes.
 #: @see: L{add_error_class} and L{remove_error_class}
 ERROR_CLASS_MAP = {
@@ -65,6 +87,10 @@ ALIAS_TYPES = {}
 #: A list of callbacks to execute once a decode has been successful.
 POST_DECODE_PROCESSORS = []
 
+#: Process wide codec pools, keyed on C{(encoding, use_ext)}.
+#: @see: L{codec_pool}
+CODEC_POOLS = {}
+
 #: Specifies that objects are serialized using AMF for ActionScript 1.0
 #: and 2.0 that were introduced in the Adobe Flash Player 6.
 AMF0 = 0
@@ -137,6 +163,9 @@ class ASObject(dict):
     I supply a C{dict} interface to support C{getattr}/C{setattr} calls.
     """
 
+    # attributes are stored as items, an instance dict would never be used
+    __slots__ = ()
+
     class __amf__:
         dynamic = True
 
@@ -161,6 +190,80 @@ class MixedArray(dict):
     Used to be able to specify the C{mixedarray} type.
     """
 
+    __slots__ = ()
+
+
+class RawAMF(object):
+    """
+    An element that has already been encoded. Encoders copy it to the stream
+    as is, so a large value that rarely changes does not have to be encoded
+    each time it is sent::
+
+        categories = pyamf.RawAMF(pyamf.encode(get_categories()).getvalue())
+
+    The element must be self contained, i.e. encoded with a context of its
+    own as L{encode} does. The strings, objects and class definitions it adds
+    to the reference tables of a decoder are accounted for by the encoder, so
+    the references written after it remain correct. Any references within
+    the element are to its own contents, so such an element can only be
+    written where the reference tables are empty, e.g. as a whole remoting
+    body or by L{encode}. An element without references can be written
+    anywhere.
+
+    AMF3 elements can be written to AMF0 and AMF3 streams, AMF0 elements only
+    to AMF0 streams.
+
+    @ivar data: The encoded element.
+    @type data: C{bytes}
+    @ivar encoding: The encoding of L{data}.
+    @ivar references: The number of references within the element.
+    @ivar amf0_objects: The number of AMF0 objects in the element.
+    @ivar amf3_objects: The number of AMF3 objects in the element.
+    @ivar amf3_strings: The AMF3 strings the element adds to the string
+        table.
+    @type amf3_strings: C{list} of C{bytes}
+    @ivar amf3_classes: The number of AMF3 class definitions in the element.
+    @raise DecodeError: C{data} is not a single valid element.
+    @since: 0.8.9
+    """
+
+    def __init__(self, data, encoding=AMF3):
+        from pyamf import scan
+
+        data = bytes(data)
+        scanner = scan.Scanner(memoryview(data))
+
+        scanner.readElement(encoding)
+
+        if scanner.pos != len(data):
+            raise DecodeError('%d bytes found after the element' % (
+                len(data) - scanner.pos,
+            ))
+
+        self.data = data
+        self.encoding = encoding
+        self.references = scanner.stats.references
+        self.amf0_objects = scanner.amf0_objects
+        self.amf3_objects = scanner.amf3_objects
+        self.amf3_strings = [bytes(b) for b in scanner.amf3_strings]
+        self.amf3_classes = len(scanner.amf3_traits)
+
+    def __repr__(self):
+        return '<%s encoding=%r %d bytes>' % (
+            self.__class__.__name__, self.encoding, len(self.data)
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, RawAMF):
+            return False
+
+        return self.data == other.data and self.encoding == other.encoding
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
 
 class TypedObject(dict):
     """
@@ -178,6 +281,8 @@ class TypedObject(dict):
     @raise EncodeError: Unable to encode an externalised stream.
     """
 
+    __slots__ = ('alias',)
+
     def __init__(self, alias):
         dict.__init__(self)
 
@@ -244,6 +349,19 @@ class ErrorAlias(ClassAlias):
         return attrs
 
 
+def _clear_type_caches():
+    """
+    Discards the resolved type functions and class traits shared by all
+    encoders. Called whenever L{TYPE_MAP} or the registered aliases change.
+    """
+    global TYPE_GENERATION
+
+    TRAITS_CACHE.clear()
+    TYPE_FUNC_CACHE.clear()
+
+    TYPE_GENERATION += 1
+
+
 def register_class(klass, alias=None):
     """
     Registers a class to be used in the data streaming. This is the equivalent
@@ -268,6 +386,7 @@ def register_class(klass, alias=None):
         CLASS_CACHE[x.alias] = x
 
     CLASS_CACHE[klass] = x
+    _clear_type_caches()
 
     return x
 
@@ -287,6 +406,7 @@ def unregister_class(alias):
         del CLASS_CACHE[x.alias]
 
     del CLASS_CACHE[x.klass]
+    _clear_type_caches()
 
     return x
 
@@ -434,18 +554,37 @@ def decode(stream, *args, **kwargs):
     """
     A generator function to decode a datastream.
 
-    @param stream: AMF data to be decoded.
+    @param stream: AMF data to be decoded. C{bytes} like objects are read in
+        place, see L{util.get_read_stream}.
     @type stream: byte data
     @kwarg encoding: AMF encoding type. One of L{ENCODING_TYPES}.
     @type encoding: C{int}
     @return: A generator that will decode each element in the stream.
     """
     encoding = kwargs.pop('encoding', DEFAULT_ENCODING)
-    decoder = get_decoder(encoding, stream, *args, **kwargs)
+    decoder = get_decoder(encoding, util.get_read_stream(stream), *args,
+                          **kwargs)
 
     return decoder
 
 
+def decode_file(name_or_file, *args, **kwargs):
+    """
+    A generator function to decode the contents of a file. The file is memory
+    mapped and decoded in place rather than being read into memory.
+
+    @param name_or_file: Name of file, or file-object.
+    @kwarg encoding: AMF encoding type. One of L{ENCODING_TYPES}.
+    @type encoding: C{int}
+    @return: A generator that will decode each element in the file.
+    @see: L{util.mmap_stream}
+    @since: 0.8.9
+    """
+    with util.mmap_stream(name_or_file) as stream:
+        for element in decode(stream, *args, **kwargs):
+            yield element
+
+
 def encode(*args, **kwargs):
     """
     A helper function to encode an element.
@@ -466,6 +605,57 @@ def encode(*args, **kwargs):
     return stream
 
 
+def encode_many(iterable, encoding=None, reset_context_per_item=True,
+                as_buffer=False, **kwargs):
+    """
+    Encodes each element of C{iterable} as a separate message.
+
+    One encoder is used for the whole batch, so the stream and the type
+    lookups are reused between elements and everything is written to a
+    single buffer.
+
+    @param iterable: The Python data to be encoded.
+    @param encoding: AMF encoding type. One of L{ENCODING_TYPES}, defaults to
+        L{DEFAULT_ENCODING}.
+    @param reset_context_per_item: Clear the reference tables after each
+        element so that each one can be decoded on its own. If C{False}, later
+        elements may refer to objects, strings and class definitions in
+        earlier ones and the results must be decoded in order with a single
+        decoder.
+    @type reset_context_per_item: C{bool}
+    @param as_buffer: Return the single buffer and an offset index instead of
+        a list.
+    @type as_buffer: C{bool}
+    @return: A C{list} of C{bytes}, one for each element. If C{as_buffer} is
+        set, a C{tuple} of the encoded C{bytes} and a C{list} of offsets
+        where element C{i} is C{buf[offsets[i]:offsets[i + 1]]}.
+    @since: 0.8.9
+    """
+    if encoding is None:
+        encoding = DEFAULT_ENCODING
+
+    encoder = get_encoder(encoding, **kwargs)
+    stream = encoder.stream
+    context = encoder.context
+    write = encoder.writeElement
+
+    offsets = [0]
+
+    for element in iterable:
+        write(element)
+        offsets.append(stream.tell())
+
+        if reset_context_per_item:
+            context.clear()
+
+    buf = stream.getvalue()
+
+    if as_buffer:
+        return buf, offsets
+
+    return [buf[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
 def _get_amf_module(version, use_ext=None):
     """
     Returns a module for a specific version of AMF.
@@ -545,6 +735,36 @@ def get_encoder(encoding, *args, **kwargs):
     return _get_encoder_class()(*args, **kwargs)
 
 
+def codec_pool(encoding=DEFAULT_ENCODING, use_ext=None):
+    """
+    Returns the process wide L{codec.CodecPool} for C{encoding}. Pooled
+    encoders/decoders are reset when released but keep their type function
+    caches, which avoids the setup cost of L{get_encoder}/L{get_decoder} in
+    busy gateways.
+
+    @param encoding: AMF encoding type. One of L{ENCODING_TYPES}.
+    @type encoding: C{int}
+    @raise ValueError: Unknown C{encoding}.
+    @since: 0.8.9
+    """
+    from pyamf import codec
+
+    if encoding not in ENCODING_TYPES:
+        raise ValueError("Unknown encoding %r" % (encoding,))
+
+    key = (encoding, use_ext)
+
+    try:
+        return CODEC_POOLS[key]
+    except KeyError:
+        pass
+
+    return CODEC_POOLS.setdefault(
+        key,
+        codec.CodecPool(encoding, use_ext=use_ext)
+    )
+
+
 def blaze_loader(alias):
     """
     Loader for BlazeDS framework compatibility classes, specifically
@@ -620,6 +840,7 @@ def add_type(type_, func=None):
         _check_type(type_)
 
     TYPE_MAP[type_] = func
+    _clear_type_caches()
 
 
 def get_type(type_):
@@ -649,6 +870,7 @@ def remove_type(type_):
     declaration = get_type(type_)
 
     del TYPE_MAP[type_]
+    _clear_type_caches()
 
     return declaration
 
@@ -799,6 +1021,8 @@ def register_alias_type(klass, *args):
             CLASS_CACHE[k] = alias_klass
             CLASS_CACHE[v.klass] = alias_klass
 
+    _clear_type_caches()
+
 
 def unregister_alias_type(klass):
     """
@@ -806,6 +1030,8 @@ def unregister_alias_type(klass):
 
     @see: L{register_alias_type}
     """
+    _clear_type_caches()
+
     return ALIAS_TYPES.pop(klass, None)
 
 
@@ -4,8 +4,10 @@
 """
 U{array<http://docs.python.org/library/array.html>} adapter module.
 
-Will convert all array.array instances to a python list before encoding. All
-type information is lost (but degrades nicely).
+AMF3 encodes array.array instances of numbers as vectors (C{Vector.<int>},
+C{Vector.<uint>} or C{Vector.<Number>}), which decode back to an array.array.
+Anything else is converted to a python list before encoding. All type
+information is lost (but degrades nicely).
 
 @since: 0.5
 """
@@ -17,4 +19,4 @@ from pyamf.adapters import util
 
 
 if hasattr(array, 'ArrayType'):
-    pyamf.add_type(array.ArrayType, util.to_list)
+    pyamf.add_type(array.ArrayType, util.to_vector)
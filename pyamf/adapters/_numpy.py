@@ -0,0 +1,21 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+U{NumPy<http://www.numpy.org>} adapter module.
+
+AMF3 encodes one dimensional arrays of numbers as vectors (C{Vector.<int>},
+C{Vector.<uint>} or C{Vector.<Number>}). Pass C{use_numpy=True} to the AMF3
+decoder to get them back as NumPy arrays. Anything else is converted to a
+(nested) python list.
+
+@since: 0.8.9
+"""
+
+import numpy
+
+import pyamf
+from pyamf.adapters import util
+
+
+pyamf.add_type(numpy.ndarray, util.to_vector)
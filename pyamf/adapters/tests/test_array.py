@@ -42,4 +42,24 @@ class ArrayTestCase(unittest.TestCase):
         self.assertEqual(self.encdec(pyamf.AMF0), self.orig)
 
     def test_amf3(self):
-        self.assertEqual(self.encdec(pyamf.AMF3), self.orig)
+        self.assertEqual(self.encdec(pyamf.AMF3), array.array('i', self.orig))
+
+    def test_amf3_uint(self):
+        self.obj = array.array('L', [0, 0xffffffff])
+
+        self.assertEqual(self.encdec(pyamf.AMF3), array.array('I', self.obj))
+
+    def test_amf3_double(self):
+        self.obj = array.array('f', [0.5, -1.25])
+
+        self.assertEqual(self.encdec(pyamf.AMF3), array.array('d', self.obj))
+
+    def test_amf3_overflow(self):
+        self.obj = array.array('q', [0, 0x80000000])
+
+        self.assertEqual(self.encdec(pyamf.AMF3), [0, 0x80000000])
+
+    def test_amf3_unicode(self):
+        self.obj = array.array('u', u'foo')
+
+        self.assertEqual(self.encdec(pyamf.AMF3), [u'f', u'o', u'o'])
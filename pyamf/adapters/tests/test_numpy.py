@@ -0,0 +1,79 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Tests for the L{pyamf.adapters._numpy} module.
+
+@since: 0.8.9
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import unittest
+
+import pyamf
+from pyamf import amf3
+
+
+class NumPyTestCase(unittest.TestCase):
+    """
+    """
+
+    def setUp(self):
+        if not numpy:
+            self.skipTest("'numpy' not available")
+
+    def encode(self, obj, encoding=pyamf.AMF3):
+        return pyamf.encode(obj, encoding=encoding).getvalue()
+
+    def decode(self, data, **kwargs):
+        return amf3.Decoder(data, **kwargs).readElement()
+
+    def test_int(self):
+        obj = numpy.array([1, -1], dtype='int16')
+        data = self.encode(obj)
+
+        self.assertEqual(
+            data,
+            b'\x0d\x05\x00\x00\x00\x00\x01\xff\xff\xff\xff'
+        )
+
+        result = self.decode(data, use_numpy=True)
+
+        self.assertEqual(result.dtype, numpy.dtype('i4'))
+        self.assertEqual(result.tolist(), [1, -1])
+
+    def test_uint(self):
+        obj = numpy.array([1, 0xffffffff], dtype='uint64')
+
+        self.assertEqual(
+            self.decode(self.encode(obj)).tolist(), [1, 0xffffffff]
+        )
+
+    def test_double(self):
+        obj = numpy.array([0.5, -1.25])
+        result = self.decode(self.encode(obj), use_numpy=True)
+
+        self.assertEqual(result.dtype, numpy.dtype('f8'))
+        self.assertEqual(result.tolist(), [0.5, -1.25])
+
+    def test_overflow(self):
+        obj = numpy.array([0, 0x80000000], dtype='int64')
+
+        self.assertEqual(self.decode(self.encode(obj)), [0, 0x80000000])
+
+    def test_2d(self):
+        obj = numpy.array([[1, 2], [3, 4]])
+
+        self.assertEqual(self.decode(self.encode(obj)), [[1, 2], [3, 4]])
+
+    def test_amf0(self):
+        obj = numpy.array([1, 2])
+        data = self.encode(obj, encoding=pyamf.AMF0)
+
+        self.assertEqual(
+            next(pyamf.decode(data, encoding=pyamf.AMF0)), [1, 2]
+        )
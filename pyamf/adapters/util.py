@@ -15,6 +15,21 @@ def to_list(obj, encoder):
     return list(obj)
 
 
+def to_vector(obj, encoder):
+    """
+    Writes an array of numbers C{obj} as an AMF3 vector if the encoder
+    supports it, otherwise converts it to a C{list}.
+
+    @since: 0.8.9
+    """
+    write = getattr(encoder, 'writeVector', None)
+
+    if write is None:
+        return obj.tolist()
+
+    write(obj)
+
+
 def to_dict(obj, encoder):
     """
     Converts an arbitrary object C{obj} to a C{dict}.
@@ -8,11 +8,27 @@ Class alias base functionality.
 """
 
 import inspect
+import operator
 
 import pyamf
 from pyamf import python, util
 
 
+#: Attributes of L{ClassAlias} that the compiled plans are built from.
+#: Assigning to any of them discards the plans.
+PLAN_ATTRS = frozenset([
+    'static_attrs', 'exclude_attrs', 'readonly_attrs', 'proxy_attrs',
+    'synonym_attrs', 'dynamic', 'external', 'sealed', 'encodable_properties',
+    'decodable_properties', 'non_static_encodable_properties',
+    'shortcut_encode', 'shortcut_decode', 'is_dict', 'getAttribute',
+    'getEncodableAttributes', 'getDecodableAttributes', 'applyAttributes',
+])
+
+#: The most decode plans kept per alias, one is needed for each distinct set
+#: of sealed properties seen in the stream.
+MAX_DECODE_PLANS = 64
+
+
 class UnknownClassAlias(Exception):
     """
     Raised if the AMF stream specifies an Actionscript class that does not
@@ -22,12 +38,176 @@ class UnknownClassAlias(Exception):
     """
 
 
+def _get_values(attrs):
+    """
+    Returns a callable that returns a C{tuple} of the values of C{attrs} on
+    an object.
+    """
+    if not attrs:
+        return lambda obj: ()
+
+    if len(attrs) == 1:
+        getter = operator.attrgetter(attrs[0])
+
+        return lambda obj: (getter(obj),)
+
+    return operator.attrgetter(*attrs)
+
+
+class EncodePlan(object):
+    """
+    A precompiled recipe for getting the attributes to encode from instances
+    of an aliased class, see L{ClassAlias.getEncodePlan}. The attributes are
+    the same as those returned by L{ClassAlias.getEncodableAttributes}, but
+    are read without building an intermediate C{dict} or any sets.
+
+    @ivar static_attrs: The static attribute names, in encoding order.
+    @type static_attrs: C{tuple}
+    @ivar static_names: The utf-8 encoded L{static_attrs}.
+    @type static_names: C{tuple}
+    @since: 0.8.9
+    """
+
+    def __init__(self, alias):
+        self.static_attrs = tuple(alias.static_attrs or ())
+        self.static_names = tuple([
+            a.encode('utf-8') if isinstance(a, str) else a
+            for a in self.static_attrs
+        ])
+        self._static_values = _get_values(self.static_attrs)
+
+        self.dynamic = alias.dynamic
+        self.use_dict = bool(alias.shortcut_encode and alias.dynamic)
+
+        # attributes that are encoded dynamically even if they are not found
+        # in the instance dict (properties, slots etc.)
+        self.fixed_attrs = ()
+        self.skip_attrs = frozenset(
+            list(self.static_attrs) + list(alias.exclude_attrs or []))
+
+        if not self.dynamic:
+            self.fixed_attrs = tuple(sorted(
+                alias.non_static_encodable_properties or ()))
+        elif alias.encodable_properties:
+            self.fixed_attrs = tuple([
+                a for a in alias.encodable_properties
+                if a not in self.skip_attrs
+            ])
+
+        self._fixed_values = _get_values(self.fixed_attrs)
+
+    def getStaticValues(self, obj):
+        """
+        Returns a C{tuple} of the static attribute values of C{obj}, in the
+        same order as L{static_attrs}. Missing attributes are returned as
+        L{pyamf.Undefined}.
+        """
+        try:
+            return self._static_values(obj)
+        except AttributeError:
+            return tuple([
+                getattr(obj, attr, pyamf.Undefined)
+                for attr in self.static_attrs
+            ])
+
+    def getDynamicItems(self, obj):
+        """
+        Returns an iterable of C{(name, value)} pairs for the non static
+        attributes of C{obj}.
+        """
+        if not self.dynamic:
+            return zip(self.fixed_attrs, self._fixed_values(obj))
+
+        if self.use_dict:
+            return list(obj.__dict__.items())
+
+        props = util.get_properties(obj)
+        skip = self.skip_attrs
+
+        items = [(attr, getattr(obj, attr)) for attr in props
+                 if attr not in skip]
+
+        if self.fixed_attrs:
+            items.extend([
+                (attr, getattr(obj, attr)) for attr in self.fixed_attrs
+                if attr not in props
+            ])
+
+        return items
+
+
+class DecodePlan(object):
+    """
+    A precompiled recipe for applying the sealed attributes of a decoded
+    object, see L{ClassAlias.getDecodePlan}. Each incoming property is mapped
+    straight to the attribute it is set as, or dropped, giving the same
+    result as L{ClassAlias.applyAttributes}.
+
+    @ivar names: The incoming property names.
+    @type names: C{tuple}
+    @ivar slots: C{(index, attr)} pairs of the properties that are kept and
+        the attribute each one is set as.
+    @type slots: C{tuple}
+    @since: 0.8.9
+    """
+
+    def __init__(self, alias, names, attrs):
+        """
+        @param attrs: Maps each attribute to set to the index of the
+            property it is read from.
+        """
+        self.names = tuple(names)
+        self.slots = tuple(sorted([(i, attr) for attr, i in attrs.items()]))
+        self.proxied = frozenset()
+
+        if not alias.shortcut_decode and alias.proxy_attrs:
+            # applyAttributes only unproxies when it does not take the
+            # shortcut
+            self.proxied = frozenset([
+                i for i, name in enumerate(self.names)
+                if name in alias.proxy_attrs
+            ])
+
+        # mirror the way applyAttributes/util.set_attrs set attributes
+        self.use_dict = bool(
+            alias.shortcut_decode and not alias.is_dict and not alias.sealed)
+        self.use_setitem = hasattr(alias.klass, '__setitem__')
+
+    def apply(self, obj, values, codec=None):
+        """
+        Applies C{values}, read in the order of L{names}, to C{obj}.
+        """
+        if self.proxied and codec:
+            context = codec.context
+            values = list(values)
+
+            for i in self.proxied:
+                values[i] = context.getObjectForProxy(values[i])
+
+        if self.use_dict:
+            d = obj.__dict__
+
+            for i, attr in self.slots:
+                d[attr] = values[i]
+        elif self.use_setitem:
+            setitem = type(obj).__setitem__
+
+            for i, attr in self.slots:
+                setitem(obj, attr, values[i])
+        else:
+            for i, attr in self.slots:
+                setattr(obj, attr, values[i])
+
+
 class ClassAlias(object):
     """
     Class alias. Provides class/instance meta data to the En/Decoder to allow
     fine grain control and some performance increases.
     """
 
+    _encode_plan = None
+    _decode_plans = None
+
     def __init__(self, klass, alias=None, **kwargs):
         if not isinstance(klass, python.class_types):
             raise TypeError('klass must be a class type, got %r' % type(klass))
@@ -69,6 +249,13 @@ class ClassAlias(object):
         if kwargs:
             raise TypeError('Unexpected keyword arguments %r' % (kwargs,))
 
+    def __setattr__(self, name, value):
+        if name in PLAN_ATTRS:
+            self.__dict__['_encode_plan'] = None
+            self.__dict__['_decode_plans'] = None
+
+        object.__setattr__(self, name, value)
+
     def _checkExternal(self):
         k = self.klass
 
@@ -119,7 +306,9 @@ class ClassAlias(object):
             # this class is external so no more compiling is necessary
             return
 
-        if hasattr(self.klass, '__slots__'):
+        # the attributes of a dict are its items, slots hold other state
+        if hasattr(self.klass, '__slots__') and \
+                not issubclass(self.klass, dict):
             self.decodable_properties.update(self.klass.__slots__)
             self.encodable_properties.update(self.klass.__slots__)
 
@@ -298,6 +487,8 @@ class ClassAlias(object):
         if issubclass(self.klass, dict) or self.klass is dict:
             self.is_dict = True
 
+        self._encode_plan = None
+        self._decode_plans = None
         self._compiled = True
 
     def is_compiled(self):
@@ -456,6 +647,108 @@ class ClassAlias(object):
 
         return attrs
 
+    def getEncodePlan(self):
+        """
+        Returns an L{EncodePlan} for instances of the aliased class, or
+        C{None} if the attributes must be fetched with
+        L{getEncodableAttributes}. That is the case for external classes,
+        C{dict} subclasses, aliases with proxied or synonym attributes and
+        subclasses that override L{getEncodableAttributes} or
+        L{getAttribute}.
+
+        The plan is built once and discarded if the alias is changed.
+
+        @since: 0.8.9
+        """
+        plan = self._encode_plan
+
+        if plan is None:
+            if not self._compiled:
+                self.compile()
+
+            plan = False
+
+            if self._canPlanEncode():
+                plan = EncodePlan(self)
+
+            self.__dict__['_encode_plan'] = plan
+
+        return plan or None
+
+    def _canPlanEncode(self):
+        if self.external or self.is_dict:
+            return False
+
+        if self.proxy_attrs is not None or self.synonym_attrs:
+            return False
+
+        for name in ('getEncodableAttributes', 'getAttribute'):
+            if name in self.__dict__:
+                return False
+
+            if getattr(type(self), name) is not getattr(ClassAlias, name):
+                return False
+
+        return True
+
+    def getDecodePlan(self, properties):
+        """
+        Returns a L{DecodePlan} for objects of the aliased class whose sealed
+        properties are C{properties} (as read from the stream), or C{None} if
+        the attributes must be applied with L{applyAttributes}.
+
+        Plans are not available for external classes, subclasses that
+        override L{getDecodableAttributes} or L{applyAttributes} and when
+        C{properties} does not include all of the static attributes.
+
+        @param properties: The property names, C{str} or C{bytes}.
+        @since: 0.8.9
+        """
+        if not self._compiled:
+            self.compile()
+
+        plans = self._decode_plans
+
+        if plans is None:
+            plans = self.__dict__['_decode_plans'] = {}
+
+        key = tuple(properties)
+        plan = plans.get(key, None)
+
+        if plan is None:
+            plan = self._buildDecodePlan(key) or False
+
+            if len(plans) < MAX_DECODE_PLANS:
+                plans[key] = plan
+
+        return plan or None
+
+    def _buildDecodePlan(self, properties):
+        if self.external:
+            return
+
+        for name in ('getDecodableAttributes', 'applyAttributes'):
+            if name in self.__dict__:
+                return
+
+            if getattr(type(self), name) is not getattr(ClassAlias, name):
+                return
+
+        names = [
+            p.decode('utf-8') if isinstance(p, bytes) else p
+            for p in properties
+        ]
+        attrs = dict([(name, i) for i, name in enumerate(names)])
+
+        if not self.shortcut_decode:
+            try:
+                # filter the property indexes in place of their values
+                attrs = self.getDecodableAttributes(None, attrs)
+            except AttributeError:
+                return
+
+        return DecodePlan(self, names, attrs)
+
     def getDecodableAttributes(self, obj, attrs, codec=None):
         """
         Returns a dictionary of attributes for C{obj} that has been filtered,
@@ -95,28 +95,59 @@ class Context(codec.Context):
     """
 
     def clear(self):
-        codec.Context.clear(self)
+        # the nested AMF3 codecs are kept (with a cleared context) so that
+        # their type caches survive between remoting bodies.
+        extra = getattr(self, 'extra', {})
+        encoder = extra.get('amf3_encoder', None)
+        decoder = extra.get('amf3_decoder', None)
 
-        encoder = self.extra.get('amf3_encoder', None)
+        codec.Context.clear(self)
 
         if encoder:
             encoder.context.clear()
+            self.extra['amf3_encoder'] = encoder
 
+        if decoder:
+            decoder.context.clear()
+            self.extra['amf3_decoder'] = decoder
+
+    def checkpoint(self):
         decoder = self.extra.get('amf3_decoder', None)
+        amf3 = None
 
         if decoder:
+            amf3 = decoder.context.checkpoint()
+
+        return codec.Context.checkpoint(self), amf3
+
+    def rollback(self, checkpoint):
+        objects, amf3 = checkpoint
+        decoder = self.extra.get('amf3_decoder', None)
+
+        codec.Context.rollback(self, objects)
+
+        if not decoder:
+            return
+
+        if amf3 is None:
             decoder.context.clear()
+        else:
+            decoder.context.rollback(amf3)
 
     def getAMF3Encoder(self, amf0_encoder):
         encoder = self.extra.get('amf3_encoder', None)
 
         if encoder:
+            encoder.stream = amf0_encoder.stream
+
             return encoder
 
         encoder = pyamf.get_encoder(
             pyamf.AMF3,
             stream=amf0_encoder.stream,
-            timezone_offset=amf0_encoder.timezone_offset
+            timezone_offset=amf0_encoder.timezone_offset,
+            references=amf0_encoder.references,
+            detect_cycles=amf0_encoder.detect_cycles
         )
 
         self.extra['amf3_encoder'] = encoder
@@ -127,12 +158,15 @@ class Context(codec.Context):
         decoder = self.extra.get('amf3_decoder', None)
 
         if decoder:
+            decoder.stream = amf0_decoder.stream
+
             return decoder
 
         decoder = pyamf.get_decoder(
             pyamf.AMF3,
             stream=amf0_decoder.stream,
-            timezone_offset=amf0_decoder.timezone_offset
+            timezone_offset=amf0_decoder.timezone_offset,
+            lazy=amf0_decoder.lazy
         )
 
         self.extra['amf3_decoder'] = decoder
@@ -143,8 +177,16 @@ class Context(codec.Context):
 class Decoder(codec.Decoder):
     """
     Decodes an AMF0 stream.
+
+    @ivar lazy: Passed to the decoder of any L{AMF3<pyamf.amf3>} data, see
+        L{amf3.Decoder<pyamf.amf3.Decoder>}.
     """
 
+    def __init__(self, *args, **kwargs):
+        self.lazy = kwargs.pop('lazy', False)
+
+        codec.Decoder.__init__(self, *args, **kwargs)
+
     def buildContext(self, **kwargs):
         return Context(**kwargs)
 
@@ -403,19 +445,39 @@ class Encoder(codec.Encoder):
     """
 
     def __init__(self, *args, **kwargs):
-        codec.Encoder.__init__(self, *args, **kwargs)
-
         self.use_amf3 = kwargs.pop('use_amf3', False)
 
+        codec.Encoder.__init__(self, *args, **kwargs)
+
     def buildContext(self, **kwargs):
         return Context(**kwargs)
 
+    def getDispatchKey(self):
+        """
+        @see: L{codec.Encoder.getDispatchKey}
+        """
+        return (self.__class__, self.use_amf3)
+
+    def refreshTypeFuncs(self):
+        """
+        @see: L{codec.Encoder.refreshTypeFuncs}
+        """
+        codec.Encoder.refreshTypeFuncs(self)
+
+        encoder = self.context.extra.get('amf3_encoder', None)
+
+        if encoder:
+            encoder.refreshTypeFuncs()
+
     def getTypeFunc(self, data):
+        t = type(data)
+
+        if t is pyamf.RawAMF:
+            return self.writeRawAMF
+
         if self.use_amf3:
             return self.writeAMF3
 
-        t = type(data)
-
         if t is pyamf.MixedArray:
             return self.writeMixedArray
 
@@ -675,6 +737,45 @@ class Encoder(codec.Encoder):
 
         self.context.getAMF3Encoder(self).writeElement(data)
 
+    def _isContextEmpty(self):
+        """
+        Returns whether the reference tables of a decoder would be empty at
+        this point of the stream. Unknown if references are not tracked.
+        """
+        if self.references == 'none' or len(self.context._objects):
+            return False
+
+        encoder = self.context.extra.get('amf3_encoder', None)
+
+        return encoder is None or encoder._isContextEmpty()
+
+    def writeRawAMF(self, data):
+        """
+        Writes an already encoded element to the stream. AMF3 elements are
+        written in L{AMF3<pyamf.amf3>} format.
+
+        @type data: L{pyamf.RawAMF}
+        @raise EncodeError: C{data} contains references and is not the first
+            element written with this context.
+        """
+        if data.encoding == pyamf.AMF3:
+            self.writeType(TYPE_AMF3)
+            self.context.getAMF3Encoder(self).writeRawAMF(data)
+
+            return
+
+        if data.references and not self._isContextEmpty():
+            raise pyamf.EncodeError(
+                '%r contains references so cannot be written after other '
+                'elements' % (data,)
+            )
+
+        self.stream.write(data.data)
+        self.context.skipObjects(data.amf0_objects)
+
+        if data.amf3_objects or data.amf3_strings or data.amf3_classes:
+            self.context.getAMF3Encoder(self)._addRawAMF(data)
+
 
 class RecordSet(object):
     """
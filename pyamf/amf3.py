@@ -21,7 +21,9 @@ L{ByteArray} and L{ArrayCollection}.
 @since: 0.1
 """
 
+import array
 import datetime
+import sys
 import zlib
 
 import pyamf
@@ -33,6 +35,9 @@ __all__ = [
     'Context',
     'Encoder',
     'Decoder',
+    'LazyElement',
+    'LazyObject',
+    'LazyArray',
     'use_proxies_default',
 ]
 
@@ -109,6 +114,16 @@ TYPE_XMLSTRING = b'\x0B'
 #: @see: U{Parsing ByteArrays on OSFlash (external)
 #: <http://osflash.org/documentation/amf3/parsing_byte_arrays>}
 TYPE_BYTEARRAY = b'\x0C'
+#: A C{Vector.<int>} of 32 bit signed integers, written as a fixed length
+#: array of big endian values.
+#: @since: 0.8.9
+TYPE_VECTOR_INT = b'\x0D'
+#: A C{Vector.<uint>} of 32 bit unsigned integers.
+#: @since: 0.8.9
+TYPE_VECTOR_UINT = b'\x0E'
+#: A C{Vector.<Number>} of doubles.
+#: @since: 0.8.9
+TYPE_VECTOR_DOUBLE = b'\x0F'
 
 #: Reference bit.
 REFERENCE_BIT = 0x01
@@ -121,7 +136,63 @@ MAX_29B_INT = 0x0FFFFFFF
 #: The minimum that can be represented by a signed 29 bit integer.
 MIN_29B_INT = -0x10000000
 
-ENCODED_INT_CACHE = {}
+#: Lower bound of the integers with a precomputed encoding (see
+#: L{encode_int}).
+#: @since: 0.8.9
+ENCODED_INT_MIN = -1024
+
+#: Upper bound of the integers with a precomputed encoding (see
+#: L{encode_int}).
+#: @since: 0.8.9
+ENCODED_INT_MAX = 0xFFFF
+
+#: C{array.array} type code of a 32 bit signed integer.
+_INT32 = 'i' if array.array('i').itemsize == 4 else 'l'
+
+#: The C{array.array} type code and NumPy C{dtype} for each vector type.
+VECTOR_TYPES = {
+    TYPE_VECTOR_INT: (_INT32, '>i4'),
+    TYPE_VECTOR_UINT: (_INT32.upper(), '>u4'),
+    TYPE_VECTOR_DOUBLE: ('d', '>f8'),
+}
+
+#: The types that get an entry in the object reference table when they are
+#: not sent as a reference.
+#: @since: 0.8.9
+OBJECT_REFERENCE_TYPES = (
+    TYPE_XML, TYPE_DATE, TYPE_ARRAY, TYPE_OBJECT, TYPE_XMLSTRING,
+    TYPE_BYTEARRAY, TYPE_VECTOR_INT, TYPE_VECTOR_UINT, TYPE_VECTOR_DOUBLE
+)
+
+#: The types read as L{LazyElement} views by a L{Decoder} in lazy mode.
+#: @since: 0.8.9
+LAZY_TYPES = (TYPE_ARRAY, TYPE_OBJECT, TYPE_BYTEARRAY)
+
+#: The types that have nothing to skip over after their marker.
+_SKIP_NOTHING = (TYPE_UNDEFINED, TYPE_NULL, TYPE_BOOL_FALSE, TYPE_BOOL_TRUE)
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+#: Maximum number of encoded strings cached by each L{Context}, see
+#: L{Context.getEncodedString}.
+#: @since: 0.8.9
+MAX_ENCODED_STRINGS = 1024
+
+#: Longest C{str} (in characters) cached by L{Context.getEncodedString}.
+#: @since: 0.8.9
+MAX_ENCODED_STRING_LENGTH = 128
+
+#: Maximum number of classes held in L{pyamf.TRAITS_CACHE}, see
+#: L{Encoder._writeTraits}.
+#: @since: 0.8.9
+MAX_CACHED_TRAITS = 1024
+
+#: Maps C{array.array} type codes to NumPy C{dtype} kinds.
+_ARRAY_KINDS = {
+    'b': 'i', 'h': 'i', 'i': 'i', 'l': 'i', 'q': 'i',
+    'B': 'u', 'H': 'u', 'I': 'u', 'L': 'u', 'Q': 'u',
+    'f': 'f', 'd': 'f',
+}
 
 
 class ObjectEncoding:
@@ -574,6 +645,7 @@ class ClassDefinition(object):
     def __init__(self, alias):
         self.alias = alias
         self.reference = None
+        self.decode_plan = None
 
         alias.compile()
 
@@ -607,12 +679,93 @@ class ClassDefinition(object):
         )
 
 
+class Traits(object):
+    """
+    The serialised traits of a class as written the first time an instance
+    of it is encoded (excluding the reference to the trait that later
+    instances use). Held in L{pyamf.TRAITS_CACHE}, keyed by class.
+
+    @ivar data: The traits header, class name and sealed attribute names, or
+        C{None} if they cannot be written in one go (e.g. the names are not
+        unique).
+    @type data: C{bytes}
+    @ivar strings: C{(str, bytes)} pairs of the strings in C{data}, in order,
+        to add to the string references.
+    @since: 0.8.9
+    """
+
+    def __init__(self, alias, definition):
+        self.name = alias.alias
+        self.static_attrs = list(alias.static_attrs or [])
+        self.encoding = definition.encoding
+        self.attr_len = definition.attr_len
+
+        self.data = None
+        self.strings = []
+
+        names = []
+
+        if not alias.anonymous:
+            names.append(alias.alias)
+
+        if self.encoding != ObjectEncoding.EXTERNAL and alias.static_attrs:
+            names.extend(alias.static_attrs)
+
+        for name in names:
+            if type(name) is not str or not name:
+                return
+
+        if len(set(names)) != len(names):
+            return
+
+        ref = 0
+
+        if self.encoding != ObjectEncoding.EXTERNAL:
+            ref = self.attr_len << 4
+
+        data = [encode_int(
+            ref |
+            self.encoding << 2 |
+            REFERENCE_BIT << 1 |
+            REFERENCE_BIT
+        )]
+
+        if alias.anonymous:
+            data.append(b'\x01')
+
+        for name in names:
+            b = name.encode('utf-8')
+
+            self.strings.append((name, b))
+            data.append(encode_int((len(b) << 1) | REFERENCE_BIT) + b)
+
+        self.data = b''.join(data)
+
+    def matches(self, alias, definition):
+        """
+        Whether these traits are still valid for C{alias}.
+        """
+        return (
+            self.name == alias.alias and
+            self.static_attrs == (alias.static_attrs or []) and
+            self.encoding == definition.encoding and
+            self.attr_len == definition.attr_len
+        )
+
+
 class Context(codec.Context):
     """
     I hold the AMF3 context for en/decoding streams.
 
     @ivar strings: A list of string references.
     @type strings: L{codec.ByteStringReferenceCollection}
+    @ivar string_table: Lookup of C{str} -> reference index for the strings
+        written by the encoder, so that repeated strings are found without
+        being encoded to bytes first.
+    @type string_table: C{dict}
+    @ivar string_hits: Number of strings written by reference. Unlike the
+        reference tables this is not reset by L{clear}.
+    @ivar string_misses: Number of strings written in full.
     @ivar classes: A list of L{ClassDefinition}.
     @type classes: C{list}
     """
@@ -624,6 +777,10 @@ class Context(codec.Context):
 
         self.class_idx = 0
 
+        self.string_hits = 0
+        self.string_misses = 0
+        self._encoded_strings = {}
+
         codec.Context.__init__(self, **kwargs)
 
     def clear(self):
@@ -633,12 +790,39 @@ class Context(codec.Context):
         codec.Context.clear(self)
 
         self.strings.clear()
+        self.string_table = {}
         self.proxied_objects = {}
         self.classes = {}
         self.class_ref = {}
 
         self.class_idx = 0
 
+    def checkpoint(self):
+        return (
+            codec.Context.checkpoint(self),
+            len(self.strings),
+            self.class_idx
+        )
+
+    def rollback(self, checkpoint):
+        objects, strings, class_idx = checkpoint
+
+        codec.Context.rollback(self, objects)
+        self.strings.truncate(strings)
+
+        for s, ref in list(self.string_table.items()):
+            if ref >= strings:
+                del self.string_table[s]
+
+        for ref in range(class_idx, self.class_idx):
+            class_def = self.class_ref.pop(ref, None)
+
+            for klass, cd in list(self.classes.items()):
+                if cd is class_def:
+                    del self.classes[klass]
+
+        self.class_idx = class_idx
+
     def getString(self, ref):
         """
         Gets a string based on a reference C{ref}.
@@ -684,6 +868,50 @@ class Context(codec.Context):
 
         return self.strings.append(s)
 
+    def getEncodedString(self, s):
+        """
+        Returns the utf-8 encoded bytes of C{s} and the same bytes prefixed
+        with their length header, as written to the stream the first time
+        C{s} is seen.
+
+        Short strings (attribute names, enum like values) are cached for the
+        lifetime of the context, surviving L{clear}, up to
+        L{MAX_ENCODED_STRINGS} at a time.
+
+        @type s: C{str}
+        @rtype: C{tuple}
+        @since: 0.8.9
+        """
+        ret = self._encoded_strings.get(s, None)
+
+        if ret is not None:
+            return ret
+
+        b = s.encode('utf-8')
+        ret = (b, encode_int((len(b) << 1) | REFERENCE_BIT) + b)
+
+        if len(s) <= MAX_ENCODED_STRING_LENGTH:
+            if len(self._encoded_strings) >= MAX_ENCODED_STRINGS:
+                self._encoded_strings = {}
+
+            self._encoded_strings[s] = ret
+
+        return ret
+
+    def getStringStats(self):
+        """
+        Returns the number of strings written by reference (C{hits}) and in
+        full (C{misses}), to gauge how well strings are deduplicated.
+
+        @rtype: C{dict}
+        @since: 0.8.9
+        """
+        return {
+            'hits': self.string_hits,
+            'misses': self.string_misses,
+            'strings': len(self.strings),
+        }
+
     def getClassByReference(self, ref):
         """
         Return class reference.
@@ -767,20 +995,315 @@ class Context(codec.Context):
         return proxied
 
 
+class LazyContext(Context):
+    """
+    The context of a L{Decoder} in lazy mode. The elements that have been
+    skipped over are held in the object reference table as L{LazyElement}
+    views until they are decoded.
+
+    L{clear} starts new reference tables instead of emptying them, so the
+    views that have been handed out can still be decoded afterwards.
+
+    @ivar externals: Lookup of stream offset -> C{(end, count)} for the
+        externalised objects that had to be decoded to skip over them, see
+        L{Decoder.skipElement}.
+    @since: 0.8.9
+    """
+
+    def clear(self):
+        self._objects = codec.ListReferenceCollection()
+        self.strings = codec.ByteStringReferenceCollection()
+        self.externals = {}
+        self._tables = None
+
+        Context.clear(self)
+
+    def getTables(self, decoder):
+        """
+        Returns the template for the L{_ReplayContext}s of the views that
+        C{decoder} reads from its stream, until the next L{clear}.
+        """
+        tables = self._tables
+
+        if tables is None or tables.stream is not decoder.stream:
+            tables = self._tables = _ReplayContext(self, 0)
+
+            tables.decoder = decoder
+            tables.stream = decoder.stream
+
+        return tables
+
+    def getObject(self, ref):
+        """
+        Gets an object based on a reference, decoding it if necessary.
+        """
+        obj = self._objects.getByReference(ref)
+
+        if isinstance(obj, LazyElement):
+            return obj.decode()
+
+        return obj
+
+    def getElement(self, ref):
+        """
+        Gets the object, or the L{LazyElement} if it has not been decoded yet,
+        based on a reference.
+        """
+        return self._objects.getByReference(ref)
+
+    def nextReference(self):
+        """
+        Returns the reference that the next object read will get.
+        """
+        return len(self._objects)
+
+    def addPending(self, decoder, offset, marker):
+        """
+        Adds a view of the element of type C{marker} at C{offset} that has
+        been skipped over.
+        """
+        objects = self._objects
+        klass = _VIEW_TYPES.get(marker, LazyElement)
+
+        objects.append(klass(self.getTables(decoder), offset, len(objects)))
+
+
+class _ReplayContext(LazyContext):
+    """
+    Used to read the elements of a L{LazyContext} a second time, starting
+    from the position of a L{LazyElement}. The reference tables are shared:
+    strings and class definitions are in them already and objects take the
+    place of their views.
+
+    @ivar reference: The reference of the next object read.
+    """
+
+    def __init__(self, context, reference):
+        self.__dict__.update(context.__dict__)
+
+        self.reference = reference
+
+    def nextReference(self):
+        return self.reference
+
+    def addString(self, s):
+        return -1
+
+    def addClass(self, alias, klass):
+        return -1
+
+    def addObject(self, obj):
+        ref = self.reference
+
+        if ref < len(self._objects):
+            self._objects.replace(ref, obj)
+        else:
+            self._objects.append(obj)
+
+        self.reference = ref + 1
+
+        return ref
+
+    def addPending(self, decoder, offset, marker):
+        self.reference += 1
+
+
+class LazyElement(object):
+    """
+    A view of an element that a L{Decoder} in lazy mode has skipped over.
+    Nothing is decoded until L{decode} is called.
+
+    Views read from the stream they were found in, so it must not be reused
+    or consumed while they are in use.
+
+    @ivar offset: The position of the element in the stream.
+    @ivar reference: The index of the element in the object reference table.
+    @since: 0.8.9
+    """
+
+    __slots__ = ('context', 'offset', 'reference')
+
+    def __init__(self, context, offset, reference):
+        self.context = context
+        self.offset = offset
+        self.reference = reference
+
+    def __repr__(self):
+        return '<%s offset=%d reference=%d>' % (
+            self.__class__.__name__,
+            self.offset,
+            self.reference
+        )
+
+    def decode(self):
+        """
+        Decodes the element. Later calls, and references to the element from
+        other elements, return the same object.
+        """
+        obj = self.context.getElement(self.reference)
+
+        if obj is not self:
+            return obj
+
+        return self._replay(
+            self.offset, self.reference, False, _ReplayDecoder.readElement
+        )
+
+    def _replay(self, offset, reference, lazy, func):
+        context = self.context
+
+        return context.decoder.replay(context, offset, reference, lazy, func)
+
+    def _read(self, position):
+        offset, reference = position
+
+        return self._replay(
+            offset, reference, True, _ReplayDecoder.readElement
+        )
+
+
+class _LazyContainer(LazyElement):
+    """
+    A view of an element with parts that can be decoded on their own.
+
+    @ivar _layout: See L{Decoder.scanElement}.
+    """
+
+    __slots__ = ('_layout',)
+
+    def __init__(self, *args):
+        LazyElement.__init__(self, *args)
+
+        self._layout = None
+
+    def _getLayout(self):
+        if self._layout is None:
+            self._layout = self._replay(
+                self.offset, self.reference, True, _ReplayDecoder.scanElement
+            )
+
+        return self._layout
+
+
+class LazyObject(_LazyContainer):
+    """
+    A view of an object. Attribute values are decoded each time they are
+    looked up, the objects and arrays among them being returned as views.
+
+    Externalised objects (e.g. L{ArrayCollection<pyamf.flex.ArrayCollection>})
+    have no attributes and can only be L{decoded<decode>}.
+
+    @since: 0.8.9
+    """
+
+    __slots__ = ()
+
+    @property
+    def alias(self):
+        """
+        The L{ClassAlias<pyamf.ClassAlias>} of the object.
+        """
+        return self._getLayout()[0].alias
+
+    def keys(self):
+        return list(self._getLayout()[1])
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __getitem__(self, name):
+        return self._read(self._getLayout()[1][name])
+
+    def __contains__(self, name):
+        return name in self._getLayout()[1]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._getLayout()[1])
+
+
+class LazyArray(_LazyContainer):
+    """
+    A view of an array. Items are decoded each time they are looked up, by
+    index or, for the associative part of the array, by key. The objects and
+    arrays among them are returned as views.
+
+    @since: 0.8.9
+    """
+
+    __slots__ = ()
+
+    def keys(self):
+        """
+        Returns the keys of the associative part of the array.
+        """
+        return list(self._getLayout()[0])
+
+    def __getitem__(self, key):
+        keys, items = self._getLayout()
+
+        if isinstance(key, str):
+            return self._read(keys[key])
+
+        return self._read(items[key])
+
+    def __iter__(self):
+        for position in self._getLayout()[1]:
+            yield self._read(position)
+
+    def __len__(self):
+        return len(self._getLayout()[1])
+
+
+_VIEW_TYPES = {
+    TYPE_OBJECT: LazyObject,
+    TYPE_ARRAY: LazyArray,
+}
+
+
+def _is_proxy(klass):
+    """
+    Whether the externalised data of instances of C{klass} is a single
+    element, which can be skipped over without decoding it.
+    """
+    from pyamf import flex
+
+    return issubclass(klass, (flex.ArrayCollection, flex.ObjectProxy))
+
+
 class Decoder(codec.Decoder):
     """
     Decodes an AMF3 data stream.
+
+    @ivar lazy: Read objects, arrays and L{ByteArray}s as L{LazyElement}
+        views that are decoded on demand, e.g. to route a message by a few of
+        its attributes without decoding its body. Only supported by the pure
+        Python decoder.
+    @type lazy: C{bool}
     """
 
     def __init__(self, *args, **kwargs):
         self.use_proxies = kwargs.pop('use_proxies', use_proxies_default)
+        self.use_numpy = kwargs.pop('use_numpy', False)
+        self.lazy = kwargs.pop('lazy', False)
 
         codec.Decoder.__init__(self, *args, **kwargs)
 
     def buildContext(self, **kwargs):
+        if self.lazy:
+            return LazyContext(**kwargs)
+
         return Context(**kwargs)
 
     def getTypeFunc(self, data):
+        if self.lazy and data in LAZY_TYPES:
+            return self.readView
+
         if data == TYPE_UNDEFINED:
             return self.readUndefined
         elif data == TYPE_NULL:
@@ -807,6 +1330,285 @@ class Decoder(codec.Decoder):
             return self.readXMLString
         elif data == TYPE_BYTEARRAY:
             return self.readByteArray
+        elif data == TYPE_VECTOR_INT:
+            return self.readVectorInt
+        elif data == TYPE_VECTOR_UINT:
+            return self.readVectorUInt
+        elif data == TYPE_VECTOR_DOUBLE:
+            return self.readVectorDouble
+
+    def readView(self):
+        """
+        Reads an object, array or L{ByteArray} as a L{LazyElement} view. The
+        view of an element that has been decoded already is replaced by the
+        decoded object.
+
+        @raise ReferenceError: Unknown reference found.
+        @since: 0.8.9
+        """
+        stream = self.stream
+        context = self.context
+        offset = stream.tell() - 1
+        ref = self.readInteger(False)
+
+        if ref & REFERENCE_BIT == 0:
+            obj = context.getElement(ref >> 1)
+
+            if obj is None:
+                raise pyamf.ReferenceError(
+                    'Unknown reference %d' % (ref >> 1,)
+                )
+
+            return obj
+
+        reference = context.nextReference()
+
+        stream.seek(offset)
+
+        layout = self.scanElement()
+        obj = context.getElement(reference)
+
+        if isinstance(obj, _LazyContainer):
+            obj._layout = layout
+
+        return obj
+
+    def scanElement(self):
+        """
+        Skips over the object or array at the current position, like
+        L{skipElement}, noting where its attributes or items are.
+
+        @return: For an object, its L{ClassDefinition} and a C{dict} of
+            attribute name -> position of the value. For an array, a C{dict}
+            of key -> position for the associative part and a C{list} of
+            positions for the rest. A position is a C{tuple} of the stream
+            offset and the next object reference.
+        @since: 0.8.9
+        """
+        stream = self.stream
+        offset = stream.tell()
+        t = stream.read(1)
+
+        ref = decode_int(stream, False)
+
+        return self._skipObject(t, offset, ref >> 1, True)
+
+    def skipElement(self):
+        """
+        Moves past the next element in the stream without decoding it, while
+        keeping the reference tables in step: strings and class definitions
+        are read as usual and every object, array, date etc. is added to the
+        object reference table as a L{LazyElement}. Externalised objects,
+        other than L{ArrayCollection<pyamf.flex.ArrayCollection>} and
+        L{ObjectProxy<pyamf.flex.ObjectProxy>}, are decoded as only their
+        class knows where they end.
+
+        Only available in lazy mode.
+
+        @raise DecodeError: The ActionScript type is unsupported.
+        @since: 0.8.9
+        """
+        stream = self.stream
+        offset = stream.tell()
+        t = stream.read(1)
+
+        if t in _SKIP_NOTHING:
+            return
+
+        if t == TYPE_STRING:
+            self._skipString()
+        elif t == TYPE_INTEGER:
+            decode_int(stream)
+        elif t == TYPE_NUMBER:
+            self._skip(8)
+        elif t not in OBJECT_REFERENCE_TYPES:
+            raise pyamf.DecodeError("Unsupported ActionScript type %s" % (
+                hex(ord(t)),))
+        else:
+            ref = decode_int(stream, False)
+
+            if ref & REFERENCE_BIT:
+                self._skipObject(t, offset, ref >> 1)
+
+    def _skip(self, length):
+        stream = self.stream
+
+        if stream.remaining() < length:
+            raise IOError(
+                'Tried to skip %d byte(s) of the stream' % (length,)
+            )
+
+        stream.seek(stream.tell() + length)
+
+    def _skipString(self):
+        """
+        Skips over a string, or the name of an attribute, adding it to the
+        string reference table. Returns C{False} if the string was empty.
+        """
+        stream = self.stream
+        ref = decode_int(stream, False)
+
+        if ref & REFERENCE_BIT == 0:
+            return True
+
+        if ref == REFERENCE_BIT:
+            return False
+
+        self.context.addString(stream.read(ref >> 1))
+
+        return True
+
+    def _getPosition(self):
+        return (self.stream.tell(), self.context.nextReference())
+
+    def _skipObject(self, t, offset, ref, scan=False):
+        context = self.context
+        skip = self.skipElement
+
+        if t == TYPE_OBJECT:
+            return self._skipAttributes(offset, ref, scan)
+
+        context.addPending(self, offset, t)
+
+        if t == TYPE_ARRAY:
+            keys = {}
+            items = []
+            key = self.readBytes()
+
+            while key:
+                if scan:
+                    keys[context.getStringForBytes(key)] = self._getPosition()
+
+                skip()
+                key = self.readBytes()
+
+            if not scan:
+                for i in range(ref):
+                    skip()
+
+                return
+
+            for i in range(ref):
+                items.append(self._getPosition())
+                skip()
+
+            return keys, items
+
+        if t == TYPE_DATE:
+            self._skip(8)
+        elif t in VECTOR_TYPES:
+            self._skip(1 + ref * (8 if t == TYPE_VECTOR_DOUBLE else 4))
+        else:
+            self._skip(ref)
+
+    def _skipAttributes(self, offset, ref, scan):
+        context = self.context
+        skip = self.skipElement
+        class_def = self._getClassDefinition(ref)
+        encoding = class_def.encoding
+        members = {}
+
+        if encoding in (ObjectEncoding.EXTERNAL, ObjectEncoding.PROXY):
+            if not _is_proxy(class_def.alias.klass):
+                self._skipExternal(offset, class_def)
+
+                return
+
+            context.addPending(self, offset, TYPE_OBJECT)
+            skip()
+
+            return class_def, members
+
+        if encoding not in (ObjectEncoding.DYNAMIC, ObjectEncoding.STATIC):
+            raise pyamf.DecodeError("Unknown object encoding")
+
+        context.addPending(self, offset, TYPE_OBJECT)
+
+        if not scan:
+            for i in range(len(class_def.static_properties)):
+                skip()
+
+            if encoding == ObjectEncoding.DYNAMIC:
+                while self._skipString():
+                    skip()
+
+            return
+
+        for name in class_def.static_properties:
+            members[context.getStringForBytes(name)] = self._getPosition()
+            skip()
+
+        if encoding == ObjectEncoding.DYNAMIC:
+            name = self.readBytes()
+
+            while name:
+                members[context.getStringForBytes(name)] = self._getPosition()
+                skip()
+                name = self.readBytes()
+
+        return class_def, members
+
+    def _skipExternal(self, offset, class_def):
+        context = self.context
+        stream = self.stream
+
+        if isinstance(context, _ReplayContext):
+            # decoded when the element was first skipped over
+            end, count = context.externals[offset]
+
+            stream.seek(end)
+            context.reference += count
+
+            return
+
+        reference = context.nextReference()
+        decoder = Decoder(
+            stream=stream,
+            context=context,
+            strict=self.strict,
+            timezone_offset=self.timezone_offset,
+            use_proxies=self.use_proxies,
+            use_numpy=self.use_numpy
+        )
+
+        obj = class_def.alias.createInstance(codec=decoder)
+        context.addObject(obj)
+        obj.__readamf__(DataInput(decoder))
+
+        context.externals[offset] = (
+            stream.tell(),
+            context.nextReference() - reference
+        )
+
+    def replay(self, tables, offset, reference, lazy, func):
+        """
+        Calls C{func} with a decoder that reads the stream of C{tables} again
+        from C{offset}, using the reference tables of a L{LazyContext}. The
+        position of the stream is restored afterwards.
+
+        @param tables: See L{LazyContext.getTables}.
+        @param reference: The reference of the first object read.
+        @param lazy: Whether the decoder is in lazy mode.
+        @since: 0.8.9
+        """
+        stream = tables.stream
+        decoder = _ReplayDecoder(
+            stream=stream,
+            context=_ReplayContext(tables, reference),
+            strict=self.strict,
+            timezone_offset=self.timezone_offset,
+            use_proxies=self.use_proxies,
+            use_numpy=self.use_numpy,
+            lazy=lazy
+        )
+
+        pos = stream.tell()
+        stream.seek(offset)
+
+        try:
+            return func(decoder)
+        finally:
+            stream.seek(pos)
 
     def readProxy(self, obj):
         """
@@ -950,8 +1752,30 @@ class Decoder(codec.Decoder):
             result = []
             self.context.addObject(result)
 
-            for i in range(size):
-                result.append(self.readElement())
+            read = self.readElement
+            remaining = size
+            run = 0
+
+            while remaining:
+                element = read()
+                result.append(element)
+                remaining -= 1
+
+                if type(element) is not int:
+                    run = 0
+
+                    continue
+
+                run += 1
+
+                if run > 1 and remaining:
+                    # bulk decode the rest of a run of integers
+                    ints = decode_ints(
+                        self.stream, remaining, marker=TYPE_INTEGER
+                    )
+                    result.extend(ints)
+                    remaining -= len(ints)
+                    run = 0
 
             return result
 
@@ -1008,6 +1832,10 @@ class Decoder(codec.Decoder):
 
                 class_def.static_properties.append(key)
 
+        if class_def.encoding != ObjectEncoding.EXTERNAL:
+            class_def.decode_plan = alias.getDecodePlan(
+                class_def.static_properties)
+
         self.context.addClass(class_def, alias.klass)
 
         return class_def
@@ -1063,16 +1891,35 @@ class Decoder(codec.Decoder):
             if self.use_proxies is True:
                 obj = self.readProxy(obj)
 
-            return obj
-        elif class_def.encoding == ObjectEncoding.DYNAMIC:
-            self._readStatic(class_def, obj_attrs)
-            self._readDynamic(class_def, obj_attrs)
-        elif class_def.encoding == ObjectEncoding.STATIC:
-            self._readStatic(class_def, obj_attrs)
+            return obj
+        elif class_def.encoding not in (
+                ObjectEncoding.DYNAMIC,
+                ObjectEncoding.STATIC):
+            raise pyamf.DecodeError("Unknown object encoding")
+
+        plan = class_def.decode_plan
+
+        if plan is not None:
+            values = [self.readElement() for _ in plan.names]
+
+            if class_def.encoding == ObjectEncoding.DYNAMIC:
+                self._readDynamic(class_def, obj_attrs)
+
+            if not obj_attrs:
+                plan.apply(obj, values, codec=self)
+            else:
+                # the plan only covers the sealed properties
+                attrs = dict(zip(class_def.static_properties, values))
+                attrs.update(obj_attrs)
+
+                alias.applyAttributes(obj, attrs, codec=self)
         else:
-            raise pyamf.DecodeError("Unknown object encoding")
+            self._readStatic(class_def, obj_attrs)
+
+            if class_def.encoding == ObjectEncoding.DYNAMIC:
+                self._readDynamic(class_def, obj_attrs)
 
-        alias.applyAttributes(obj, obj_attrs, codec=self)
+            alias.applyAttributes(obj, obj_attrs, codec=self)
 
         if self.use_proxies is True:
             obj = self.readProxy(obj)
@@ -1142,6 +1989,117 @@ class Decoder(codec.Decoder):
 
         return obj
 
+    def readVectorInt(self):
+        """
+        Reads a C{Vector.<int>}.
+
+        @see: L{readVector}
+        @since: 0.8.9
+        """
+        return self.readVector(TYPE_VECTOR_INT)
+
+    def readVectorUInt(self):
+        """
+        Reads a C{Vector.<uint>}.
+
+        @see: L{readVector}
+        @since: 0.8.9
+        """
+        return self.readVector(TYPE_VECTOR_UINT)
+
+    def readVectorDouble(self):
+        """
+        Reads a C{Vector.<Number>}.
+
+        @see: L{readVector}
+        @since: 0.8.9
+        """
+        return self.readVector(TYPE_VECTOR_DOUBLE)
+
+    def readVector(self, vector_type):
+        """
+        Reads a vector of numbers from the stream in one go.
+
+        @param vector_type: One of L{VECTOR_TYPES}.
+        @return: An C{array.array}, or a NumPy array if C{use_numpy} was
+            set. Whether the vector was of fixed length is not kept.
+        @since: 0.8.9
+        """
+        ref = self.readInteger(False)
+
+        if ref & REFERENCE_BIT == 0:
+            return self.context.getObject(ref >> 1)
+
+        typecode, dtype = VECTOR_TYPES[vector_type]
+        length = ref >> 1
+
+        self.stream.read_uchar()  # fixed
+
+        obj = array.array(typecode)
+        data = b''
+
+        if length:
+            data = self.stream.read(length * obj.itemsize)
+
+        if self.use_numpy:
+            import numpy
+
+            obj = numpy.frombuffer(data, dtype=dtype).astype(dtype[1:])
+        else:
+            obj.frombytes(data)
+
+            if _LITTLE_ENDIAN:
+                obj.byteswap()
+
+        self.context.addObject(obj)
+
+        return obj
+
+
+class _ReplayDecoder(Decoder):
+    """
+    Reads elements again for a L{LazyElement}, see L{Decoder.replay}. Objects
+    that have been decoded already are skipped over and returned as they
+    are, so that each element is only ever decoded once.
+    """
+
+    def getTypeFunc(self, data):
+        func = Decoder.getTypeFunc(self, data)
+
+        if func is None or data not in OBJECT_REFERENCE_TYPES:
+            return func
+
+        if self.lazy and data in LAZY_TYPES:
+            return func
+
+        def read():
+            return self._readOnce(func)
+
+        return read
+
+    def _readOnce(self, func):
+        stream = self.stream
+        context = self.context
+        offset = stream.tell() - 1
+        ref = self.readInteger(False)
+
+        if ref & REFERENCE_BIT:
+            obj = context.getElement(context.reference)
+
+            if obj is not None and not isinstance(obj, LazyElement):
+                stream.seek(offset)
+                self.skipElement()
+
+                return obj
+
+        stream.seek(offset + 1)
+
+        return func()
+
+    def finalise(self, payload):
+        # the payload these elements are part of has been finalised already
+        return payload
+
 
 class Encoder(codec.Encoder):
     """
@@ -1242,10 +2200,12 @@ class Encoder(codec.Encoder):
             ref = self.context.getStringReference(b)
 
             if ref != -1:
+                self.context.string_hits += 1
                 self._writeInteger(ref << 1)
 
                 return
 
+            self.context.string_misses += 1
             self.context.addString(b)
 
         self._writeInteger((len(b) << 1) | REFERENCE_BIT)
@@ -1258,10 +2218,50 @@ class Encoder(codec.Encoder):
         @type   s: C{str}
         @param  s: The string data to be encoded to the AMF3 data stream.
         """
-        if type(s) is str:
-            s = self.context.getBytesForString(s)
+        if type(s) is not str:
+            self.serialiseBytes(s)
+
+            return
+
+        if not s:
+            self.stream.write_uchar(REFERENCE_BIT)
+
+            return
+
+        context = self.context
+
+        if not self.string_references:
+            self.stream.write(context.getEncodedString(s)[1])
 
-        self.serialiseBytes(s)
+            return
+
+        table = context.string_table
+        ref = table.get(s, None)
+
+        if ref is None:
+            b, data = (
+                context._encoded_strings.get(s, None) or
+                context.getEncodedString(s)
+            )
+            strings = context.strings
+
+            # the same string may have been written as bytes
+            if len(strings.list) != len(table):
+                ref = strings.getReferenceTo(b)
+            else:
+                ref = -1
+
+            if ref == -1:
+                context.string_misses += 1
+                table[s] = strings.append(b)
+                self.stream.write(data)
+
+                return
+
+            table[s] = ref
+
+        context.string_hits += 1
+        self.stream.write(encode_int(ref << 1))
 
     def writeBytes(self, b):
         """
@@ -1275,9 +2275,9 @@ class Encoder(codec.Encoder):
         """
         Writes a string to the stream. It will be B{UTF-8} encoded.
         """
-        s = self.context.getBytesForString(s)
+        self.stream.write(TYPE_STRING)
 
-        self.writeBytes(s)
+        self.serialiseString(s)
 
     def writeDate(self, n):
         """
@@ -1464,6 +2464,12 @@ class Encoder(codec.Encoder):
 
         if class_ref:
             self.stream.write(definition.reference)
+        elif self._writeTraits(alias, definition):
+            definition.reference = encode_int(
+                definition.reference << 2 | REFERENCE_BIT)
+
+            # the sealed attribute names have been written
+            class_ref = True
         else:
             ref = 0
 
@@ -1497,6 +2503,13 @@ class Encoder(codec.Encoder):
 
             return
 
+        plan = alias.getEncodePlan()
+
+        if plan is not None:
+            self._writeObjectPlan(obj, plan, definition, class_ref)
+
+            return
+
         attrs = alias.getEncodableAttributes(obj, codec=self)
 
         if alias.static_attrs:
@@ -1522,6 +2535,79 @@ class Encoder(codec.Encoder):
 
             self.stream.write(b'\x01')
 
+    def _writeTraits(self, alias, definition):
+        """
+        Writes the traits of a class that has not been seen in this context
+        yet by copying them from L{pyamf.TRAITS_CACHE}.
+
+        The cached traits contain their strings in full so they can only be
+        used if none of the strings have been written yet, otherwise the
+        traits are written one string at a time as usual.
+
+        The cache is keyed by class rather than alias, as the alias of an
+        unregistered class is rebuilt for every context. It holds up to
+        L{MAX_CACHED_TRAITS} classes at a time.
+
+        @return: Whether the traits were written.
+        @since: 0.8.9
+        """
+        cache = pyamf.TRAITS_CACHE
+        traits = cache.get(alias.klass, None)
+
+        if traits is None or not traits.matches(alias, definition):
+            if len(cache) >= MAX_CACHED_TRAITS:
+                cache.clear()
+
+            traits = cache[alias.klass] = Traits(alias, definition)
+
+        if traits.data is None:
+            return False
+
+        if self.string_references:
+            context = self.context
+            table = context.string_table
+            strings = context.strings
+
+            for s, b in traits.strings:
+                if s in table or strings.getReferenceTo(b) != -1:
+                    return False
+
+            for s, b in traits.strings:
+                table[s] = strings.append(b)
+
+            context.string_misses += len(traits.strings)
+
+        self.stream.write(traits.data)
+
+        return True
+
+    def _writeObjectPlan(self, obj, plan, definition, class_ref):
+        """
+        Writes the attributes of C{obj} using the
+        L{EncodePlan<pyamf.alias.EncodePlan>} of its class alias.
+        """
+        write = self.writeElement
+
+        if plan.static_attrs:
+            if not class_ref:
+                [self.serialiseBytes(name) for name in plan.static_names]
+
+            for value in plan.getStaticValues(obj):
+                write(value)
+
+            if definition.encoding == ObjectEncoding.STATIC:
+                return
+
+        if definition.encoding == ObjectEncoding.DYNAMIC:
+            for attr, value in plan.getDynamicItems(obj):
+                if type(attr) in python.int_types:
+                    attr = str(attr)
+
+                self.serialiseString(attr)
+                write(value)
+
+            self.stream.write(b'\x01')
+
     def writeByteArray(self, n):
         """
         Writes a L{ByteArray} to the data stream.
@@ -1545,6 +2631,37 @@ class Encoder(codec.Encoder):
         self._writeInteger(l << 1 | REFERENCE_BIT)
         self.stream.write(buf)
 
+    def writeVector(self, n):
+        """
+        Writes an C{array.array} or a one dimensional NumPy array of numbers
+        as a C{Vector.<int>}, C{Vector.<uint>} or C{Vector.<Number>}, packing
+        all the values in one go. Arrays that cannot be represented (e.g.
+        integers that do not fit in 32 bits) are written as a list.
+
+        @since: 0.8.9
+        """
+        vector_type = get_vector_type(n)
+
+        if vector_type is None:
+            self.writeList(n.tolist())
+
+            return
+
+        self.stream.write(vector_type)
+
+        ref = self.context.getObjectReference(n)
+
+        if ref != -1:
+            self._writeInteger(ref << 1)
+
+            return
+
+        self.context.addObject(n)
+
+        self._writeInteger(len(n) << 1 | REFERENCE_BIT)
+        self.stream.write(b'\x00')  # not fixed
+        self.stream.write(pack_vector(n, vector_type))
+
     def writeXML(self, n):
         """
         Writes a XML string to the data stream.
@@ -1564,64 +2681,165 @@ class Encoder(codec.Encoder):
 
         self.serialiseString(xml.tostring(n))
 
+    def _isContextEmpty(self):
+        """
+        Returns whether the reference tables of a decoder would be empty at
+        this point of the stream. Unknown if references are not tracked.
+        """
+        if self.references == 'none' or not self.string_references:
+            return False
 
-def encode_int(n):
-    """
-    Encodes an int as a variable length signed 29-bit integer as defined by
-    the spec.
+        context = self.context
 
-    @param n: The integer to be encoded
-    @return: The encoded string
-    @rtype: C{str}
-    @raise OverflowError: C{c} is out of range.
-    """
-    global ENCODED_INT_CACHE
+        return not (
+            len(context._objects) or len(context.strings) or context.class_idx
+        )
+
+    def _addRawAMF(self, data):
+        """
+        Adds the strings, objects and class definitions in C{data} to the
+        reference tables, as a decoder does when it reads them.
+        """
+        context = self.context
+
+        if self.string_references:
+            for b in data.amf3_strings:
+                context.strings.append(b)
+
+        context.skipObjects(data.amf3_objects)
+        context.class_idx += data.amf3_classes
+
+    def writeRawAMF(self, data):
+        """
+        Writes an already encoded element to the stream.
+
+        @type data: L{pyamf.RawAMF}
+        @raise EncodeError: C{data} is AMF0 or contains references and is not
+            the first element written with this context.
+        """
+        if data.encoding != pyamf.AMF3:
+            raise pyamf.EncodeError(
+                'Unable to write %r to an AMF3 stream' % (data,)
+            )
+
+        if data.references and not self._isContextEmpty():
+            raise pyamf.EncodeError(
+                '%r contains references so cannot be written after other '
+                'elements' % (data,)
+            )
+
+        self.stream.write(data.data)
+        self._addRawAMF(data)
 
-    try:
-        return ENCODED_INT_CACHE[n]
-    except KeyError:
-        pass
 
+def _encode_int(n):
+    """
+    Arithmetic version of L{encode_int}, used for values outside of the
+    precomputed range.
+    """
     if n < MIN_29B_INT or n > MAX_29B_INT:
         raise OverflowError("Out of range")
 
     if n < 0:
         n += 0x20000000
 
-    data = b''
-    real_value = None
+    if n < 0x80:
+        return bytes((n,))
 
-    if n > 0x1fffff:
-        real_value = n
-        n >>= 1
-        data += bytes([0x80 | ((n >> 21) & 0xff)])
+    if n < 0x4000:
+        return bytes((0x80 | (n >> 7), n & 0x7f))
 
-    if n > 0x3fff:
-        data += bytes([0x80 | ((n >> 14) & 0xff)])
+    if n < 0x200000:
+        return bytes((0x80 | (n >> 14), 0x80 | ((n >> 7) & 0x7f), n & 0x7f))
 
-    if n > 0x7f:
-        data += bytes([0x80 | ((n >> 7) & 0xff)])
+    return bytes((
+        0x80 | (n >> 22),
+        0x80 | ((n >> 15) & 0x7f),
+        0x80 | ((n >> 8) & 0x7f),
+        n & 0xff
+    ))
 
-    if real_value is not None:
-        n = real_value
 
-    if n > 0x1fffff:
-        data += bytes([n & 0xff])
-    else:
-        data += bytes([n & 0x7f])
+#: Precomputed encodings for L{ENCODED_INT_MIN} to L{ENCODED_INT_MAX}
+#: inclusive (see L{encode_int}). C{None} until an int is first encoded, as
+#: building it takes a noticeable amount of time and memory.
+#: @see: L{get_encoded_int_table}
+#: @since: 0.8.9
+ENCODED_INT_TABLE = None
+
+
+def get_encoded_int_table():
+    """
+    Returns L{ENCODED_INT_TABLE}, building it if need be.
+
+    @since: 0.8.9
+    """
+    global ENCODED_INT_TABLE
+
+    if ENCODED_INT_TABLE is None:
+        ENCODED_INT_TABLE = tuple([
+            _encode_int(n)
+            for n in range(ENCODED_INT_MIN, ENCODED_INT_MAX + 1)
+        ])
+
+    return ENCODED_INT_TABLE
+
+
+def encode_int(n):
+    """
+    Encodes an int as a variable length signed 29-bit integer as defined by
+    the spec.
+
+    Values between L{ENCODED_INT_MIN} and L{ENCODED_INT_MAX} are looked up in
+    L{ENCODED_INT_TABLE}, anything else is encoded without being cached.
+
+    @param n: The integer to be encoded
+    @return: The encoded string
+    @rtype: C{str}
+    @raise OverflowError: C{c} is out of range.
+    """
+    if ENCODED_INT_MIN <= n <= ENCODED_INT_MAX:
+        try:
+            return ENCODED_INT_TABLE[n - ENCODED_INT_MIN]
+        except TypeError:
+            # the table has not been built yet
+            return get_encoded_int_table()[n - ENCODED_INT_MIN]
 
-    ENCODED_INT_CACHE[n] = data
+    return _encode_int(n)
+
+
+def encode_ints(values):
+    """
+    Encodes a sequence of ints as consecutive variable length signed 29-bit
+    integers (without type markers).
+
+    @param values: An iterable of C{int}s, e.g. a C{list} or C{array.array}.
+    @return: The encoded bytes.
+    @rtype: C{bytes}
+    @raise OverflowError: One of C{values} is out of range.
+    @since: 0.8.9
+    """
+    table = get_encoded_int_table()
+    lo = ENCODED_INT_MIN
+    hi = ENCODED_INT_MAX
+    slow = _encode_int
 
-    return data
+    return b''.join([
+        table[n - lo] if lo <= n <= hi else slow(n) for n in values
+    ])
 
 
 def decode_int(stream, signed=False):
     """
     Decode C{int}.
     """
-    n = result = 0
     b = stream.read_uchar()
 
+    if b < 0x80:
+        return b
+
+    n = result = 0
+
     while b & 0x80 != 0 and n < 3:
         result <<= 7
         result |= b & 0x7f
@@ -1645,4 +2863,205 @@ def decode_int(stream, signed=False):
     return result
 
 
+def _in_range(n, lo, hi):
+    if not len(n):
+        return True
+
+    if hasattr(n, 'dtype'):
+        return lo <= n.min() and n.max() <= hi
+
+    return lo <= min(n) and max(n) <= hi
+
+
+def get_vector_type(n):
+    """
+    Returns the vector type (one of L{VECTOR_TYPES}) that can hold all the
+    values in the C{array.array} or NumPy array C{n}, or C{None}.
+
+    @since: 0.8.9
+    """
+    dtype = getattr(n, 'dtype', None)
+
+    if dtype is not None:
+        if n.ndim != 1:
+            return None
+
+        kind, size = dtype.kind, dtype.itemsize
+    else:
+        kind, size = _ARRAY_KINDS.get(n.typecode), n.itemsize
+
+    if kind == 'f':
+        return TYPE_VECTOR_DOUBLE
+
+    if kind == 'i':
+        if size <= 4 or _in_range(n, -0x80000000, 0x7fffffff):
+            return TYPE_VECTOR_INT
+    elif kind == 'u':
+        if size <= 4 or _in_range(n, 0, 0xffffffff):
+            return TYPE_VECTOR_UINT
+
+    return None
+
+
+def pack_vector(n, vector_type):
+    """
+    Returns the big endian values of C{n} as written in a vector of
+    C{vector_type}.
+
+    @since: 0.8.9
+    """
+    typecode, dtype = VECTOR_TYPES[vector_type]
+
+    if hasattr(n, 'dtype'):
+        return n.astype(dtype).tobytes()
+
+    if n.typecode != typecode or _LITTLE_ENDIAN:
+        n = array.array(typecode, n)
+
+    if _LITTLE_ENDIAN:
+        n.byteswap()
+
+    return n.tobytes()
+
+
+def _scan_ints(buf, pos, count, signed, marker):
+    """
+    Decodes up to C{count} integers from C{buf} starting at C{pos}. Stops
+    early at the end of C{buf} or, if C{marker} is not C{None}, at the first
+    value that is not preceded by C{marker}.
+
+    @return: A C{tuple} of the decoded values and the position following the
+        last complete value.
+    """
+    result = []
+    append = result.append
+    start = pos
+
+    try:
+        while count:
+            start = pos
+
+            if marker is not None:
+                if buf[pos] != marker:
+                    break
+
+                pos += 1
+
+            b = buf[pos]
+
+            if b < 0x80:
+                n = b
+                pos += 1
+            else:
+                b2 = buf[pos + 1]
+
+                if b2 < 0x80:
+                    n = ((b & 0x7f) << 7) | b2
+                    pos += 2
+                else:
+                    b3 = buf[pos + 2]
+
+                    if b3 < 0x80:
+                        n = ((b & 0x7f) << 14) | ((b2 & 0x7f) << 7) | b3
+                        pos += 3
+                    else:
+                        n = (
+                            ((b & 0x7f) << 22) |
+                            ((b2 & 0x7f) << 15) |
+                            ((b3 & 0x7f) << 8) |
+                            buf[pos + 3]
+                        )
+                        pos += 4
+
+                        if n & 0x10000000:
+                            if signed:
+                                n -= 0x20000000
+                            else:
+                                n = (n << 1) + 1
+
+            append(n)
+            count -= 1
+    except IndexError:
+        # incomplete value, leave it for the caller
+        pos = start
+
+    return result, pos
+
+
+def decode_ints(stream, count, signed=True, marker=None, typecode=None):
+    """
+    Decodes C{count} consecutive variable length 29-bit integers from
+    C{stream}.
+
+    If the stream provides C{getbuffer} (the pure Python streams do) the
+    bytes are scanned directly instead of being read one C{read_uchar} call
+    at a time.
+
+    @param signed: See L{decode_int}.
+    @param marker: If supplied, each integer must be preceded by this type
+        marker (e.g. L{TYPE_INTEGER}). Decoding stops at the first value that
+        is not, so fewer than C{count} values may be returned and the stream
+        is left at the start of that value.
+    @param typecode: Return an C{array.array} of this type (e.g. C{'i'})
+        instead of a C{list}.
+    @raise IOError: Fewer than C{count} integers could be read and no
+        C{marker} was supplied. The stream position is unchanged.
+    @since: 0.8.9
+    """
+    if isinstance(marker, bytes):
+        marker = marker[0]
+
+    getbuffer = getattr(stream, 'getbuffer', None)
+
+    if getbuffer is None:
+        start = stream.tell()
+        result, pos = _read_ints(stream, count, signed, marker)
+    else:
+        start = stream.tell()
+        view = getbuffer()
+
+        try:
+            result, pos = _scan_ints(view, start, count, signed, marker)
+        finally:
+            view.release()
+
+    if marker is None and len(result) < count:
+        stream.seek(start)
+
+        raise IOError(
+            'Tried to read %d integer(s) from the stream, only %d '
+            'available' % (count, len(result))
+        )
+
+    stream.seek(pos)
+
+    if typecode is not None:
+        return array.array(typecode, result)
+
+    return result
+
+
+def _read_ints(stream, count, signed, marker):
+    """
+    L{decode_ints} for streams that do not support C{getbuffer}.
+    """
+    result = []
+    pos = stream.tell()
+
+    if marker is not None:
+        marker = bytes((marker,))
+
+    for i in range(count):
+        try:
+            if marker is not None and stream.read(1) != marker:
+                break
+
+            result.append(decode_int(stream, signed))
+        except IOError:
+            break
+
+        pos = stream.tell()
+
+    return result, pos
+
 pyamf.register_class(ByteArray)
@@ -0,0 +1,338 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Benchmarks for the codec hot paths.
+
+Each benchmark is run against every available backend: the pure Python
+codecs (C{pure}) and the C extension (C{cpyamf}) if it has been built. The
+results report operations and bytes per second and can be saved as JSON to
+compare releases::
+
+    python -m pyamf.bench -o before.json
+    python -m pyamf.bench -o after.json --compare before.json
+
+@since: 0.8.9
+"""
+
+import datetime
+import json
+import platform
+import sys
+import time
+
+import pyamf
+from pyamf.util import pure
+
+
+__all__ = [
+    'Backend',
+    'Benchmark',
+    'register',
+    'get_backends',
+    'get_benchmarks',
+    'run',
+    'save',
+    'load',
+    'compare',
+]
+
+#: Registered L{Benchmark}s, in the order they were registered.
+BENCHMARKS = []
+
+#: Minimum time in seconds a single timed run should take.
+DEFAULT_MIN_TIME = 0.2
+
+#: Number of timed runs for each benchmark. The best run is reported.
+DEFAULT_REPEAT = 5
+
+
+class Backend(object):
+    """
+    A set of codec implementations to benchmark.
+
+    @ivar name: C{pure} or C{cpyamf}.
+    @ivar use_ext: Passed to L{pyamf.get_encoder}/L{pyamf.get_decoder}.
+    @ivar stream_class: The
+        L{BufferedByteStream<pyamf.util.BufferedByteStream>} implementation.
+    """
+
+    def __init__(self, name, use_ext, stream_class):
+        self.name = name
+        self.use_ext = use_ext
+        self.stream_class = stream_class
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.name)
+
+    def stream(self, data=None):
+        """
+        Returns a new stream, containing C{data} if supplied.
+        """
+        return self.stream_class(data)
+
+    def get_encoder(self, encoding, **kwargs):
+        """
+        Returns a new encoder writing to an empty stream.
+        """
+        return pyamf.get_encoder(
+            encoding,
+            stream=self.stream(),
+            use_ext=self.use_ext,
+            **kwargs
+        )
+
+    def get_decoder(self, encoding, data, **kwargs):
+        """
+        Returns a new decoder reading C{data}.
+        """
+        return pyamf.get_decoder(
+            encoding,
+            stream=self.stream(data),
+            use_ext=self.use_ext,
+            **kwargs
+        )
+
+
+class Benchmark(object):
+    """
+    A single benchmark.
+
+    @ivar name: Unique name, e.g. C{amf3.encode.object}.
+    @ivar setup: Called with a L{Backend}, returns a C{tuple} of a no argument
+        callable that performs one operation and the number of bytes that
+        operation reads or writes. An optional third item is a C{dict} of
+        extra figures (e.g. memory use) to include in the result.
+    @ivar description: Short, human readable description.
+    """
+
+    def __init__(self, name, setup, description=None):
+        self.name = name
+        self.setup = setup
+        self.description = description
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.name)
+
+    def run(self, backend, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME,
+            timer=time.perf_counter):
+        """
+        Times the benchmark against C{backend}.
+
+        The number of operations per run is calibrated so that each run takes
+        at least C{min_time} seconds, then C{repeat} runs are timed.
+
+        @rtype: C{dict}
+        """
+        setup = self.setup(backend)
+        func, size = setup[:2]
+
+        # warm up type caches etc. and check that the benchmark works
+        func()
+
+        loops = 1
+
+        while True:
+            elapsed = self._time(func, loops, timer)
+
+            if elapsed >= min_time:
+                break
+
+            if elapsed <= 0:
+                loops *= 10
+            else:
+                loops = max(loops * 2, int(loops * min_time * 1.1 / elapsed))
+
+        times = [elapsed]
+
+        for i in range(repeat - 1):
+            times.append(self._time(func, loops, timer))
+
+        best = min(times) / loops
+        ops = 1.0 / best if best > 0 else float('inf')
+
+        result = {
+            'name': self.name,
+            'backend': backend.name,
+            'loops': loops,
+            'repeat': repeat,
+            'best': best,
+            'mean': sum(times) / len(times) / loops,
+            'bytes': size,
+            'ops_per_sec': ops,
+            'bytes_per_sec': ops * size,
+        }
+
+        if len(setup) > 2:
+            result.update(setup[2])
+
+        return result
+
+    def _time(self, func, loops, timer):
+        r = range(loops)
+        start = timer()
+
+        for i in r:
+            func()
+
+        return timer() - start
+
+
+def register(name, description=None):
+    """
+    Decorator that registers a benchmark setup function (see
+    L{Benchmark.setup}) under C{name}.
+    """
+    def decorator(setup):
+        for benchmark in BENCHMARKS:
+            if benchmark.name == name:
+                raise KeyError('Benchmark %r already registered' % (name,))
+
+        BENCHMARKS.append(Benchmark(name, setup, description or setup.__doc__))
+
+        return setup
+
+    return decorator
+
+
+def get_backends(names=None):
+    """
+    Returns the available L{Backend}s. The C{cpyamf} backend is only
+    available if the extension has been built.
+
+    @param names: Only return these backends.
+    @raise ValueError: One of C{names} is unknown or not available.
+    """
+    backends = [Backend('pure', False, pure.BufferedByteStream)]
+
+    try:
+        from cpyamf import amf0, amf3  # noqa
+        from cpyamf.util import BufferedByteStream
+    except ImportError:
+        pass
+    else:
+        backends.append(Backend('cpyamf', True, BufferedByteStream))
+
+    if names is None:
+        return backends
+
+    available = dict((backend.name, backend) for backend in backends)
+    ret = []
+
+    for name in names:
+        try:
+            ret.append(available[name])
+        except KeyError:
+            raise ValueError('Backend %r is not available' % (name,))
+
+    return ret
+
+
+def get_benchmarks(patterns=None):
+    """
+    Returns the registered L{Benchmark}s, optionally only those with a name
+    containing one of C{patterns}.
+    """
+    from pyamf.bench import cases  # noqa
+
+    if not patterns:
+        return list(BENCHMARKS)
+
+    return [
+        b for b in BENCHMARKS
+        if any(pattern in b.name for pattern in patterns)
+    ]
+
+
+def run(benchmarks=None, backends=None, repeat=DEFAULT_REPEAT,
+        min_time=DEFAULT_MIN_TIME, callback=None):
+    """
+    Runs C{benchmarks} against C{backends}.
+
+    @param benchmarks: Defaults to L{get_benchmarks}.
+    @param backends: Defaults to L{get_backends}.
+    @param callback: Called with each result as it becomes available.
+    @return: A C{dict} of C{meta} data about the run and C{results}, suitable
+        for L{save}.
+    """
+    if benchmarks is None:
+        benchmarks = get_benchmarks()
+
+    if backends is None:
+        backends = get_backends()
+
+    results = []
+
+    for benchmark in benchmarks:
+        for backend in backends:
+            result = benchmark.run(backend, repeat=repeat, min_time=min_time)
+
+            results.append(result)
+
+            if callback is not None:
+                callback(result)
+
+    return {
+        'meta': {
+            'pyamf': str(pyamf.__version__),
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.utcnow().isoformat(),
+            'backends': [backend.name for backend in backends],
+            'repeat': repeat,
+            'min_time': min_time,
+        },
+        'results': results,
+    }
+
+
+def save(results, name_or_file):
+    """
+    Writes the output of L{run} to C{name_or_file} as JSON.
+    """
+    if isinstance(name_or_file, str):
+        with open(name_or_file, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, name_or_file, indent=2, sort_keys=True)
+
+
+def load(name_or_file):
+    """
+    Reads results previously written by L{save}.
+    """
+    if isinstance(name_or_file, str):
+        with open(name_or_file) as f:
+            return json.load(f)
+
+    return json.load(name_or_file)
+
+
+def compare(old, new):
+    """
+    Compares two sets of results.
+
+    @return: A C{list} of C{(name, backend, old_ops, new_ops, ratio)}
+        C{tuple}s for each benchmark present in both, where a C{ratio} above
+        1 means C{new} is faster.
+    """
+    previous = dict(
+        ((r['name'], r['backend']), r['ops_per_sec'])
+        for r in old['results']
+    )
+
+    ret = []
+
+    for result in new['results']:
+        key = (result['name'], result['backend'])
+
+        if key not in previous:
+            continue
+
+        old_ops = previous[key]
+        new_ops = result['ops_per_sec']
+
+        ret.append(key + (old_ops, new_ops, new_ops / old_ops))
+
+    return ret
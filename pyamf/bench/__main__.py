@@ -0,0 +1,116 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Command line interface for L{pyamf.bench}.
+
+@since: 0.8.9
+"""
+
+import argparse
+import sys
+
+from pyamf import bench
+
+
+def format_rate(value, unit):
+    for prefix in ('', 'k', 'M', 'G'):
+        if abs(value) < 1000:
+            break
+
+        value /= 1000.0
+
+    return '%.2f %s%s/s' % (value, prefix, unit)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pyamf.bench',
+        description='Benchmark the PyAMF codecs.'
+    )
+
+    parser.add_argument(
+        '-k', '--filter', action='append', default=[],
+        help='only run benchmarks whose name contains FILTER (may be '
+             'repeated)'
+    )
+    parser.add_argument(
+        '-b', '--backend', action='append', default=None,
+        help='backend to benchmark, pure or cpyamf (default: all available)'
+    )
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=bench.DEFAULT_REPEAT,
+        help='number of timed runs per benchmark'
+    )
+    parser.add_argument(
+        '-t', '--min-time', type=float, default=bench.DEFAULT_MIN_TIME,
+        help='minimum duration in seconds of each timed run'
+    )
+    parser.add_argument(
+        '-o', '--output', help='save the results as JSON to OUTPUT'
+    )
+    parser.add_argument(
+        '-c', '--compare', help='compare the results with a previous run'
+    )
+    parser.add_argument(
+        '-l', '--list', action='store_true',
+        help='list the benchmarks and exit'
+    )
+
+    options = parser.parse_args(args)
+
+    benchmarks = bench.get_benchmarks(options.filter)
+
+    if options.list:
+        for benchmark in benchmarks:
+            sys.stdout.write('%-28s %s\n' % (
+                benchmark.name, benchmark.description
+            ))
+
+        return 0
+
+    try:
+        backends = bench.get_backends(options.backend)
+    except ValueError as e:
+        sys.stderr.write('error: %s\n' % (e,))
+
+        return 1
+
+    def report(result):
+        sys.stdout.write('%-28s %-7s %16s %16s\n' % (
+            result['name'],
+            result['backend'],
+            format_rate(result['ops_per_sec'], 'ops'),
+            format_rate(result['bytes_per_sec'], 'B'),
+        ))
+        sys.stdout.flush()
+
+    results = bench.run(
+        benchmarks,
+        backends,
+        repeat=options.repeat,
+        min_time=options.min_time,
+        callback=report
+    )
+
+    if options.output:
+        bench.save(results, options.output)
+
+    if options.compare:
+        sys.stdout.write('\n')
+
+        for name, backend, old, new, ratio in bench.compare(
+                bench.load(options.compare), results):
+            sys.stdout.write('%-28s %-7s %16s %16s %7.2fx\n' % (
+                name,
+                backend,
+                format_rate(old, 'ops'),
+                format_rate(new, 'ops'),
+                ratio
+            ))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
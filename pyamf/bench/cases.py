@@ -0,0 +1,358 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+The benchmarks run by L{pyamf.bench}.
+
+@since: 0.8.9
+"""
+
+import array
+import datetime
+import sys
+
+import pyamf
+from pyamf import amf3, remoting, scan, sol
+from pyamf.bench import register
+from pyamf.flex import ArrayCollection, messaging
+
+
+class Record(object):
+    """
+    A typed object with a handful of static attributes.
+    """
+
+    class __amf__:
+        static = ('id', 'name', 'price', 'active', 'created')
+
+    def __init__(self, id=None, name=None, price=None, active=None,
+                 created=None):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.active = active
+        self.created = created
+
+
+pyamf.register_class(Record, 'pyamf.bench.Record')
+
+
+def get_primitives(count=1000):
+    ret = []
+
+    for i in range(count // 4):
+        ret.extend([i, i * 0.5, i % 2 == 0, None])
+
+    return ret
+
+
+def get_strings(count=1000, distinct=50):
+    return [u'string value %d' % (i % distinct,) for i in range(count)]
+
+
+def get_records(count=500):
+    created = datetime.datetime(2010, 1, 1)
+
+    return [
+        Record(i, u'record %d' % (i,), i * 1.25, i % 3 == 0, created)
+        for i in range(count)
+    ]
+
+
+def get_tree(count=500):
+    """
+    Typed objects and dicts without any shared references.
+    """
+    ret = []
+
+    for i in range(count):
+        record = Record(
+            i,
+            u'record %d' % (i,),
+            i * 1.25,
+            i % 3 == 0,
+            datetime.datetime(2010, 1, 1, 0, 0, i % 60)
+        )
+        ret.append({u'record': record, u'tags': [u'a', u'b']})
+
+    return ret
+
+
+def get_dicts(count=500):
+    return [
+        {u'id': i, u'name': u'item %d' % (i,), u'tags': [u'a', u'b']}
+        for i in range(count)
+    ]
+
+
+def get_envelope(encoding=pyamf.AMF3):
+    msg = remoting.Envelope(encoding)
+    body = messaging.RemotingMessage(
+        destination=u'catalog',
+        operation=u'getRecords',
+        body=[ArrayCollection(get_records(100))],
+        headers={u'DSEndpoint': u'amf'}
+    )
+
+    msg['/1'] = remoting.Request(u'null', [body])
+    msg['/2'] = remoting.Request(u'catalog.getDicts', [get_dicts(100)])
+
+    return msg
+
+
+def encode_case(encoding, value, **kwargs):
+    """
+    Returns a setup function that benchmarks encoding C{value}. C{kwargs} are
+    passed to the encoder.
+    """
+    def setup(backend):
+        encoder = backend.get_encoder(encoding, **kwargs)
+        encoder.writeElement(value)
+        size = len(encoder.stream.getvalue())
+
+        def func():
+            backend.get_encoder(encoding, **kwargs).writeElement(value)
+
+        return func, size
+
+    return setup
+
+
+def decode_case(encoding, value):
+    """
+    Returns a setup function that benchmarks decoding the encoded C{value}.
+    """
+    def setup(backend):
+        encoder = backend.get_encoder(encoding)
+        encoder.writeElement(value)
+        data = encoder.stream.getvalue()
+
+        def func():
+            backend.get_decoder(encoding, data).readElement()
+
+        return func, len(data)
+
+    return setup
+
+
+def add_codec_cases(name, value, description, encodings=pyamf.ENCODING_TYPES):
+    for encoding in encodings:
+        prefix = 'amf%d' % (encoding,)
+
+        register(
+            '%s.encode.%s' % (prefix, name),
+            'Encode %s' % (description,)
+        )(encode_case(encoding, value))
+
+        register(
+            '%s.decode.%s' % (prefix, name),
+            'Decode %s' % (description,)
+        )(decode_case(encoding, value))
+
+
+@register('stream.write_double', 'Write 1000 doubles')
+def stream_write_double(backend):
+    values = [i * 1.5 for i in range(1000)]
+
+    def func():
+        write = backend.stream().write_double
+
+        for v in values:
+            write(v)
+
+    return func, 8000
+
+
+@register('stream.read_double', 'Read 1000 doubles')
+def stream_read_double(backend):
+    stream = backend.stream()
+
+    for i in range(1000):
+        stream.write_double(i * 1.5)
+
+    data = stream.getvalue()
+    r = range(1000)
+
+    def func():
+        read = backend.stream(data).read_double
+
+        for i in r:
+            read()
+
+    return func, len(data)
+
+
+def get_int_table_size():
+    table = amf3.get_encoded_int_table()
+
+    return sys.getsizeof(table) + sum(sys.getsizeof(x) for x in table)
+
+
+def int_case(values, bulk=False):
+    """
+    Returns a setup function that benchmarks encoding C{values} as 29-bit
+    integers, one at a time or with L{amf3.encode_ints}.
+    """
+    def setup(backend):
+        size = len(amf3.encode_ints(values))
+        extra = {'table_bytes': get_int_table_size()}
+
+        if bulk:
+            def func():
+                amf3.encode_ints(values)
+        else:
+            def func():
+                encode_int = amf3.encode_int
+
+                for n in values:
+                    encode_int(n)
+
+        return func, size, extra
+
+    return setup
+
+
+register(
+    'amf3.encode_int.small', 'Encode 1000 ints in the precomputed range'
+)(int_case(list(range(-100, 900))))
+register(
+    'amf3.encode_int.large', 'Encode 1000 ints outside the precomputed range'
+)(int_case(list(range(0x100000, 0x100000 + 1000 * 997, 997))))
+register(
+    'amf3.encode_ints', 'Encode 1000 ints in one call'
+)(int_case(list(range(-100, 900)), bulk=True))
+
+add_codec_cases(
+    'primitives', get_primitives(), 'a list of 1000 ints, floats, bools and '
+    'None'
+)
+add_codec_cases(
+    'strings', get_strings(), 'a list of 1000 strings with 50 distinct values'
+)
+add_codec_cases('objects', get_records(), 'a list of 500 typed objects')
+add_codec_cases('dicts', get_dicts(), 'a list of 500 dicts')
+add_codec_cases(
+    'mixed_array',
+    [pyamf.MixedArray((u'key%d' % (i,), i) for i in range(50))] * 20,
+    'a list of 20 mixed arrays with 50 keys (readMixedArray)',
+    encodings=(pyamf.AMF0,)
+)
+
+for encoding in pyamf.ENCODING_TYPES:
+    prefix = 'amf%d.encode.tree' % (encoding,)
+    value = get_tree()
+
+    register(
+        prefix, 'Encode a tree of 500 typed objects and dicts'
+    )(encode_case(encoding, value))
+    register(
+        prefix + '.no_references',
+        'Encode a tree of 500 typed objects and dicts with references=none'
+    )(encode_case(encoding, value, references='none'))
+
+add_codec_cases(
+    'int_array', list(range(-5000, 5000)), 'a list of 10000 ints',
+    encodings=(pyamf.AMF3,)
+)
+add_codec_cases(
+    'vector_double', array.array('d', [i * 0.5 for i in range(10000)]),
+    'an array.array of 10000 doubles (Vector.<Number>)',
+    encodings=(pyamf.AMF3,)
+)
+add_codec_cases(
+    'float_list', [i * 0.5 for i in range(10000)], 'a list of 10000 floats',
+    encodings=(pyamf.AMF3,)
+)
+add_codec_cases(
+    'array_collection', ArrayCollection(get_dicts()),
+    'an ArrayCollection of 500 dicts', encodings=(pyamf.AMF3,)
+)
+
+
+@register('remoting.encode', 'Encode an AMF3 remoting envelope')
+def remoting_encode(backend):
+    msg = get_envelope()
+    size = len(remoting.encode(msg, use_ext=backend.use_ext).getvalue())
+
+    def func():
+        remoting.encode(msg, use_ext=backend.use_ext)
+
+    return func, size
+
+
+@register(
+    'raw.encode',
+    'Encode an AMF3 remoting response with pre-encoded (pyamf.RawAMF) bodies'
+)
+def raw_encode(backend):
+    msg = remoting.Envelope(pyamf.AMF3)
+    msg['/1'] = remoting.Response(remoting.encode_body(
+        ArrayCollection(get_records(100)), pyamf.AMF3
+    ))
+    msg['/2'] = remoting.Response(remoting.encode_body(
+        get_dicts(100), pyamf.AMF3
+    ))
+    size = len(remoting.encode(msg, use_ext=backend.use_ext).getvalue())
+
+    def func():
+        remoting.encode(msg, use_ext=backend.use_ext)
+
+    return func, size
+
+
+@register('remoting.decode', 'Decode an AMF3 remoting envelope')
+def remoting_decode(backend):
+    data = remoting.encode(get_envelope()).getvalue()
+
+    def func():
+        remoting.decode(data, use_ext=backend.use_ext)
+
+    return func, len(data)
+
+
+@register(
+    'amf3.lazy.envelope',
+    'Decode an AMF3 remoting envelope lazily and read the message targets'
+)
+def remoting_decode_lazy(backend):
+    data = remoting.encode(get_envelope()).getvalue()
+
+    def func():
+        msg = remoting.decode(data, use_ext=False, lazy=True)
+        message = msg['/1'].body[0]
+
+        return message['destination'], message['operation']
+
+    return func, len(data)
+
+
+@register('scan.envelope', 'Walk an AMF3 remoting envelope with pyamf.scan')
+def scan_envelope(backend):
+    data = remoting.encode(get_envelope()).getvalue()
+
+    def func():
+        scan.scan_envelope(data)
+
+    return func, len(data)
+
+
+@register('sol.encode', 'Encode a local shared object')
+def sol_encode(backend):
+    values = {u'records': get_dicts(200), u'strings': get_strings(200)}
+    data = sol.encode(u'bench', values, use_ext=backend.use_ext).getvalue()
+
+    def func():
+        sol.encode(u'bench', values, use_ext=backend.use_ext)
+
+    return func, len(data)
+
+
+@register('sol.decode', 'Decode a local shared object')
+def sol_decode(backend):
+    values = {u'records': get_dicts(200), u'strings': get_strings(200)}
+    data = sol.encode(u'bench', values).getvalue()
+
+    def func():
+        sol.decode(data, use_ext=backend.use_ext)
+
+    return func, len(data)
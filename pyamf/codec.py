@@ -7,15 +7,21 @@ Provides basic functionality for all pyamf.amf?.[De|E]ncoder classes.
 
 import types
 import datetime
+import threading
+import contextlib
 
 import pyamf
 from pyamf import util, python, xml
 
 __all__ = [
     'IndexedCollection',
+    'ValueReferenceCollection',
+    'NullReferenceCollection',
+    'ListReferenceCollection',
     'Context',
     'Decoder',
-    'Encoder'
+    'Encoder',
+    'CodecPool'
 ]
 
 
@@ -85,6 +91,44 @@ class IndexedCollection(object):
 
         return idx
 
+    def skip(self, count):
+        """
+        Reserves the next C{count} references for objects that are never
+        referenced again, e.g. those within a L{pyamf.RawAMF}.
+
+        @since: 0.8.9
+        """
+        self.list.extend([None] * count)
+
+    def replace(self, ref, obj):
+        """
+        Puts C{obj} in the place of the object referenced by C{ref}.
+
+        @since: 0.8.9
+        """
+        h = self.func(self.list[ref])
+
+        if self.dict.get(h, -1) == ref:
+            del self.dict[h]
+
+        self.list[ref] = obj
+        self.dict[self.func(obj)] = ref
+
+    def truncate(self, size):
+        """
+        Drops every object referenced at or after index C{size}.
+
+        @since: 0.8.9
+        """
+        removed = self.list[size:]
+        del self.list[size:]
+
+        for obj in removed:
+            h = self.func(obj)
+
+            if self.dict.get(h, -1) >= size:
+                del self.dict[h]
+
     def __eq__(self, other):
         if isinstance(other, list):
             return self.list == other
@@ -113,6 +157,178 @@ class IndexedCollection(object):
             id(self))
 
 
+#: The types that L{ValueReferenceCollection} compares by value, as long as
+#: they are not subclassed. C{tuple}s (and C{frozenset}s) are too if all of
+#: their items are.
+#: @since: 0.8.9
+VALUE_TYPES = frozenset(python.str_types + python.int_types + (
+    bool,
+    float,
+    type(None),
+    datetime.date,
+    datetime.datetime,
+    datetime.time,
+))
+
+
+def _get_value_key(obj):
+    """
+    Returns the key that L{ValueReferenceCollection} looks C{obj} up by, or
+    C{None} if it is referenced by identity.
+
+    The type of each value is part of the key so that values that are equal
+    but encode differently (e.g. C{1}, C{1.0} and C{True}) do not share a
+    reference.
+    """
+    t = type(obj)
+
+    if t is tuple or t is frozenset:
+        keys = []
+
+        for item in obj:
+            key = _get_value_key(item)
+
+            if key is None:
+                return None
+
+            keys.append(key)
+
+        if t is frozenset:
+            return (t, frozenset(keys))
+
+        return (t, tuple(keys))
+
+    if t is float:
+        # 0.0 == -0.0
+        return (t, obj.hex())
+
+    if t in VALUE_TYPES:
+        return (t, obj)
+
+    return None
+
+
+class ValueReferenceCollection(IndexedCollection):
+    """
+    References objects by value: equal immutable builtin objects (e.g.
+    C{tuple}s of numbers and strings, C{datetime}s) of the same type share a
+    reference, see L{VALUE_TYPES}. All other objects, such as C{list}s,
+    C{dict}s and class instances, are referenced by identity.
+
+    @since: 0.8.9
+    """
+
+    def clear(self):
+        IndexedCollection.clear(self)
+
+        self.ids = {}
+
+    def getReferenceTo(self, obj):
+        key = _get_value_key(obj)
+
+        if key is None:
+            return self.ids.get(id(obj), -1)
+
+        return self.dict.get(key, -1)
+
+    def append(self, obj):
+        self.list.append(obj)
+        idx = len(self.list) - 1
+        key = _get_value_key(obj)
+
+        if key is None:
+            self.ids[id(obj)] = idx
+        else:
+            self.dict[key] = idx
+
+        return idx
+
+    def truncate(self, size):
+        removed = self.list[size:]
+        del self.list[size:]
+
+        for obj in removed:
+            key = _get_value_key(obj)
+
+            if key is None:
+                if self.ids.get(id(obj), -1) >= size:
+                    del self.ids[id(obj)]
+            elif self.dict.get(key, -1) >= size:
+                del self.dict[key]
+
+
+class NullReferenceCollection(IndexedCollection):
+    """
+    Holds no references at all, every object is written in full each time
+    it is encoded. Nothing is kept alive by the collection.
+
+    @since: 0.8.9
+    """
+
+    def getReferenceTo(self, obj):
+        return -1
+
+    def append(self, obj):
+        return -1
+
+    def skip(self, count):
+        pass
+
+    def truncate(self, size):
+        pass
+
+
+class ListReferenceCollection(IndexedCollection):
+    """
+    Looks objects up by reference only, as a decoder does, so unlike
+    L{IndexedCollection} it does not keep a lookup of object -> reference.
+    L{getReferenceTo} has to search the whole collection.
+
+    @since: 0.8.9
+    """
+
+    def getReferenceTo(self, obj):
+        for idx, o in enumerate(self.list):
+            if o is obj:
+                return idx
+
+        return -1
+
+    def append(self, obj):
+        self.list.append(obj)
+
+        return len(self.list) - 1
+
+    def replace(self, ref, obj):
+        self.list[ref] = obj
+
+    def truncate(self, size):
+        del self.list[size:]
+
+
+def _no_reference(obj):
+    return -1
+
+
+#: Maps the C{references} encoder option to the collection that holds the
+#: object references:
+#:
+#:  - C{identity}: an object written twice is referenced the second time
+#:    (the default).
+#:  - C{value}: equal immutable builtin objects of the same type are
+#:    referenced too (see L{ValueReferenceCollection}).
+#:  - C{none}: nothing is referenced. Only suitable for tree shaped data, an
+#:    object graph with a cycle cannot be encoded (see the C{detect_cycles}
+#:    encoder option).
+#:
+#: @since: 0.8.9
+REFERENCE_TYPES = {
+    'identity': IndexedCollection,
+    'value': ValueReferenceCollection,
+    'none': NullReferenceCollection,
+}
+
+
 class ByteStringReferenceCollection(IndexedCollection):
     """
     There have been rare hash collisions within a single AMF payload causing
@@ -136,6 +352,14 @@ class ByteStringReferenceCollection(IndexedCollection):
 
         return idx
 
+    def truncate(self, size):
+        removed = self.list[size:]
+        del self.list[size:]
+
+        for byte_string in removed:
+            if self.dict.get(byte_string, -1) >= size:
+                del self.dict[byte_string]
+
 
 class Context(object):
     """
@@ -176,6 +400,46 @@ class Context(object):
         self._unicodes = {}
         self.extra = {}
 
+    def checkpoint(self):
+        """
+        Returns an opaque marker of the references held by this context, see
+        L{rollback}.
+
+        @since: 0.8.9
+        """
+        return len(self._objects)
+
+    def rollback(self, checkpoint):
+        """
+        Forgets any references added since C{checkpoint} was taken. Used to
+        retry decoding an element that was cut short.
+
+        @since: 0.8.9
+        """
+        self._objects.truncate(checkpoint)
+
+    def setReferences(self, references):
+        """
+        Sets how objects encoded more than once are referenced. Clears the
+        object references.
+
+        @param references: One of L{REFERENCE_TYPES}.
+        @raise ValueError: Unknown C{references}.
+        @since: 0.8.9
+        """
+        try:
+            klass = REFERENCE_TYPES[references]
+        except (KeyError, TypeError):
+            raise ValueError('Unknown references %r (expected one of %s)' % (
+                references, ', '.join(sorted(REFERENCE_TYPES))))
+
+        self._objects = klass()
+
+        if references == 'none':
+            # skip the method calls on the hot path
+            self.getObjectReference = _no_reference
+            self.addObject = _no_reference
+
     def getObject(self, ref):
         """
         Gets an object based on a reference.
@@ -203,6 +467,15 @@ class Context(object):
         """
         return self._objects.append(obj)
 
+    def skipObjects(self, count):
+        """
+        Accounts for C{count} objects that were written without being added
+        to the context, see L{pyamf.RawAMF}.
+
+        @since: 0.8.9
+        """
+        self._objects.skip(count)
+
     def getClassAlias(self, klass):
         """
         Gets a class alias based on the supplied C{klass}. If one is not found
@@ -317,6 +590,9 @@ class Decoder(_Codec):
     Supports an generator interface. Feed the decoder data using L{send} and
     get Python objects out by using L{next}.
 
+    Also works as a push parser for data that arrives in chunks, see L{feed},
+    L{events} and L{elements}.
+
     @ivar strict: Defines how strict the decoding should be. For the time
         being this relates to typed objects in the stream that do not have a
         registered alias. Introduced in 0.4.
@@ -327,6 +603,13 @@ class Decoder(_Codec):
         _Codec.__init__(self, *args, **kwargs)
 
         self.__depth = 0
+        self._resetPushState()
+
+    def _resetPushState(self):
+        self._push_closed = False
+        # the number of buffered bytes of a partial element that must be
+        # available before decoding it is attempted again.
+        self._push_wait = 0
 
     def send(self, data):
         """
@@ -334,6 +617,115 @@ class Decoder(_Codec):
         """
         self.stream.append(data)
 
+    def feed(self, data):
+        """
+        Push a chunk of data into the decoder. Elements are decoded as they
+        become complete when iterating over L{events} or L{elements}.
+
+        @since: 0.8.9
+        """
+        if self._push_closed:
+            raise pyamf.DecodeError('Cannot feed a closed decoder')
+
+        if isinstance(self.stream, util.ReadOnlyByteStream):
+            # appending to a read only stream copies it every time
+            self.stream = util.BufferedByteStream(self.stream)
+
+        self.stream.append(data)
+
+    def close(self):
+        """
+        Signals that no more data will be fed to the decoder. Any partial
+        element left in the buffer is then reported as an error by L{events}.
+
+        @since: 0.8.9
+        """
+        self._push_closed = True
+
+    def events(self):
+        """
+        A generator that decodes the complete elements fed to the decoder.
+        Yields C{(event, value)} tuples:
+
+         - C{('element', obj)} for each decoded element.
+         - C{('need-data', size)} when the buffer runs out, C{size} being the
+           number of bytes held for a partial element. Iteration stops and can
+           be resumed after the next L{feed}.
+         - C{('end', None)} once the decoder is L{closed<close>} and all data
+           has been decoded.
+
+        Reference tables are rolled back when an element is cut short, so
+        decoding it again after the next chunk is safe. To keep the cost of
+        these retries linear, a partial element is only attempted again once
+        the data buffered for it has doubled, or the decoder is closed.
+
+        @raise DecodeError: The decoder was closed with a partial element in
+            the buffer.
+        @since: 0.8.9
+        """
+        while True:
+            stream = self.stream
+            start = stream.tell()
+            pending = len(stream) - start
+
+            if pending == 0:
+                self._compact()
+
+                if self._push_closed:
+                    yield 'end', None
+                else:
+                    yield 'need-data', 0
+
+                return
+
+            if pending < self._push_wait and not self._push_closed:
+                yield 'need-data', pending
+
+                return
+
+            checkpoint = self.context.checkpoint()
+
+            try:
+                element = self.readElement()
+            except (IOError, pyamf.EOStream):
+                self.context.rollback(checkpoint)
+                stream.seek(start)
+
+                if self._push_closed:
+                    raise pyamf.DecodeError(
+                        'Stream closed with %d bytes of a partial element' % (
+                            pending,))
+
+                self._push_wait = pending * 2
+                self._compact()
+
+                yield 'need-data', pending
+
+                return
+
+            self._push_wait = 0
+
+            yield 'element', element
+
+    def elements(self):
+        """
+        A generator of the elements that can be decoded from the data fed so
+        far. See L{events}.
+
+        @since: 0.8.9
+        """
+        for event, value in self.events():
+            if event == 'element':
+                yield value
+
+    def _compact(self):
+        """
+        Drops the data that has already been decoded from the buffer.
+        """
+        if self.stream.tell() and not isinstance(
+                self.stream, util.ReadOnlyByteStream):
+            self.stream.consume()
+
     def __next__(self):
         """
         Part of the iterator protocol.
@@ -430,6 +822,51 @@ class _CustomTypeFunc(object):
             self.encoder.writeElement(ret)
 
 
+def get_custom_type(data):
+    """
+    Returns the L{pyamf.TYPE_MAP} function for C{data}, or C{None}.
+
+    The classes of C{data} are looked up in method resolution order first so
+    the most specific class wins, as with C{functools.singledispatch}. If none
+    of them are registered, every entry is tried in turn (matching
+    C{isinstance} checks that do not follow the MRO, tuples of classes and
+    predicates).
+
+    @return: A C{tuple} of the function and whether the result depends only
+        on the type of C{data}. This is C{False} if a predicate had to be
+        called to decide.
+    @since: 0.8.9
+    """
+    type_map = pyamf.TYPE_MAP
+
+    if not type_map:
+        return None, True
+
+    for klass in type(data).__mro__:
+        func = type_map.get(klass, _MISSING)
+
+        if func is not _MISSING:
+            return func, True
+
+    static = True
+
+    for type_, func in list(type_map.items()):
+        try:
+            if isinstance(data, type_):
+                return func, static
+        except TypeError:
+            if python.callable(type_):
+                static = False
+
+                if type_(data):
+                    return func, static
+
+    return None, static
+
+
+_MISSING = object()
+
+
 class Encoder(_Codec):
     """
     Base AMF encoder.
@@ -440,12 +877,31 @@ class Encoder(_Codec):
 
     The encoder also supports an generator interface. Feed the encoder Python
     object using L{send} and get AMF bytes out using L{next}.
+
+    @ivar references: How objects that are encoded more than once are
+        referenced, one of L{REFERENCE_TYPES}. Defaults to C{identity}.
+    @ivar detect_cycles: Only used when L{references} is C{none}. Raise
+        L{pyamf.EncodeError} when an object contains itself instead of
+        recursing until the stack runs out. This slows encoding down and is
+        meant for debugging.
     """
 
     def __init__(self, *args, **kwargs):
+        self.references = kwargs.pop('references', 'identity')
+        self.detect_cycles = kwargs.pop('detect_cycles', False)
+
         _Codec.__init__(self, *args, **kwargs)
 
         self.bucket = []
+        self._static_type = True
+        self._type_generation = pyamf.TYPE_GENERATION
+
+        if self.references != 'identity':
+            self.context.setReferences(self.references)
+
+        if self.detect_cycles and self.references == 'none':
+            self._writing = set()
+            self.writeElement = self._writeElementChecked
 
     def _write_type(self, obj, **kwargs):
         """
@@ -525,17 +981,19 @@ class Encoder(_Codec):
             return self.writeUndefined
         elif t in (datetime.date, datetime.datetime, datetime.time):
             return self.writeDate
+        elif t is pyamf.RawAMF:
+            return self.writeRawAMF
         elif xml.is_xml(data):
             return self.writeXML
 
         # check for any overridden types
-        for type_, func in list(pyamf.TYPE_MAP.items()):
-            try:
-                if isinstance(data, type_):
-                    return _CustomTypeFunc(self, func)
-            except TypeError:
-                if python.callable(type_) and type_(data):
-                    return _CustomTypeFunc(self, func)
+        func, static = get_custom_type(data)
+
+        if not static:
+            self._static_type = False
+
+        if func is not None:
+            return _CustomTypeFunc(self, func)
 
         if isinstance(data, (list, tuple, frozenset)):
             return self.writeSequence
@@ -565,7 +1023,7 @@ class Encoder(_Codec):
         try:
             func = self._func_cache[key]
         except KeyError:
-            func = self.getTypeFunc(data)
+            func = self._resolveTypeFunc(data)
 
             if func is None:
                 raise pyamf.EncodeError('Unable to encode %r (type %r)' % (
@@ -575,6 +1033,88 @@ class Encoder(_Codec):
 
         func(data)
 
+    def _writeElementChecked(self, data):
+        """
+        L{writeElement} that keeps track of the objects being written, see
+        L{detect_cycles}.
+        """
+        key = id(data)
+
+        if key in self._writing:
+            raise pyamf.EncodeError(
+                '%r contains itself, a cycle cannot be encoded with '
+                'references=%r' % (data, self.references)
+            )
+
+        self._writing.add(key)
+
+        try:
+            self.__class__.writeElement(self, data)
+        finally:
+            self._writing.discard(key)
+
+    def getDispatchKey(self):
+        """
+        Returns a hashable value that, together with the type of an object,
+        determines what L{getTypeFunc} returns for it. Encoders that share a
+        dispatch key share resolved type functions through
+        L{pyamf.TYPE_FUNC_CACHE}.
+
+        Subclasses whose L{getTypeFunc} depends on instance state should
+        include that state.
+
+        @since: 0.8.9
+        """
+        return self.__class__
+
+    def refreshTypeFuncs(self):
+        """
+        Discards the type functions this encoder has resolved if the types or
+        classes known to PyAMF have changed since (see L{pyamf.add_type} and
+        L{pyamf.register_class}). Long lived encoders should call this before
+        they are reused.
+
+        @since: 0.8.9
+        """
+        if self._type_generation == pyamf.TYPE_GENERATION:
+            return
+
+        self._func_cache = {}
+        self._type_generation = pyamf.TYPE_GENERATION
+
+    def _resolveTypeFunc(self, data):
+        """
+        Returns the type function for C{data}, resolving it with L{getTypeFunc}
+        only the first time its type is seen in this process.
+        """
+        cache = pyamf.TYPE_FUNC_CACHE
+        key = (self.getDispatchKey(), type(data))
+
+        try:
+            kind, func = cache[key]
+        except KeyError:
+            pass
+        else:
+            if kind is _CustomTypeFunc:
+                return _CustomTypeFunc(self, func)
+
+            return types.MethodType(func, self)
+
+        self._static_type = True
+
+        func = self.getTypeFunc(data)
+
+        if not self._static_type or func is None:
+            return func
+
+        if isinstance(func, _CustomTypeFunc):
+            if func.encoder is self:
+                cache[key] = (_CustomTypeFunc, func.func)
+        elif getattr(func, '__self__', None) is self:
+            cache[key] = (types.MethodType, func.__func__)
+
+        return func
+
     def send(self, element):
         self.bucket.append(element)
 
@@ -596,3 +1136,160 @@ class Encoder(_Codec):
 
     def __iter__(self):
         return self
+
+
+class CodecPool(object):
+    """
+    A thread-safe pool of reusable encoders/decoders for one AMF encoding.
+
+    Building a codec means building a context, its reference collections, a
+    type function cache and a stream. The pool keeps released codecs around
+    so that the next caller gets one whose type function cache is already
+    warm. On release the context is cleared and the codec is given a fresh,
+    empty stream (the old stream may still be in use by the caller). On
+    acquire an encoder discards its type function cache if types were added
+    or classes registered in the meantime (see L{Encoder.refreshTypeFuncs}).
+
+    Codecs are grouped by the keyword arguments used to build them, so a
+    codec built with C{strict=True} is never handed to a caller asking for
+    C{strict=False}. Unhashable keyword arguments bypass the pool entirely.
+
+    An example::
+
+        pool = pyamf.codec_pool(pyamf.AMF3)
+
+        with pool.encoder() as encoder:
+            encoder.writeElement(obj)
+            data = encoder.stream.getvalue()
+
+    @ivar encoding: The AMF encoding of the pooled codecs.
+    @ivar max_size: The maximum number of idle codecs kept per kind.
+    @see: L{pyamf.codec_pool}
+    @since: 0.8.9
+    """
+
+    def __init__(self, encoding, use_ext=None, max_size=16):
+        self.encoding = encoding
+        self.use_ext = use_ext
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._in_use = {}
+
+    def _getKey(self, kind, kwargs):
+        key = (kind, tuple(sorted(kwargs.items())))
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def _acquire(self, kind, factory, kwargs):
+        key = self._getKey(kind, kwargs)
+        codec = None
+
+        if key is not None:
+            with self._lock:
+                idle = self._idle.get(key, None)
+
+                if idle:
+                    codec = idle.pop()
+
+        if codec is None:
+            codec = factory(self.encoding, use_ext=self.use_ext, **kwargs)
+        elif kind == 'encoder':
+            # types may have been added or classes registered while the
+            # encoder was idle
+            codec.refreshTypeFuncs()
+
+        if key is not None:
+            with self._lock:
+                self._in_use[id(codec)] = key
+
+        return codec
+
+    def acquireEncoder(self, **kwargs):
+        """
+        Returns an encoder from the pool, building one if none are idle.
+
+        @param kwargs: Passed to L{pyamf.get_encoder} if a new encoder needs
+            to be built.
+        """
+        return self._acquire('encoder', pyamf.get_encoder, kwargs)
+
+    def acquireDecoder(self, stream=None, **kwargs):
+        """
+        Returns a decoder from the pool that will read from C{stream}.
+
+        @param kwargs: Passed to L{pyamf.get_decoder} if a new decoder needs
+            to be built.
+        """
+        decoder = self._acquire('decoder', pyamf.get_decoder, kwargs)
+        stream = util.get_read_stream(stream)
+
+        decoder.stream = stream
+
+        return decoder
+
+    def release(self, codec):
+        """
+        Resets C{codec} and returns it to the pool. Codecs that were not
+        handed out by this pool are ignored.
+        """
+        with self._lock:
+            key = self._in_use.pop(id(codec), None)
+
+        if key is None:
+            return
+
+        codec.context.clear()
+        codec.stream = util.BufferedByteStream()
+
+        if key[0] == 'encoder':
+            codec.bucket = []
+        elif isinstance(codec, Decoder):
+            codec._resetPushState()
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+
+            if len(idle) < self.max_size:
+                idle.append(codec)
+
+    @contextlib.contextmanager
+    def encoder(self, **kwargs):
+        """
+        A context manager that acquires an encoder and releases it on exit.
+        """
+        codec = self.acquireEncoder(**kwargs)
+
+        try:
+            yield codec
+        finally:
+            self.release(codec)
+
+    @contextlib.contextmanager
+    def decoder(self, stream=None, **kwargs):
+        """
+        A context manager that acquires a decoder and releases it on exit.
+        """
+        codec = self.acquireDecoder(stream, **kwargs)
+
+        try:
+            yield codec
+        finally:
+            self.release(codec)
+
+    def clear(self):
+        """
+        Drops all idle codecs.
+        """
+        with self._lock:
+            self._idle = {}
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(x) for x in self._idle.values())
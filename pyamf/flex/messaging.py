@@ -12,6 +12,7 @@ This module contains the message classes used with Flex Data Services.
 @since: 0.1
 """
 
+import inspect
 import uuid
 
 import pyamf.util
@@ -102,13 +103,6 @@ class AbstractMessage(object):
         ['clientId', 'messageId']
     ))
 
-    def __new__(cls, *args, **kwargs):
-        obj = object.__new__(cls)
-
-        obj.__init__(*args, **kwargs)
-
-        return obj
-
     def __init__(self, *args, **kwargs):
         self.body = kwargs.get('body', None)
         self.clientId = kwargs.get('clientId', None)
@@ -564,6 +558,67 @@ def read_flags(input):
     return flags
 
 
+def _init_needs_args(klass):
+    """
+    Whether C{klass.__init__} has parameters without defaults (other than
+    C{self}).
+    """
+    try:
+        params = list(inspect.signature(klass.__init__).parameters.values())
+    except (TypeError, ValueError):
+        return True
+
+    for param in params[1:]:
+        if param.default is not param.empty:
+            continue
+
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+
+        return True
+
+    return False
+
+
+class MessageAlias(pyamf.ClassAlias):
+    """
+    Creates decoded messages by calling the class so that the attributes
+    missing from the stream (e.g. in a small message) have their defaults.
+
+    Subclasses whose C{__init__} requires arguments cannot be called like
+    this, instances of them are created without calling C{__init__} and
+    get their defaults from the C{__init__} of the nearest base class that
+    can be called without arguments instead.
+
+    @since: 0.8.9
+    """
+
+    #: The class whose C{__init__} is called on new instances, C{None} until
+    #: the first instance is created.
+    init_class = None
+
+    def createInstance(self, codec=None):
+        init_class = self.init_class
+
+        if init_class is None:
+            init_class = self.init_class = self._getInitClass()
+
+        if init_class is self.klass:
+            return self.klass()
+
+        obj = self.klass.__new__(self.klass)
+        init_class.__init__(obj)
+
+        return obj
+
+    def _getInitClass(self):
+        for klass in self.klass.__mro__:
+            if not _init_needs_args(klass):
+                return klass
+
+        return object
+
+
 def decode_uuid(obj):
     """
     Decode a L{ByteArray} contents to a C{uuid.UUID} instance.
@@ -573,6 +628,7 @@ def decode_uuid(obj):
     return uuid.UUID(bytes=bytes(obj))
 
 
+pyamf.register_alias_type(MessageAlias, AbstractMessage)
 pyamf.register_package(globals(), package=NAMESPACE)
 pyamf.register_class(AcknowledgeMessageExt, 'DSK')
 pyamf.register_class(CommandMessageExt, 'DSC')
@@ -11,6 +11,7 @@ except ImportError:
     import builtins
 
 
+import mmap
 import types
 
 func_types = (
@@ -27,6 +28,9 @@ except:
     pass
 
 
+#: Types that can be read from without copying.
+buffer_types = (bytes, bytearray, memoryview, mmap.mmap)
+
 int_types = tuple(int_types)
 str_types = tuple(str_types)
 class_types = tuple(class_types)
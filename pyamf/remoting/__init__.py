@@ -27,10 +27,13 @@ essential for the Adobe Flash Player to understand the response therefore.
 """
 
 import pyamf
-from pyamf import util
+from pyamf import util, python, scan
 
 
-__all__ = ['Envelope', 'Request', 'Response', 'decode', 'encode']
+__all__ = [
+    'Envelope', 'Request', 'Response', 'decode', 'encode', 'encode_body',
+    'encode_iter'
+]
 
 #: Succesful call.
 STATUS_OK = 0
@@ -49,6 +52,9 @@ STATUS_CODES = {
 #: AMF mimetype.
 CONTENT_TYPE = 'application/x-amf'
 
+#: Default size of the chunks produced by L{encode_iter}.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
 ERROR_CALL_FAILED, = range(1)
 ERROR_CODES = {
     ERROR_CALL_FAILED: 'Server.Call.Failed'
@@ -176,8 +182,6 @@ class Envelope(object):
         for body in self.bodies:
             yield body[0], body[1]
 
-        raise StopIteration
-
     def __len__(self):
         return len(self.bodies)
 
@@ -185,8 +189,6 @@ class Envelope(object):
         for body in self.bodies:
             yield body
 
-        raise StopIteration
-
     def keys(self):
         return [body[0] for body in self.bodies]
 
@@ -603,10 +605,12 @@ def get_fault(data):
 
 
 def decode(stream, strict=False, logger=None, timezone_offset=None,
-           **kwargs):
+           codec_pool=None, limits=None, **kwargs):
     """
     Decodes the incoming stream as a remoting message.
 
+    @param stream: The data to decode. C{bytes} like objects are read in
+        place without being copied (see L{util.get_read_stream}).
     @type stream: L{BufferedByteStream<pyamf.util.BufferedByteStream>}
     @param strict: Enforce strict decoding. Default is C{False}.
     @type strict: C{boolean}
@@ -619,13 +623,50 @@ def decode(stream, strict=False, logger=None, timezone_offset=None,
         this is required for legacy systems.
     @type timezone_offset: U{datetime.datetime.timedelta<http://
         docs.python.org/library/datetime.html#datetime.timedelta>}
+    @param codec_pool: An optional AMF0 L{CodecPool<pyamf.codec.CodecPool>}
+        to take the decoder from (see L{pyamf.codec_pool}).
+    @param limits: If supplied, the envelope is first walked by
+        L{scan.scan_envelope<pyamf.scan.scan_envelope>} and rejected without
+        being decoded if it exceeds these limits.
+    @type limits: L{Limits<pyamf.scan.Limits>}
 
     @return: Message L{envelope<Envelope>}.
     @rtype: L{Envelope}
+    @raise pyamf.scan.LimitExceeded: The envelope exceeds C{limits}.
     """
-    if not isinstance(stream, util.BufferedByteStream):
+    if isinstance(stream, python.buffer_types):
+        stream = util.get_read_stream(stream)
+    elif not isinstance(stream, util.BufferedByteStream):
         stream = util.BufferedByteStream(stream)
 
+    if limits is not None:
+        scan.scan_envelope(stream, limits)
+
+    if codec_pool is None:
+        decoder = pyamf.get_decoder(
+            pyamf.AMF0,
+            stream,
+            strict=strict,
+            timezone_offset=timezone_offset,
+            **kwargs
+        )
+
+        return _decode(stream, decoder, strict, logger)
+
+    decoder = codec_pool.acquireDecoder(
+        stream,
+        strict=strict,
+        timezone_offset=timezone_offset,
+        **kwargs
+    )
+
+    try:
+        return _decode(stream, decoder, strict, logger)
+    finally:
+        codec_pool.release(decoder)
+
+
+def _decode(stream, decoder, strict, logger):
     msg = Envelope()
     msg.amfVersion = stream.read_ushort()
 
@@ -638,13 +679,6 @@ def decode(stream, strict=False, logger=None, timezone_offset=None,
             )
         )
 
-    decoder = pyamf.get_decoder(
-        pyamf.AMF0,
-        stream,
-        strict=strict,
-        timezone_offset=timezone_offset,
-        **kwargs
-    )
     context = decoder.context
 
     decoder.use_amf3 = msg.amfVersion == pyamf.AMF3
@@ -671,7 +705,8 @@ def decode(stream, strict=False, logger=None, timezone_offset=None,
     return msg
 
 
-def encode(msg, strict=False, logger=None, timezone_offset=None, **kwargs):
+def encode(msg, strict=False, logger=None, timezone_offset=None,
+           codec_pool=None, **kwargs):
     """
     Encodes and returns the L{msg<Envelope>} as an AMF stream.
 
@@ -688,20 +723,158 @@ def encode(msg, strict=False, logger=None, timezone_offset=None, **kwargs):
         this is required for legacy systems.
     @type timezone_offset: U{datetime.datetime.timedelta<http://
         docs.python.org/library/datetime.html#datetime.timedelta>}
+    @param codec_pool: An optional AMF0 L{CodecPool<pyamf.codec.CodecPool>}
+        to take the encoder from (see L{pyamf.codec_pool}).
     @rtype: L{BufferedByteStream<pyamf.util.BufferedByteStream>}
     """
-    stream = util.BufferedByteStream()
+    if codec_pool is None:
+        encoder = pyamf.get_encoder(
+            pyamf.AMF0,
+            util.BufferedByteStream(),
+            strict=strict,
+            timezone_offset=timezone_offset,
+            **kwargs
+        )
 
+        if msg.amfVersion == pyamf.AMF3:
+            encoder.use_amf3 = True
+
+        return _encode(msg, encoder, strict)
+
+    encoder = codec_pool.acquireEncoder(
+        strict=strict,
+        timezone_offset=timezone_offset,
+        use_amf3=msg.amfVersion == pyamf.AMF3,
+        **kwargs
+    )
+
+    try:
+        return _encode(msg, encoder, strict)
+    finally:
+        codec_pool.release(encoder)
+
+
+def encode_body(body, amfVersion=pyamf.AMF0, strict=False,
+                timezone_offset=None, **kwargs):
+    """
+    Encodes C{body} as it would be encoded by L{encode} as the body of a
+    L{Response} in an envelope of C{amfVersion}, so that it can be kept and
+    sent again without being encoded each time.
+
+    The context of the encoder is cleared before each body of an envelope is
+    written, so the encoded body can be written in place of C{body} even if it
+    contains references.
+
+    @param amfVersion: The C{amfVersion} of the envelope the body will be
+        sent in.
+    @rtype: L{pyamf.RawAMF}
+    @raise pyamf.DecodeError: The encoded body cannot be walked by
+        L{pyamf.RawAMF}, e.g. it contains externalised objects.
+    @since: 0.8.9
+    """
     encoder = pyamf.get_encoder(
         pyamf.AMF0,
-        stream,
+        util.BufferedByteStream(),
         strict=strict,
         timezone_offset=timezone_offset,
+        use_amf3=amfVersion == pyamf.AMF3,
         **kwargs
     )
 
-    if msg.amfVersion == pyamf.AMF3:
-        encoder.use_amf3 = True
+    encoder.writeElement(body)
+
+    return pyamf.RawAMF(encoder.stream.getvalue(), pyamf.AMF0)
+
+
+def encode_iter(msg, strict=False, logger=None, timezone_offset=None,
+                chunk_size=DEFAULT_CHUNK_SIZE, codec_pool=None, **kwargs):
+    """
+    Encodes the L{msg<Envelope>} as an AMF stream, yielding C{bytes} chunks as
+    encoding progresses instead of building the whole stream in memory.
+
+    Memory use is bounded per body, not per chunk: each body is encoded in
+    full before its chunks are handed out, so at most one encoded body is
+    held at any time. An envelope with a single, very large body is held in
+    memory in its entirety, as with L{encode}. Chunks are C{chunk_size} bytes
+    long, apart from the last one.
+
+    The parameters are the same as L{encode}, plus:
+
+    @param chunk_size: The size of the chunks to yield.
+    @type chunk_size: C{int}
+    @since: 0.8.9
+    """
+    if codec_pool is None:
+        encoder = pyamf.get_encoder(
+            pyamf.AMF0,
+            util.BufferedByteStream(),
+            strict=strict,
+            timezone_offset=timezone_offset,
+            **kwargs
+        )
+
+        if msg.amfVersion == pyamf.AMF3:
+            encoder.use_amf3 = True
+
+        for chunk in _encode_iter(msg, encoder, strict, chunk_size):
+            yield chunk
+
+        return
+
+    encoder = codec_pool.acquireEncoder(
+        strict=strict,
+        timezone_offset=timezone_offset,
+        use_amf3=msg.amfVersion == pyamf.AMF3,
+        **kwargs
+    )
+
+    try:
+        for chunk in _encode_iter(msg, encoder, strict, chunk_size):
+            yield chunk
+    finally:
+        codec_pool.release(encoder)
+
+
+def _encode_iter(msg, encoder, strict, chunk_size):
+    stream = encoder.stream
+
+    for _ in _write_envelope(msg, encoder, strict):
+        if len(stream) < chunk_size:
+            continue
+
+        buf = stream.getvalue()
+        end = len(buf) - len(buf) % chunk_size
+
+        stream.truncate()
+        stream.write(buf[end:])
+
+        for i in range(0, end, chunk_size):
+            yield buf[i:i + chunk_size]
+
+    buf = stream.getvalue()
+    stream.truncate()
+
+    if buf:
+        yield buf
+
+
+def _encode(msg, encoder, strict):
+    stream = encoder.stream
+
+    for _ in _write_envelope(msg, encoder, strict):
+        pass
+
+    stream.seek(0)
+
+    return stream
+
+
+def _write_envelope(msg, encoder, strict):
+    """
+    Writes C{msg} to the encoder's stream, yielding after the headers and
+    after each body.
+    """
+    stream = encoder.stream
 
     stream.write_ushort(msg.amfVersion)
     stream.write_ushort(len(msg.headers))
@@ -718,14 +891,14 @@ def encode(msg, strict=False, logger=None, timezone_offset=None, **kwargs):
 
     stream.write_short(len(msg))
 
+    yield
+
     for name, message in msg.items():
         encoder.context.clear()
 
         _write_body(name, message, stream, encoder, strict)
 
-    stream.seek(0)
-
-    return stream
+        yield
 
 
 def get_exception_from_fault(fault):
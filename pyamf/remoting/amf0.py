@@ -10,6 +10,7 @@ AMF0 Remoting support.
 import traceback
 import sys
 
+import pyamf
 from pyamf import remoting
 from pyamf.remoting import gateway
 
@@ -66,16 +67,96 @@ class RequestProcessor(object):
 
         return remoting.Response(fault, status=remoting.STATUS_ERROR)
 
+    def getErrorResponse(self, request):
+        """
+        Returns the response to C{request} for the exception currently being
+        handled.
+
+        @rtype: L{Response<pyamf.remoting.Response>}
+        """
+        if self.logger:
+            self.logger.exception(
+                'Unexpected error while processing request %r',
+                request.target
+            )
+
+        return self.buildErrorResponse(request)
+
+    def getCacheKey(self, request, service_request):
+        """
+        Returns the key of the cached response to C{request} or C{None} if
+        it is not cached. The response is cached already encoded, see
+        L{encodeBody}.
+        """
+        return self.gateway.getCacheKey(
+            service_request,
+            request.target,
+            request.body,
+            _get_amf_version(request)
+        )
+
+    def encodeBody(self, request, body):
+        """
+        Returns C{body} encoded for the response to C{request}.
+
+        @rtype: L{pyamf.RawAMF}
+        """
+        return remoting.encode_body(
+            body,
+            _get_amf_version(request),
+            strict=self.gateway.strict,
+            timezone_offset=self.gateway._get_timezone_offset()
+        )
+
+    def cacheBody(self, request, service_request, key, body):
+        """
+        Stores C{body}, the result of C{service_request}, in the response
+        cache of the gateway under C{key}, encoded (see L{encodeBody}).
+
+        Bodies that are encoded but cannot be kept that way, as L{pyamf.RawAMF}
+        is unable to walk them (e.g. they contain externalised objects), are
+        not cached.
+
+        @return: The body to respond with.
+        """
+        try:
+            encoded = self.encodeBody(request, body)
+        except pyamf.DecodeError:
+            if self.logger:
+                self.logger.warning(
+                    'Unable to cache the response to %r', request.target,
+                    exc_info=True
+                )
+
+            return body
+
+        self.gateway.setCachedResponse(service_request, key, encoded)
+
+        return encoded
+
     def _getBody(self, request, response, service_request, **kwargs):
         if 'DescribeService' in request.headers:
             return service_request.service.description
 
-        return self.gateway.callServiceRequest(
+        key = self.getCacheKey(request, service_request)
+
+        if key is not None:
+            cached = self.gateway.getCachedResponse(key)
+
+            if cached is not None:
+                return cached[0]
+
+        body = self.gateway.callServiceRequest(
             service_request,
             *request.body,
             **kwargs
         )
 
+        if key is not None:
+            body = self.cacheBody(request, service_request, key, body)
+
+        return body
+
     def __call__(self, request, *args, **kwargs):
         """
         Processes an AMF0 request.
@@ -166,6 +247,13 @@ class RequestProcessor(object):
             return self.buildErrorResponse(request)
 
 
+def _get_amf_version(request):
+    """
+    Returns the C{amfVersion} of the envelope of C{request}.
+    """
+    return getattr(request.envelope, 'amfVersion', pyamf.AMF0)
+
+
 def build_fault(cls, e, tb, include_traceback=False):
     """
     Builds a L{ErrorFault<pyamf.remoting.ErrorFault>} object based on the last
@@ -124,6 +124,17 @@ class RequestProcessor(object):
 
         return generate_error(request, cls, e, tb, self.gateway.debug)
 
+    def getErrorResponse(self, amf_request):
+        """
+        Returns the response to C{amf_request} for the exception currently
+        being handled.
+
+        @rtype: L{Response<pyamf.remoting.Response>}
+        """
+        ro_request = amf_request.body[0]
+
+        return self._finaliseBody(ro_request, self._getErrorBody(ro_request))
+
     def _getBody(self, amf_request, ro_request, **kwargs):
         """
         @raise ServerCallFailed: Unknown request.
@@ -195,12 +206,31 @@ class RequestProcessor(object):
             **kwargs
         )
 
+        key = self.gateway.getCacheKey(
+            service_request,
+            service_name,
+            ro_request.body
+        )
+
+        if key is not None:
+            cached = self.gateway.getCachedResponse(key)
+
+            if cached is not None:
+                ro_response.body = cached[0]
+
+                return remoting.Response(ro_response)
+
         ro_response.body = self.gateway.callServiceRequest(
             service_request,
             *ro_request.body,
             **kwargs
         )
 
+        if key is not None:
+            self.gateway.setCachedResponse(
+                service_request, key, ro_response.body
+            )
+
         return remoting.Response(ro_response)
 
     def __call__(self, amf_request, **kwargs):
@@ -220,18 +250,32 @@ class RequestProcessor(object):
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
-            fault = self.buildErrorResponse(ro_request)
+            body = self._getErrorBody(ro_request)
+
+        return self._finaliseBody(ro_request, body)
 
-            if hasattr(self.gateway, 'onServiceError'):
-                self.gateway.onServiceError(ro_request, fault)
-            elif self.logger:
-                self.logger.exception(
-                    'Unexpected error while processing request %r',
-                    get_service_name(ro_request)
-                )
+    def _getErrorBody(self, ro_request):
+        """
+        Returns the response to C{ro_request} for the exception currently
+        being handled, passing it to the C{onServiceError} hook of the gateway
+        if it has one.
+        """
+        fault = self.buildErrorResponse(ro_request)
+
+        if hasattr(self.gateway, 'onServiceError'):
+            self.gateway.onServiceError(ro_request, fault)
+        elif self.logger:
+            self.logger.exception(
+                'Unexpected error while processing request %r',
+                get_service_name(ro_request)
+            )
 
-            body = remoting.Response(fault, status=remoting.STATUS_ERROR)
+        return remoting.Response(fault, status=remoting.STATUS_ERROR)
 
+    def _finaliseBody(self, ro_request, body):
+        """
+        Sets the C{DSId} header of the response message.
+        """
         ro_response = body.body
 
         dsid = ro_request.headers.get('DSId', None)
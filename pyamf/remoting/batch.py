@@ -0,0 +1,411 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Decodes large collections of recorded remoting envelopes across a pool of
+worker processes.
+
+Envelopes are read from a directory (one envelope per file, in file name
+order) or from an archive of length prefixed records: each record is an
+unsigned 32 bit big endian length followed by that many bytes of envelope.
+
+Usage::
+
+    from pyamf.remoting import batch
+
+    for envelope in batch.decode_all('traffic.amfa'):
+        ...
+
+Or from the command line::
+
+    python -m pyamf.remoting.batch -j 8 -m myapp.models traffic.amfa
+
+Returning whole envelopes from the workers means pickling every decoded
+object graph back to the parent, so when only a few facts about each envelope
+are needed pass C{func} to reduce them in the worker instead (see
+L{summarise}).
+
+@since: 0.8.9
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import importlib
+import os
+import pickle
+import struct
+import sys
+
+import pyamf
+from pyamf import remoting
+
+
+__all__ = [
+    'read_archive',
+    'write_archive',
+    'read_source',
+    'decode_all',
+    'summarise',
+]
+
+#: Number of envelopes sent to a worker at a time.
+DEFAULT_CHUNK_SIZE = 16
+
+_length = struct.Struct('>L')
+
+
+def read_archive(name_or_file):
+    """
+    Reads the envelopes from an archive of length prefixed records.
+
+    @param name_or_file: Name of file, or a file like object opened in binary
+        mode.
+    @return: A generator of C{bytes}, one for each envelope.
+    @raise pyamf.DecodeError: The archive is truncated.
+    """
+    f = name_or_file
+    opened = False
+
+    if isinstance(name_or_file, str):
+        f = open(name_or_file, 'rb')
+        opened = True
+
+    try:
+        while True:
+            header = f.read(_length.size)
+
+            if not header:
+                break
+
+            if len(header) < _length.size:
+                raise pyamf.DecodeError('Truncated archive record length')
+
+            size, = _length.unpack(header)
+            data = f.read(size)
+
+            if len(data) < size:
+                raise pyamf.DecodeError(
+                    'Truncated archive record (expected %d bytes, got %d)' % (
+                        size, len(data)
+                    )
+                )
+
+            yield data
+    finally:
+        if opened:
+            f.close()
+
+
+def write_archive(name_or_file, envelopes):
+    """
+    Writes C{envelopes} as an archive of length prefixed records that can be
+    read by L{read_archive}.
+
+    @param name_or_file: Name of file, or a file like object opened in binary
+        mode.
+    @param envelopes: An iterable of encoded envelopes (C{bytes}) or
+        L{Envelope<pyamf.remoting.Envelope>} instances.
+    @return: The number of records written.
+    """
+    f = name_or_file
+    opened = False
+    count = 0
+
+    if isinstance(name_or_file, str):
+        f = open(name_or_file, 'wb')
+        opened = True
+
+    try:
+        for envelope in envelopes:
+            if isinstance(envelope, remoting.Envelope):
+                envelope = remoting.encode(envelope).getvalue()
+
+            f.write(_length.pack(len(envelope)))
+            f.write(envelope)
+
+            count += 1
+    finally:
+        if opened:
+            f.close()
+
+    return count
+
+
+def read_source(source):
+    """
+    Returns the envelopes contained in C{source}.
+
+    @param source: A directory name, an archive file name, a file like object
+        containing an archive or an iterable of C{bytes}.
+    @return: An iterator of C{bytes}.
+    """
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            return _read_directory(source)
+
+        return read_archive(source)
+
+    if hasattr(source, 'read'):
+        return read_archive(source)
+
+    return iter(source)
+
+
+def _read_directory(path):
+    for name in sorted(os.listdir(path)):
+        filename = os.path.join(path, name)
+
+        if not os.path.isfile(filename):
+            continue
+
+        with open(filename, 'rb') as f:
+            yield f.read()
+
+
+def _get_shared_aliases():
+    """
+    Returns the registered classes (and their aliases) that can be sent to
+    the workers. Classes that cannot be pickled by reference are skipped.
+    """
+    aliases = []
+
+    for klass, alias in list(pyamf.CLASS_CACHE.items()):
+        if isinstance(klass, str):
+            continue
+
+        try:
+            aliases.append(pickle.dumps((klass, alias.alias or None)))
+        except Exception:
+            continue
+
+    return aliases
+
+
+def _init_worker(aliases, initializer, initargs):
+    """
+    Calls C{initializer} and then registers the class aliases of the parent
+    process that it has not registered itself.
+    """
+    if initializer is not None:
+        initializer(*initargs)
+
+    for data in aliases:
+        try:
+            klass, alias = pickle.loads(data)
+        except Exception:
+            continue
+
+        if klass not in pyamf.CLASS_CACHE:
+            pyamf.register_class(klass, alias)
+
+
+def _import_modules(names):
+    """
+    Imports each of the modules in C{names}, used as the worker initializer
+    by L{main}.
+    """
+    for name in names:
+        importlib.import_module(name)
+
+
+def _decode_chunk(chunk, func, strict, timezone_offset):
+    pool = pyamf.codec_pool(pyamf.AMF0)
+    results = []
+
+    for data in chunk:
+        envelope = remoting.decode(
+            data,
+            strict=strict,
+            timezone_offset=timezone_offset,
+            codec_pool=pool
+        )
+
+        if func is not None:
+            envelope = func(envelope)
+
+        results.append(envelope)
+
+    return results
+
+
+def _chunks(envelopes, size):
+    chunk = []
+
+    for data in envelopes:
+        chunk.append(data)
+
+        if len(chunk) >= size:
+            yield chunk
+
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def decode_all(source, func=None, max_workers=None,
+               chunk_size=DEFAULT_CHUNK_SIZE, strict=False,
+               timezone_offset=None, initializer=None, initargs=()):
+    """
+    Decodes every envelope in C{source} using a pool of worker processes.
+
+    The classes registered with L{pyamf.register_class} in this process are
+    registered in each worker before decoding starts, under the same alias.
+    That is all of the registration state that is copied: class loaders,
+    L{pyamf.add_type} functions, alias types added with
+    L{pyamf.register_alias_type} and changes made to a
+    L{ClassAlias<pyamf.ClassAlias>} after it was registered are not, so
+    results can differ from decoding in this process. Pass C{initializer} to
+    set these up in each worker, typically by importing the module of the
+    application that registers them. Results are yielded in
+    the order the envelopes appear in C{source}, and only a bounded number of
+    chunks are read ahead so that archives larger than memory can be
+    processed.
+
+    @param source: See L{read_source}.
+    @param func: Called in the worker with each decoded
+        L{Envelope<pyamf.remoting.Envelope>}; its return value is yielded
+        instead of the envelope. Must be picklable (i.e. a module level
+        function).
+    @param max_workers: Number of worker processes, defaults to the number of
+        CPUs. C{0} decodes in this process, which is useful for debugging.
+    @param chunk_size: Number of envelopes sent to a worker at a time.
+    @param strict: See L{remoting.decode<pyamf.remoting.decode>}.
+    @param timezone_offset: See L{remoting.decode<pyamf.remoting.decode>}.
+    @param initializer: Called in each worker with C{initargs} before any
+        class aliases are copied to it. Must be picklable. Not called when
+        C{max_workers} is C{0}.
+    @param initargs: The arguments for C{initializer}.
+    @return: A generator of decoded envelopes (or the results of C{func}).
+    @raise pyamf.DecodeError: An envelope could not be decoded.
+    @raise IOError: An envelope is truncated.
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be a positive integer')
+
+    chunks = _chunks(read_source(source), chunk_size)
+
+    if max_workers == 0:
+        for chunk in chunks:
+            for result in _decode_chunk(chunk, func, strict, timezone_offset):
+                yield result
+
+        return
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(_get_shared_aliases(), initializer, initargs)
+    )
+
+    pending = collections.deque()
+
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(
+                _decode_chunk, chunk, func, strict, timezone_offset
+            ))
+
+            if len(pending) < max_workers * 2:
+                continue
+
+            for result in pending.popleft().result():
+                yield result
+
+        while pending:
+            for result in pending.popleft().result():
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+        executor.shutdown(wait=True)
+
+
+def summarise(envelope):
+    """
+    Returns a one line, tab separated description of C{envelope}: the AMF
+    version, the header names and the target of each body.
+
+    Suitable as the C{func} argument to L{decode_all}.
+    """
+    bodies = []
+
+    for name, message in envelope:
+        target = getattr(message, 'target', None)
+
+        if target is None:
+            bodies.append(name)
+        else:
+            bodies.append('%s=%s' % (name, target))
+
+    return '%d\t%s\t%s' % (
+        envelope.amfVersion,
+        ','.join(envelope.headers.keys()),
+        ','.join(bodies)
+    )
+
+
+def main(args=None):
+    """
+    Command line entry point. Prints the L{summary<summarise>} of each
+    envelope in a directory or archive, prefixed with its index.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m pyamf.remoting.batch',
+        description='Decode recorded AMF remoting envelopes in parallel.'
+    )
+
+    parser.add_argument(
+        'source',
+        help='directory of envelopes or length prefixed archive'
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help='number of worker processes (default: number of CPUs, 0 to '
+             'decode in process)'
+    )
+    parser.add_argument(
+        '-c', '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+        help='number of envelopes sent to a worker at a time'
+    )
+    parser.add_argument(
+        '-m', '--module', action='append', default=[],
+        help='module to import (in each worker) before decoding, e.g. one '
+             'that registers class aliases (may be repeated)'
+    )
+    parser.add_argument(
+        '--strict', action='store_true', help='enforce strict decoding'
+    )
+
+    options = parser.parse_args(args)
+
+    _import_modules(options.module)
+
+    results = decode_all(
+        options.source,
+        func=summarise,
+        max_workers=options.jobs,
+        chunk_size=options.chunk_size,
+        strict=options.strict,
+        initializer=_import_modules,
+        initargs=(options.module,)
+    )
+
+    try:
+        for i, line in enumerate(results):
+            sys.stdout.write('%d\t%s\n' % (i, line))
+    except (pyamf.BaseError, IOError, EOFError) as e:
+        sys.stderr.write('error: %s\n' % (e,))
+
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Response caching for remoting gateways.
+
+A gateway caches the responses of the services and methods that are added
+with C{cache} set (see L{BaseGateway.addService
+<pyamf.remoting.gateway.BaseGateway.addService>}) or decorated with
+L{cacheable<pyamf.remoting.gateway.cacheable>}, keyed on the target and the
+arguments of the call (see L{make_key}).
+
+The cache itself is pluggable, any object that has the C{get(key)} and
+C{set(key, value, ttl)} methods of a memcached client can be supplied as the
+C{response_cache} of a gateway. L{LRUCache} is used by default.
+
+@since: 0.8.9
+"""
+
+import collections
+import datetime
+import decimal
+import hashlib
+import threading
+import time
+
+import pyamf
+from pyamf import codec, python, util
+
+
+__all__ = ['LRUCache', 'make_key']
+
+#: The types that are part of a key as their C{repr}.
+SCALAR_TYPES = python.str_types + python.int_types + (
+    bool,
+    float,
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    pyamf.UndefinedType,
+)
+
+
+class LRUCache(object):
+    """
+    A thread safe, in process cache that discards the least recently used
+    item once it holds C{max_size} items.
+
+    @ivar max_size: The maximum number of items held.
+    @type max_size: C{int}
+    @ivar hits: The number of calls to L{get} that found an item.
+    @ivar misses: The number of calls to L{get} that did not.
+    """
+
+    def __init__(self, max_size=1024, clock=time.monotonic):
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        """
+        Returns the item stored under C{key} or C{None} if there is none or
+        it has expired.
+        """
+        with self._lock:
+            try:
+                value, expires = self._items[key]
+            except KeyError:
+                self.misses += 1
+
+                return None
+
+            if expires is not None and expires <= self.clock():
+                del self._items[key]
+                self.misses += 1
+
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def set(self, key, value, ttl=0):
+        """
+        Stores C{value} under C{key}.
+
+        @param ttl: The number of seconds the item is valid for, C{0} for
+            as long as it is not discarded.
+        """
+        expires = None
+
+        if ttl:
+            expires = self.clock() + ttl
+
+        with self._lock:
+            self._items[key] = (value, expires)
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Discards the item stored under C{key}, if there is one.
+        """
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        """
+        Discards all items.
+        """
+        with self._lock:
+            self._items.clear()
+
+
+def _write_canonical(obj, out, context, path):
+    """
+    Appends the canonical form of C{obj} to the C{out} list.
+    """
+    if obj is None or isinstance(obj, SCALAR_TYPES):
+        out.append('%s:%r' % (type(obj).__name__, obj))
+
+        return
+
+    if isinstance(obj, util.BufferedByteStream):
+        out.append('%s:%r' % (type(obj).__name__, obj.getvalue()))
+
+        return
+
+    if id(obj) in path:
+        # a reference to an object that contains it
+        out.append('@%d' % (path.index(id(obj)),))
+
+        return
+
+    path.append(id(obj))
+
+    if isinstance(obj, (list, tuple)):
+        out.append('%s[' % (type(obj).__name__,))
+
+        for item in obj:
+            _write_canonical(item, out, context, path)
+
+        out.append(']')
+    else:
+        if isinstance(obj, dict):
+            out.append('%s{' % (type(obj).__name__,))
+            attrs = obj
+        else:
+            try:
+                alias = context.getClassAlias(type(obj))
+                attrs = alias.getEncodableAttributes(obj)
+            except Exception as e:
+                raise TypeError('Unable to make a key from %r (%s)' % (
+                    obj, e
+                ))
+
+            out.append('<%s>{' % (alias.alias or type(obj).__name__,))
+
+        items = []
+
+        for key, value in attrs.items():
+            key_out = []
+            _write_canonical(key, key_out, context, path)
+            items.append((''.join(key_out), value))
+
+        items.sort(key=lambda item: item[0])
+
+        for key, value in items:
+            out.append(key)
+            _write_canonical(value, out, context, path)
+
+        out.append('}')
+
+    path.pop()
+
+
+def make_key(*parts):
+    """
+    Returns a cache key for C{parts}, e.g. the target and arguments of a
+    service call.
+
+    Values that are equal once decoded map to the same key, i.e. the items of
+    a C{dict} are sorted and objects are compared by their encodable
+    attributes (see L{ClassAlias.getEncodableAttributes
+    <pyamf.ClassAlias.getEncodableAttributes>}). The key is a hex digest, so
+    is safe to use with memcached.
+
+    @raise TypeError: One of the values cannot be made part of a key.
+    @rtype: C{str}
+    """
+    out = []
+
+    _write_canonical(parts, out, codec.Context(), [])
+
+    return hashlib.sha1(
+        '\x00'.join(out).encode('utf-8', 'backslashreplace')
+    ).hexdigest()
@@ -209,6 +209,10 @@ class RemotingService(object):
         server. Defaults to U{urllib2.urlopen<http://
         docs.python.org/library/urllib2.html#urllib2.urlopen>}.
     @type opener: C{function}
+    @ivar codec_pool: The AMF0 L{CodecPool<pyamf.codec.CodecPool>} used to
+        en/decode remoting envelopes. Supply C{True} to use the process wide
+        pool returned by L{pyamf.codec_pool}.
+    @type codec_pool: L{CodecPool<pyamf.codec.CodecPool>} or C{None}
     """
 
     def __init__(self, url, amf_version=pyamf.AMF0, **kwargs):
@@ -226,6 +230,12 @@ class RemotingService(object):
         self.strict = kwargs.pop('strict', False)
         self.logger = kwargs.pop('logger', None)
         self.opener = kwargs.pop('opener', urlopen)
+        self.codec_pool = kwargs.pop('codec_pool', None)
+
+        if self.codec_pool is True:
+            self.codec_pool = pyamf.codec_pool(pyamf.AMF0)
+        elif self.codec_pool is False:
+            self.codec_pool = None
 
         if kwargs:
             raise TypeError('Unexpected keyword arguments %r' % (kwargs,))
@@ -396,7 +406,8 @@ class RemotingService(object):
 
         body = remoting.encode(
             self.getAMFRequest([request]),
-            strict=self.strict
+            strict=self.strict,
+            codec_pool=self.codec_pool
         )
 
         http_request = Request(
@@ -423,7 +434,8 @@ class RemotingService(object):
 
         body = remoting.encode(
             self.getAMFRequest(requests),
-            strict=self.strict
+            strict=self.strict,
+            codec_pool=self.codec_pool
         )
 
         http_request = Request(
@@ -490,7 +502,11 @@ class RemotingService(object):
             bytes = gzipper.read()
             gzipper.close()
 
-        response = remoting.decode(bytes, strict=self.strict)
+        response = remoting.decode(
+            bytes,
+            strict=self.strict,
+            codec_pool=self.codec_pool
+        )
 
         if self.logger:
             self.logger.debug('Response: %s', response)
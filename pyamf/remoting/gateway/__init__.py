@@ -8,11 +8,16 @@ Remoting server implementations.
 """
 
 import sys
+import threading
+import time
 import types
 import datetime
 
+from concurrent import futures
+
 import pyamf
 from pyamf import remoting, util, python
+from pyamf.remoting import cache
 
 try:
     from platform import python_implementation
@@ -53,6 +58,13 @@ class InvalidServiceMethodError(BaseServiceError):
     _amf_code = 'Service.MethodInvalid'
 
 
+class ServiceTimeoutError(BaseServiceError):
+    """
+    A service call did not complete within the C{timeout} of the gateway.
+    """
+    _amf_code = 'Service.Timeout'
+
+
 class ServiceWrapper(object):
     """
     Wraps a supplied service with extra functionality.
@@ -61,14 +73,17 @@ class ServiceWrapper(object):
     @type service: C{callable}
     @ivar description: A description of the service.
     @type description: C{str}
+    @ivar cache: Whether the responses of the service are cached, see
+        L{BaseGateway.addService}.
     """
     def __init__(self, service, description=None, authenticator=None,
-                 expose_request=None, preprocessor=None):
+                 expose_request=None, preprocessor=None, cache=None):
         self.service = service
         self.description = description
         self.authenticator = authenticator
         self.expose_request = expose_request
         self.preprocessor = preprocessor
+        self.cache = cache
 
     def __eq__(self, other):
         if isinstance(other, ServiceWrapper):
@@ -211,6 +226,79 @@ class ServiceWrapper(object):
 
         return self.preprocessor
 
+    def getCache(self, service_request=None):
+        if service_request is None:
+            return self.cache
+
+        methods = self.getMethods()
+
+        if service_request.method is None:
+            if hasattr(self.service, '_pyamf_cache'):
+                return self.service._pyamf_cache
+
+        if service_request.method not in methods:
+            return self.cache
+
+        method = methods[service_request.method]
+
+        if hasattr(method, '_pyamf_cache'):
+            return method._pyamf_cache
+
+        return self.cache
+
+
+class DispatchEntry(object):
+    """
+    A service target resolved when the service is added to a gateway, so that
+    routing a request to it takes a single C{dict} lookup (see
+    L{BaseGateway.getServiceRequest}).
+
+    @ivar name: The name of the service.
+    @ivar service: The service.
+    @type service: L{ServiceWrapper}
+    @ivar method: The method to call on the service or C{None}.
+    @ivar func: The callable to call or C{None} if it is resolved for each
+        call, i.e. the service is a class that is instantiated per call or
+        is not callable.
+    @ivar authenticator: The authenticator of the method or service, C{None}
+        to use the gateway's.
+    @ivar expose_request: Whether to expose the request to the method or
+        service, C{None} to use the gateway's setting.
+    @ivar preprocessor: The preprocessor of the method or service, C{None}
+        to use the gateway's.
+    @ivar cache: Whether the responses of the method or service are cached.
+    @since: 0.8.9
+    """
+    def __init__(self, name, service, method=None, func=None):
+        obj = service.service
+
+        if method is None:
+            func = obj
+
+        self.name = name
+        self.service = service
+        self.method = method
+        self.func = None
+
+        if not isinstance(obj, type) and python.callable(func):
+            self.func = func
+
+        self.authenticator = getattr(
+            func, '_pyamf_authenticator', service.authenticator
+        )
+        self.expose_request = getattr(
+            func, '_pyamf_expose_request', service.expose_request
+        )
+        self.preprocessor = getattr(
+            func, '_pyamf_preprocessor', service.preprocessor
+        )
+        self.cache = getattr(func, '_pyamf_cache', service.cache)
+
+    def __repr__(self):
+        return '<%s %s.%s>' % (
+            self.__class__.__name__, self.name, self.method
+        )
+
 
 class ServiceRequest(object):
     """
@@ -223,13 +311,22 @@ class ServiceRequest(object):
     @ivar method: The method to call on the service. A value of C{None}
         means that the service will be called directly.
     @type method: C{None} or C{str}
+    @ivar entry: The resolved target, if the request was routed through the
+        dispatch table of the gateway.
+    @type entry: L{DispatchEntry} or C{None}
     """
-    def __init__(self, amf_request, service, method):
+    def __init__(self, amf_request, service, method, entry=None):
         self.request = amf_request
         self.service = service
         self.method = method
+        self.entry = entry
 
     def __call__(self, *args):
+        entry = self.entry
+
+        if entry is not None and entry.func is not None:
+            return entry.func(*args)
+
         return self.service(self.method, args)
 
 
@@ -244,6 +341,36 @@ class ServiceCollection(dict):
         return value in self.values()
 
 
+class _BodyCall(object):
+    """
+    Processes a message in a worker of L{BaseGateway.executor}, recording
+    when the worker started on it.
+
+    @ivar started: Set once the call has started, or the future has
+        completed without it (e.g. it was cancelled).
+    @type started: C{threading.Event}
+    @ivar start_time: When the call started (see C{time.monotonic}).
+    """
+
+    def __init__(self, process, message):
+        self.process = process
+        self.message = message
+        self.start_time = None
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.start_time = time.monotonic()
+        self.started.set()
+
+        return self.process(self.message)
+
+    def done(self, future):
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+
+        self.started.set()
+
+
 class BaseGateway(object):
     """
     Generic Remoting gateway.
@@ -268,6 +395,44 @@ class BaseGateway(object):
     @ivar debug: Provides debugging information when an error occurs. Use only
         in non production settings.
     @type debug: C{bool}
+    @ivar codec_pool: The AMF0 L{CodecPool<pyamf.codec.CodecPool>} used to
+        en/decode remoting envelopes. Supply C{True} to use the process wide
+        pool returned by L{pyamf.codec_pool}. Default is C{None} (a fresh
+        codec per request).
+    @type codec_pool: L{CodecPool<pyamf.codec.CodecPool>} or C{None}
+    @ivar chunk_size: When set, responses are streamed to the client in
+        chunks of this many bytes as each body is encoded (see
+        L{remoting.encode_iter}) rather than being sent as a single blob.
+        This bounds memory use per body; a response with a single large body
+        is still encoded in full before it is sent. Errors that occur after
+        the first chunk has been sent cannot be reported to the client.
+        Default is C{None}.
+    @type chunk_size: C{int} or C{None}
+    @ivar limits: When set, each request is checked against these limits
+        before it is decoded and rejected as a bad request if it exceeds them
+        (see L{remoting.decode}). Default is C{None}.
+    @type limits: L{Limits<pyamf.scan.Limits>} or C{None}
+    @ivar concurrency: When set, the bodies of a batched request are processed
+        in parallel by a thread pool of this many workers, shared by all
+        requests to the gateway, by the gateways that support it (see
+        L{processBodies}). The pool is shut down by L{close}. Default is
+        C{None} (one body at a time).
+    @type concurrency: C{int} or C{None}
+    @ivar timeout: The number of seconds, from when a worker starts on a
+        body, that the body has to complete before an error is returned for
+        it instead. Requires L{concurrency}. A service call that times out
+        cannot be stopped and keeps its worker until it returns, so bodies
+        may wait (untimed) for a worker when slow calls occupy the pool.
+        Default is C{None}.
+    @type timeout: C{float} or C{None}
+    @ivar dispatch_table: Maps each target of the services (the service name
+        and C{name.method} for each public method) to its L{DispatchEntry}.
+        Compiled by L{addService}.
+    @type dispatch_table: C{dict}
+    @ivar response_cache: Holds the responses of the services that are
+        cached (see L{addService} and L{cacheable}). Any object with the
+        C{get} and C{set} methods of a memcached client can be used. Default
+        is an L{LRUCache<pyamf.remoting.cache.LRUCache>}.
     """
 
     _request_class = ServiceRequest
@@ -280,6 +445,7 @@ class BaseGateway(object):
             raise TypeError("dict type required for services")
 
         self.services = ServiceCollection()
+        self.dispatch_table = {}
         self.authenticator = kwargs.pop('authenticator', None)
         self.preprocessor = kwargs.pop('preprocessor', None)
         self.expose_request = kwargs.pop('expose_request', False)
@@ -288,6 +454,27 @@ class BaseGateway(object):
         self.timezone_offset = kwargs.pop('timezone_offset', None)
 
         self.debug = kwargs.pop('debug', False)
+        self.codec_pool = kwargs.pop('codec_pool', None)
+
+        if self.codec_pool is True:
+            self.codec_pool = pyamf.codec_pool(pyamf.AMF0)
+        elif self.codec_pool is False:
+            self.codec_pool = None
+
+        self.chunk_size = kwargs.pop('chunk_size', None)
+        self.limits = kwargs.pop('limits', None)
+        self.concurrency = kwargs.pop('concurrency', None)
+        self.timeout = kwargs.pop('timeout', None)
+        self.executor = None
+        self.response_cache = kwargs.pop('response_cache', None)
+
+        if self.response_cache is None:
+            self.response_cache = cache.LRUCache()
+
+        if self.concurrency:
+            self.executor = futures.ThreadPoolExecutor(self.concurrency)
+        elif self.timeout is not None:
+            raise ValueError('timeout requires concurrency')
 
         if kwargs:
             raise TypeError('Unknown kwargs: %r' % (kwargs,))
@@ -296,7 +483,8 @@ class BaseGateway(object):
             self.addService(service, name)
 
     def addService(self, service, name=None, description=None,
-                   authenticator=None, expose_request=None, preprocessor=None):
+                   authenticator=None, expose_request=None, preprocessor=None,
+                   cache=None):
         """
         Adds a service to the gateway.
 
@@ -304,6 +492,13 @@ class BaseGateway(object):
         @type service: C{callable}, class instance, or a module
         @param name: The name of the service.
         @type name: C{str}
+        @param cache: Cache the responses of the service in
+            L{response_cache}, keyed on the target and arguments of each
+            call. Either C{True} or the number of seconds a response is
+            valid for. The methods of the service can override this with
+            L{cacheable}. Only suitable for services whose results do not
+            depend on who calls them or when.
+        @type cache: C{bool} or C{int}
         @raise pyamf.remoting.RemotingError: Service already exists.
         @raise TypeError: C{service} cannot be a scalar value.
         @raise TypeError: C{service} must be C{callable} or a module.
@@ -337,14 +532,45 @@ class BaseGateway(object):
         if name in self.services:
             raise remoting.RemotingError("Service %s already exists" % name)
 
-        self.services[name] = ServiceWrapper(
+        wrapper = ServiceWrapper(
             service,
             description,
             authenticator,
             expose_request,
-            preprocessor
+            preprocessor,
+            cache
         )
 
+        self.services[name] = wrapper
+        self._compileService(name, wrapper)
+
+    def _compileService(self, name, wrapper):
+        """
+        Adds the targets of a service to L{dispatch_table}.
+        """
+        table = self.dispatch_table
+
+        for method, func in wrapper.getMethods().items():
+            target = '%s.%s' % (name, method)
+            entry = table.get(target)
+
+            # a service with the same name as the target takes precedence
+            if entry is None or entry.method is not None:
+                table[target] = DispatchEntry(name, wrapper, method, func)
+
+        table[name] = DispatchEntry(name, wrapper)
+
+    def compileServices(self):
+        """
+        Rebuilds L{dispatch_table} from L{services}. Only needed if
+        L{services} or the services themselves are modified other than through
+        L{addService} and L{removeService}.
+        """
+        self.dispatch_table = {}
+
+        for name, wrapper in self.services.items():
+            self._compileService(name, wrapper)
+
     def _get_timezone_offset(self):
         if self.timezone_offset is None:
             return None
@@ -366,6 +592,8 @@ class BaseGateway(object):
         for name, wrapper in self.services.items():
             if service in (name, wrapper.service):
                 del self.services[name]
+                self.compileServices()
+
                 return
 
         raise NameError("Service %r not found" % (service,))
@@ -379,6 +607,14 @@ class BaseGateway(object):
         @type request: L{Request<pyamf.remoting.Request>}
         @rtype: L{ServiceRequest}
         """
+        entry = self.dispatch_table.get(target)
+
+        # the service may have been removed from self.services directly
+        if entry is not None and \
+                self.services.get(entry.name) is entry.service:
+            return self._request_class(
+                request.envelope, entry.service, entry.method, entry)
+
         try:
             return self._request_class(
                 request.envelope, self.services[target], None)
@@ -412,6 +648,92 @@ class BaseGateway(object):
 
             return amf0.RequestProcessor(self)
 
+    def processBodies(self, request, process):
+        """
+        Returns an envelope of the responses to the bodies of C{request}, in
+        the same order.
+
+        If L{concurrency} is set the bodies are processed in parallel and any
+        that do not complete within L{timeout} of being started are answered
+        with a L{ServiceTimeoutError} fault. Otherwise they are processed in
+        turn.
+
+        @param request: The AMF request.
+        @type request: L{Envelope<pyamf.remoting.Envelope>}
+        @param process: Called with each message, returns its response.
+        @rtype: L{Envelope<pyamf.remoting.Envelope>}
+        """
+        response = remoting.Envelope(request.amfVersion)
+
+        if self.executor is None:
+            for name, message in request:
+                response[name] = process(message)
+
+            return response
+
+        calls = []
+
+        for name, message in request:
+            call = _BodyCall(process, message)
+            future = self.executor.submit(call)
+
+            future.add_done_callback(call.done)
+            calls.append((name, call, future))
+
+        try:
+            for name, call, future in calls:
+                if self.timeout is None:
+                    response[name] = future.result()
+
+                    continue
+
+                # the timeout starts once a worker picks the body up, time
+                # spent queued behind the bodies of other requests (or ones
+                # that timed out but are still running) does not count
+                call.started.wait()
+
+                timeout = call.start_time + self.timeout - time.monotonic()
+
+                try:
+                    response[name] = future.result(max(timeout, 0))
+                except futures.TimeoutError:
+                    response[name] = self.getTimeoutResponse(call.message)
+        except:
+            for name, call, future in calls:
+                future.cancel()
+
+            raise
+
+        return response
+
+    def close(self):
+        """
+        Shuts down the thread pool that processes the bodies of requests
+        (see L{concurrency}), waiting for the service calls that are running
+        to return. Batched requests cannot be processed afterwards.
+
+        @since: 0.8.9
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    def getTimeoutResponse(self, message):
+        """
+        Returns the error response to a message that did not complete within
+        L{timeout}.
+
+        @type message: L{Request<pyamf.remoting.Request>}
+        @rtype: L{Response<pyamf.remoting.Response>}
+        """
+        processor = self.getProcessor(message)
+
+        try:
+            raise ServiceTimeoutError(
+                'Service call timed out after %s seconds' % (self.timeout,)
+            )
+        except ServiceTimeoutError:
+            return processor.getErrorResponse(message)
+
     def getResponse(self, amf_request):
         """
         Returns the response to the request.
@@ -435,9 +757,14 @@ class BaseGateway(object):
 
         @rtype: C{bool}
         """
-        expose_request = service_request.service.mustExposeRequest(
-            service_request
-        )
+        entry = getattr(service_request, 'entry', None)
+
+        if entry is not None:
+            expose_request = entry.expose_request
+        else:
+            expose_request = service_request.service.mustExposeRequest(
+                service_request
+            )
 
         if expose_request is None:
             if self.expose_request is None:
@@ -454,7 +781,12 @@ class BaseGateway(object):
         level and finally to see if there is a global authenticator function
         for the gateway. Returns C{None} if one could not be found.
         """
-        auth = service_request.service.getAuthenticator(service_request)
+        entry = getattr(service_request, 'entry', None)
+
+        if entry is not None:
+            auth = entry.authenticator
+        else:
+            auth = service_request.service.getAuthenticator(service_request)
 
         if auth is None:
             return self.authenticator
@@ -492,13 +824,73 @@ class BaseGateway(object):
         level and finally to see if there is a global preprocessor function
         for the gateway. Returns C{None} if one could not be found.
         """
-        preproc = service_request.service.getPreprocessor(service_request)
+        entry = getattr(service_request, 'entry', None)
+
+        if entry is not None:
+            preproc = entry.preprocessor
+        else:
+            preproc = service_request.service.getPreprocessor(service_request)
 
         if preproc is None:
             return self.preprocessor
 
         return preproc
 
+    def getCache(self, service_request):
+        """
+        Returns whether the responses to C{service_request} are cached,
+        looking at the service method first and then at the service.
+
+        @return: C{True}, the number of seconds a response is valid for or a
+            false value.
+        """
+        entry = getattr(service_request, 'entry', None)
+
+        if entry is not None:
+            return entry.cache
+
+        return service_request.service.getCache(service_request)
+
+    def getCacheKey(self, service_request, target, args, encoding=None):
+        """
+        Returns the key in L{response_cache} of the response to a call to
+        C{target} with C{args} or C{None} if it is not cached.
+
+        @param encoding: The AMF encoding the response is stored in or
+            C{None} if it is stored as is.
+        """
+        if not self.getCache(service_request):
+            return None
+
+        try:
+            return cache.make_key(target, encoding, args)
+        except TypeError:
+            if self.logger:
+                self.logger.warning(
+                    'Unable to cache the response to %r', target,
+                    exc_info=True
+                )
+
+            return None
+
+    def getCachedResponse(self, key):
+        """
+        Returns a C{tuple} containing the response stored under C{key} or
+        C{None} if there is none.
+        """
+        return self.response_cache.get(key)
+
+    def setCachedResponse(self, service_request, key, response):
+        """
+        Stores C{response} in L{response_cache} under C{key}.
+        """
+        ttl = self.getCache(service_request)
+
+        if ttl is True:
+            ttl = 0
+
+        self.response_cache.set(key, (response,), ttl)
+
     def preprocessRequest(self, service_request, *args, **kwargs):
         """
         Preprocesses a request.
@@ -602,6 +994,29 @@ def preprocess(func, c, expose_request=False):
     return func
 
 
+def cacheable(func, ttl=True):
+    """
+    A decorator that caches the responses of a method in the
+    L{response_cache<BaseGateway.response_cache>} of the gateway, keyed on
+    the arguments of each call. C{ttl} is the number of seconds a response is
+    valid for, C{True} until it is discarded and C{False} to not cache the
+    method of a service that is cached.
+
+    @raise TypeError: C{func} must be callable.
+    """
+    if not python.callable(func):
+        raise TypeError('func must be callable')
+
+    attr = func
+
+    if isinstance(func, types.MethodType):
+        attr = func.__func__
+
+    setattr(attr, '_pyamf_cache', ttl)
+
+    return func
+
+
 def format_exception():
     import traceback
 
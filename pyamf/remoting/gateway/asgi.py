@@ -0,0 +1,535 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+ASGI server implementation.
+
+The Asynchronous Server Gateway Interface (ASGI) is the asyncio successor to
+WSGI. An instance of L{ASGIGateway} is an ASGI application that can be served
+by any ASGI server, e.g.::
+
+    from pyamf.remoting.gateway.asgi import ASGIGateway
+
+    async def echo(data):
+        return data
+
+    app = ASGIGateway({'echo': echo})
+
+Service methods, authenticators and preprocessors may be coroutine functions
+(C{async def}), in which case they are awaited. The bodies of a batched
+envelope are processed concurrently and the envelope is decoded and encoded
+in the default executor of the event loop, so the latency of a request is that
+of its slowest call rather than the sum of all of them. Plain functions are
+called on the event loop so should not block.
+
+@see: U{ASGI specification (external)<https://asgi.readthedocs.io>}
+
+@since: 0.8.9
+"""
+
+import asyncio
+import functools
+import inspect
+
+import pyamf
+from pyamf import remoting
+from pyamf.remoting import gateway, amf0, amf3
+
+__all__ = ['ASGIGateway']
+
+
+async def maybe_await(result):
+    """
+    Returns C{result}, awaiting it first if it is awaitable.
+    """
+    if inspect.isawaitable(result):
+        return await result
+
+    return result
+
+
+class AMF0RequestProcessor(amf0.RequestProcessor):
+    """
+    An asyncio friendly implementation of
+    L{amf0.RequestProcessor<pyamf.remoting.amf0.RequestProcessor>}
+    """
+
+    async def _getBody(self, request, response, service_request, **kwargs):
+        if 'DescribeService' in request.headers:
+            return service_request.service.description
+
+        key = self.getCacheKey(request, service_request)
+
+        if key is not None:
+            cached = self.gateway.getCachedResponse(key)
+
+            if cached is not None:
+                return cached[0]
+
+        body = await maybe_await(self.gateway.callServiceRequest(
+            service_request,
+            *request.body,
+            **kwargs
+        ))
+
+        if key is not None:
+            body = self.cacheBody(request, service_request, key, body)
+
+        return body
+
+    async def __call__(self, request, *args, **kwargs):
+        """
+        Processes an AMF0 request.
+
+        @return: The response to the request.
+        @rtype: L{Response<pyamf.remoting.Response>}
+        """
+        response = remoting.Response(None)
+
+        try:
+            service_request = self.gateway.getServiceRequest(
+                request,
+                request.target
+            )
+        except gateway.UnknownServiceError:
+            if self.logger:
+                self.logger.error(
+                    'Unknown endpoint %r' % (request.target,)
+                )
+
+            return self.buildErrorResponse(request)
+
+        # we have a valid service, now attempt authentication
+        try:
+            authd = await maybe_await(self.authenticateRequest(
+                request,
+                service_request,
+                *args,
+                **kwargs
+            ))
+        except (SystemExit, KeyboardInterrupt, asyncio.CancelledError):
+            raise
+        except:
+            if self.logger:
+                self.logger.exception(
+                    'Unexpected error while authenticating request %r',
+                    request.target
+                )
+
+            return self.buildErrorResponse(request)
+
+        if not authd:
+            # authentication failed
+            response.status = remoting.STATUS_ERROR
+            response.body = remoting.ErrorFault(
+                code='AuthenticationError',
+                description='Authentication failed'
+            )
+
+            return response
+
+        # authentication succeeded, now fire the preprocessor (if there is one)
+        try:
+            await maybe_await(self.gateway.preprocessRequest(
+                service_request,
+                *args,
+                **kwargs
+            ))
+        except (SystemExit, KeyboardInterrupt, asyncio.CancelledError):
+            raise
+        except:
+            if self.logger:
+                self.logger.exception(
+                    'Unexpected error while pre-processing request %r',
+                    request.target
+                )
+
+            return self.buildErrorResponse(request)
+
+        try:
+            response.body = await maybe_await(self._getBody(
+                request,
+                response,
+                service_request,
+                *args,
+                **kwargs
+            ))
+
+            return response
+        except (SystemExit, KeyboardInterrupt, asyncio.CancelledError):
+            raise
+        except:
+            if self.logger:
+                self.logger.exception(
+                    'Unexpected error while processing request %r',
+                    request.target
+                )
+
+            return self.buildErrorResponse(request)
+
+
+class AMF3RequestProcessor(amf3.RequestProcessor):
+    """
+    An asyncio friendly implementation of
+    L{amf3.RequestProcessor<pyamf.remoting.amf3.RequestProcessor>}
+    """
+
+    async def _processRemotingMessage(self, amf_request, ro_request,
+                                      **kwargs):
+        ro_response = amf3.generate_acknowledgement(ro_request)
+
+        service_name = amf3.get_service_name(ro_request)
+        service_request = self.gateway.getServiceRequest(
+            amf_request,
+            service_name
+        )
+
+        # fire the preprocessor (if there is one)
+        await maybe_await(self.gateway.preprocessRequest(
+            service_request,
+            *ro_request.body,
+            **kwargs
+        ))
+
+        key = self.gateway.getCacheKey(
+            service_request,
+            service_name,
+            ro_request.body
+        )
+
+        if key is not None:
+            cached = self.gateway.getCachedResponse(key)
+
+            if cached is not None:
+                ro_response.body = cached[0]
+
+                return remoting.Response(ro_response)
+
+        ro_response.body = await maybe_await(self.gateway.callServiceRequest(
+            service_request,
+            *ro_request.body,
+            **kwargs
+        ))
+
+        if key is not None:
+            self.gateway.setCachedResponse(
+                service_request, key, ro_response.body
+            )
+
+        return remoting.Response(ro_response)
+
+    async def __call__(self, amf_request, **kwargs):
+        """
+        Processes an AMF3 Remote Object request.
+
+        @return: The response to the request.
+        @rtype: L{Response<pyamf.remoting.Response>}
+        """
+        ro_request = amf_request.body[0]
+
+        try:
+            body = await maybe_await(
+                self._getBody(amf_request, ro_request, **kwargs)
+            )
+        except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+            raise
+        except:
+            body = self._getErrorBody(ro_request)
+
+        return self._finaliseBody(ro_request, body)
+
+
+class ASGIGateway(gateway.BaseGateway):
+    """
+    ASGI Remoting Gateway.
+
+    Each service call receives a copy of the ASGI connection C{scope} as the
+    HTTP request (see L{expose_request<gateway.expose_request>}), with the
+    AMF message being processed under the C{pyamf.request} key.
+    """
+
+    def getProcessor(self, request):
+        """
+        Returns request processor.
+
+        @param request: The AMF message.
+        @type request: L{Request<remoting.Request>}
+        """
+        if request.target == 'null' or not request.target:
+            return AMF3RequestProcessor(self)
+
+        return AMF0RequestProcessor(self)
+
+    async def getResponse(self, request, scope):
+        """
+        Processes the bodies of the AMF request concurrently, returning an AMF
+        response containing their responses in the same order.
+
+        @param request: The AMF Request.
+        @type request: L{Envelope<pyamf.remoting.Envelope>}
+        @param scope: The ASGI connection scope.
+        @rtype: L{Envelope<pyamf.remoting.Envelope>}
+        @return: The AMF Response.
+        """
+        response = remoting.Envelope(request.amfVersion)
+        names = []
+        calls = []
+
+        for name, message in request:
+            processor = self.getProcessor(message)
+
+            http_request = dict(scope)
+            http_request['pyamf.request'] = message
+
+            names.append(name)
+            calls.append(processor(message, http_request=http_request))
+
+        bodies = await asyncio.gather(*calls)
+
+        for name, body in zip(names, bodies):
+            response[name] = body
+
+        return response
+
+    async def authenticateRequest(self, service_request, username, password,
+                                  **kwargs):
+        """
+        Processes an authentication request, awaiting the result of the
+        authenticator if necessary.
+
+        @see: L{BaseGateway.authenticateRequest
+            <gateway.BaseGateway.authenticateRequest>}
+        """
+        authenticator = self.getAuthenticator(service_request)
+
+        if authenticator is None:
+            return True
+
+        args = (username, password)
+
+        if hasattr(authenticator, '_pyamf_expose_request'):
+            http_request = kwargs.get('http_request', None)
+            args = (http_request,) + args
+
+        result = await maybe_await(authenticator(*args))
+
+        return result is True
+
+    async def sendResponse(self, send, status, body,
+                           content_type='text/plain'):
+        """
+        Sends a complete HTTP response.
+
+        @param status: The HTTP status code.
+        @type status: C{int}
+        @type body: C{bytes}
+        """
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', content_type.encode('ascii')),
+                (b'content-length', str(len(body)).encode('ascii')),
+                (b'server', gateway.SERVER_NAME.encode('ascii')),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': body,
+        })
+
+    async def sendError(self, send, status, message):
+        """
+        Sends a plain text error response, including the traceback of the
+        exception being handled if L{debug} is set.
+        """
+        body = message.encode('utf-8')
+
+        if self.debug:
+            body += b'\n\nTraceback:\n\n' + gateway.format_exception()
+
+        await self.sendResponse(send, status, body)
+
+    async def _readBody(self, receive):
+        """
+        Returns the body of the HTTP request or C{None} if the client
+        disconnected.
+        """
+        chunks = []
+
+        while True:
+            message = await receive()
+
+            if message['type'] == 'http.disconnect':
+                return None
+
+            chunks.append(message.get('body', b''))
+
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+
+            return
+
+        if scope['type'] != 'http':
+            raise ValueError('Unsupported ASGI scope type %r' % (
+                scope['type'],
+            ))
+
+        if scope['method'] != 'POST':
+            await self.sendError(
+                send,
+                400,
+                "400 Bad Request\n\nTo access this PyAMF gateway you "
+                "must use POST requests (%s received)" % (scope['method'],)
+            )
+
+            return
+
+        body = await self._readBody(receive)
+
+        if body is None:
+            return
+
+        loop = asyncio.get_event_loop()
+        timezone_offset = self._get_timezone_offset()
+
+        # Decode the request
+        try:
+            request = await loop.run_in_executor(None, functools.partial(
+                remoting.decode,
+                body,
+                strict=self.strict,
+                logger=self.logger,
+                timezone_offset=timezone_offset,
+                codec_pool=self.codec_pool,
+                limits=self.limits
+            ))
+        except (pyamf.DecodeError, IOError):
+            if self.logger:
+                self.logger.exception('Error decoding AMF request')
+
+            await self.sendError(
+                send,
+                400,
+                "400 Bad Request\n\nThe request body was unable to "
+                "be successfully decoded."
+            )
+
+            return
+        except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+            raise
+        except:
+            if self.logger:
+                self.logger.exception('Unexpected error decoding AMF request')
+
+            await self.sendError(
+                send,
+                500,
+                "500 Internal Server Error\n\nAn unexpected error "
+                "occurred whilst decoding."
+            )
+
+            return
+
+        # Process the request
+        try:
+            response = await self.getResponse(request, scope)
+        except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+            raise
+        except:
+            if self.logger:
+                self.logger.exception('Error processing AMF request')
+
+            await self.sendError(
+                send,
+                500,
+                "500 Internal Server Error\n\nThe request was "
+                "unable to be successfully processed."
+            )
+
+            return
+
+        # Encode the response
+        try:
+            if self.chunk_size:
+                chunks = remoting.encode_iter(
+                    response,
+                    strict=self.strict,
+                    timezone_offset=timezone_offset,
+                    chunk_size=self.chunk_size,
+                    codec_pool=self.codec_pool
+                )
+
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+            else:
+                stream = await loop.run_in_executor(None, functools.partial(
+                    remoting.encode,
+                    response,
+                    strict=self.strict,
+                    timezone_offset=timezone_offset,
+                    codec_pool=self.codec_pool
+                ))
+        except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+            raise
+        except:
+            if self.logger:
+                self.logger.exception('Error encoding AMF request')
+
+            await self.sendError(
+                send,
+                500,
+                "500 Internal Server Error\n\nThe request was "
+                "unable to be encoded."
+            )
+
+            return
+
+        if not self.chunk_size:
+            await self.sendResponse(
+                send, 200, stream.getvalue(), remoting.CONTENT_TYPE
+            )
+
+            return
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', remoting.CONTENT_TYPE.encode('ascii')),
+                (b'server', gateway.SERVER_NAME.encode('ascii')),
+            ],
+        })
+
+        while chunk is not None:
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True,
+            })
+
+            try:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+            except:
+                # the response has started, all we can do is to let the
+                # server drop the connection
+                if self.logger:
+                    self.logger.exception('Error encoding AMF response')
+
+                raise
+
+        await send({'type': 'http.response.body', 'body': b''})
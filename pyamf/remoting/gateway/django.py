@@ -11,6 +11,9 @@ servers.
 @since: 0.1.0
 """
 
+import copy
+import itertools
+
 import pyamf
 from pyamf import remoting
 from pyamf.remoting import gateway
@@ -75,15 +78,20 @@ class DjangoGateway(gateway.BaseGateway):
         @type request: L{Envelope<pyamf.remoting.Envelope>}
         @rtype: L{Envelope<pyamf.remoting.Envelope>}
         """
-        response = remoting.Envelope(request.amfVersion)
+        def process(message):
+            body_request = http_request
+
+            if self.executor is not None:
+                # the bodies are processed in parallel
+                body_request = copy.copy(http_request)
 
-        for name, message in request:
-            http_request.amf_request = message
+            body_request.amf_request = message
 
             processor = self.getProcessor(message)
-            response[name] = processor(message, http_request=http_request)
 
-        return response
+            return processor(message, http_request=body_request)
+
+        return self.processBodies(request, process)
 
     def __call__(self, http_request):
         """
@@ -106,7 +114,9 @@ class DjangoGateway(gateway.BaseGateway):
                 body,
                 strict=self.strict,
                 logger=self.logger,
-                timezone_offset=timezone_offset
+                timezone_offset=timezone_offset,
+                codec_pool=self.codec_pool,
+                limits=self.limits
             )
         except (pyamf.DecodeError, IOError):
             if self.logger:
@@ -172,12 +182,25 @@ class DjangoGateway(gateway.BaseGateway):
 
         # Encode the response
         try:
-            stream = remoting.encode(
-                response,
-                strict=self.strict,
-                logger=self.logger,
-                timezone_offset=timezone_offset
-            )
+            if self.chunk_size:
+                chunks = remoting.encode_iter(
+                    response,
+                    strict=self.strict,
+                    logger=self.logger,
+                    timezone_offset=timezone_offset,
+                    chunk_size=self.chunk_size,
+                    codec_pool=self.codec_pool
+                )
+
+                first_chunk = next(chunks)
+            else:
+                stream = remoting.encode(
+                    response,
+                    strict=self.strict,
+                    logger=self.logger,
+                    timezone_offset=timezone_offset,
+                    codec_pool=self.codec_pool
+                )
         except:
             if self.logger:
                 self.logger.exception('Error encoding AMF request')
@@ -193,6 +216,15 @@ class DjangoGateway(gateway.BaseGateway):
             return http.HttpResponseServerError(
                 content_type='text/plain', content=response)
 
+        if self.chunk_size:
+            http_response = http.StreamingHttpResponse(
+                itertools.chain([first_chunk], chunks),
+                content_type=remoting.CONTENT_TYPE
+            )
+            http_response['Server'] = gateway.SERVER_NAME
+
+            return http_response
+
         buf = stream.getvalue()
 
         http_response = http.HttpResponse(content_type=remoting.CONTENT_TYPE)
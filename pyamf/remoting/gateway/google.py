@@ -79,7 +79,9 @@ class WebAppGateway(webapp.RequestHandler, gateway.BaseGateway):
                 body,
                 strict=self.strict,
                 logger=self.logger,
-                timezone_offset=timezone_offset
+                timezone_offset=timezone_offset,
+                codec_pool=self.codec_pool,
+                limits=self.limits
             )
         except (DecodeError, IOError):
             if self.logger:
@@ -150,7 +152,8 @@ class WebAppGateway(webapp.RequestHandler, gateway.BaseGateway):
                 response,
                 strict=self.strict,
                 logger=self.logger,
-                timezone_offset=timezone_offset
+                timezone_offset=timezone_offset,
+                codec_pool=self.codec_pool
             )
         except:
             if self.logger:
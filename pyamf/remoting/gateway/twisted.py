@@ -47,6 +47,33 @@ class AMF0RequestProcessor(amf0.RequestProcessor):
     L{amf0.RequestProcessor<pyamf.remoting.amf0.RequestProcessor>}
     """
 
+    def _getBody(self, request, response, service_request, **kwargs):
+        if 'DescribeService' in request.headers:
+            return service_request.service.description
+
+        key = self.getCacheKey(request, service_request)
+
+        if key is not None:
+            cached = self.gateway.getCachedResponse(key)
+
+            if cached is not None:
+                return cached[0]
+
+        d = defer.maybeDeferred(
+            self.gateway.callServiceRequest,
+            service_request,
+            *request.body,
+            **kwargs
+        )
+
+        if key is None:
+            return d
+
+        def cache_cb(result):
+            return self.cacheBody(request, service_request, key, result)
+
+        return d.addCallback(cache_cb)
+
     def __call__(self, request, *args, **kwargs):
         """
         Calls the underlying service method.
@@ -155,13 +182,31 @@ class AMF3RequestProcessor(amf3.RequestProcessor):
                 remoting.Response(ro_response, status=remoting.STATUS_ERROR)
             )
 
+        key = self.gateway.getCacheKey(
+            service_request,
+            service_name,
+            ro_request.body
+        )
+
         def response_cb(result):
+            if key is not None:
+                self.gateway.setCachedResponse(service_request, key, result)
+
             ro_response.body = result
             res = remoting.Response(ro_response)
 
             deferred_response.callback(res)
 
         def process_cb(result):
+            if key is not None:
+                cached = self.gateway.getCachedResponse(key)
+
+                if cached is not None:
+                    ro_response.body = cached[0]
+                    deferred_response.callback(remoting.Response(ro_response))
+
+                    return
+
             d = defer.maybeDeferred(
                 self.gateway.callServiceRequest,
                 service_request,
@@ -292,7 +337,9 @@ class TwistedGateway(gateway.BaseGateway, resource.Resource):
             request.content.read(),
             strict=self.strict,
             logger=self.logger,
-            timezone_offset=timezone_offset
+            timezone_offset=timezone_offset,
+            codec_pool=self.codec_pool,
+            limits=self.limits
         )
 
         def cb(amf_request):
@@ -335,16 +382,73 @@ class TwistedGateway(gateway.BaseGateway, resource.Resource):
             self._finaliseRequest(request, 500, body)
 
         timezone_offset = self._get_timezone_offset()
+
+        if self.chunk_size:
+            self._streamResponse(amf_response, request, timezone_offset, eb)
+
+            return
+
         d = threads.deferToThread(
             remoting.encode,
             amf_response,
             strict=self.strict,
             logger=self.logger,
-            timezone_offset=timezone_offset
+            timezone_offset=timezone_offset,
+            codec_pool=self.codec_pool
         )
 
         d.addCallback(cb).addErrback(eb)
 
+    def _streamResponse(self, amf_response, request, timezone_offset, eb):
+        """
+        Encodes C{amf_response} in a thread one chunk at a time, writing each
+        chunk to C{request} as soon as it is available.
+
+        @param eb: Called if the first chunk cannot be encoded.
+        """
+        chunks = remoting.encode_iter(
+            amf_response,
+            strict=self.strict,
+            logger=self.logger,
+            timezone_offset=timezone_offset,
+            chunk_size=self.chunk_size,
+            codec_pool=self.codec_pool
+        )
+
+        def next_chunk():
+            return next(chunks, None)
+
+        def write_chunk(chunk):
+            if chunk is None:
+                request.finish()
+
+                return
+
+            request.write(chunk)
+
+            d = threads.deferToThread(next_chunk)
+            d.addCallbacks(write_chunk, chunk_eb)
+
+        def first_chunk(chunk):
+            request.setResponseCode(200)
+
+            request.setHeader("Content-Type", remoting.CONTENT_TYPE)
+            request.setHeader("Server", gateway.SERVER_NAME)
+
+            write_chunk(chunk)
+
+        def chunk_eb(failure):
+            # the response has started, all we can do is drop the connection
+            if self.logger:
+                self.logger.error(
+                    "%s: %s" % (failure.type, failure.getErrorMessage()))
+                self.logger.error(failure.getTraceback())
+
+            request.loseConnection()
+
+        d = threads.deferToThread(next_chunk)
+        d.addCallbacks(first_chunk, eb)
+
     def getProcessor(self, request):
         """
         Determines the request processor, based on the request.
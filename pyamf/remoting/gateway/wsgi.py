@@ -43,14 +43,19 @@ class WSGIGateway(gateway.BaseGateway):
         @rtype: L{Envelope<pyamf.remoting.Envelope>}
         @return: The AMF Response.
         """
-        response = remoting.Envelope(request.amfVersion)
+        def process(message):
+            http_request = environ
+
+            if self.executor is not None:
+                # the bodies are processed in parallel
+                http_request = dict(environ)
 
-        for name, message in request:
             processor = self.getProcessor(message)
-            environ['pyamf.request'] = message
-            response[name] = processor(message, http_request=environ)
+            http_request['pyamf.request'] = message
+
+            return processor(message, http_request=http_request)
 
-        return response
+        return self.processBodies(request, process)
 
     def badRequestMethod(self, environ, start_response):
         """
@@ -85,7 +90,9 @@ class WSGIGateway(gateway.BaseGateway):
                 body,
                 strict=self.strict,
                 logger=self.logger,
-                timezone_offset=timezone_offset
+                timezone_offset=timezone_offset,
+                codec_pool=self.codec_pool,
+                limits=self.limits
             )
         except (pyamf.DecodeError, IOError):
             if self.logger:
@@ -153,11 +160,23 @@ class WSGIGateway(gateway.BaseGateway):
 
         # Encode the response
         try:
-            stream = remoting.encode(
-                response,
-                strict=self.strict,
-                timezone_offset=timezone_offset
-            )
+            if self.chunk_size:
+                chunks = remoting.encode_iter(
+                    response,
+                    strict=self.strict,
+                    timezone_offset=timezone_offset,
+                    chunk_size=self.chunk_size,
+                    codec_pool=self.codec_pool
+                )
+
+                first_chunk = next(chunks)
+            else:
+                stream = remoting.encode(
+                    response,
+                    strict=self.strict,
+                    timezone_offset=timezone_offset,
+                    codec_pool=self.codec_pool
+                )
         except:
             if self.logger:
                 self.logger.exception('Error encoding AMF request')
@@ -178,6 +197,14 @@ class WSGIGateway(gateway.BaseGateway):
 
             return [response]
 
+        if self.chunk_size:
+            start_response('200 OK', [
+                ('Content-Type', remoting.CONTENT_TYPE),
+                ('Server', gateway.SERVER_NAME),
+            ])
+
+            return self._iterChunks(first_chunk, chunks)
+
         response = stream.getvalue()
 
         start_response('200 OK', [
@@ -187,3 +214,19 @@ class WSGIGateway(gateway.BaseGateway):
         ])
 
         return [response]
+
+    def _iterChunks(self, first_chunk, chunks):
+        """
+        Yields the encoded response chunks, logging any error that occurs
+        once the response has started.
+        """
+        yield first_chunk
+
+        try:
+            for chunk in chunks:
+                yield chunk
+        except:
+            if self.logger:
+                self.logger.exception('Error encoding AMF response')
+
+            raise
@@ -0,0 +1,734 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Walks AMF0 and AMF3 encoded data without decoding it.
+
+L{scan} reads the type markers, lengths and reference tables of a stream and
+returns some L{statistics<Stats>} about its structure, optionally enforcing
+L{Limits} as it goes. No Python objects are built for the elements and no
+L{ClassAlias<pyamf.ClassAlias>} is consulted, which makes it a cheap check to
+run on untrusted data before handing it to a decoder::
+
+    from pyamf import scan
+
+    stats = scan.scan(data, pyamf.AMF3, scan.Limits(max_depth=32))
+
+Externalised AMF3 objects can only be walked if the number of elements their
+class writes is known, see L{EXTERNAL_ELEMENTS}.
+
+@since: 0.8.9
+"""
+
+import sys
+
+import pyamf
+from pyamf import python, util
+
+
+__all__ = [
+    'Limits',
+    'LimitExceeded',
+    'Scanner',
+    'Stats',
+    'scan',
+    'scan_envelope',
+]
+
+#: The number of elements written by the externalised classes that can be
+#: walked, keyed by class alias.
+EXTERNAL_ELEMENTS = {
+    'flex.messaging.io.ArrayCollection': 1,
+    'flex.messaging.io.ObjectProxy': 1,
+}
+
+#: The names used in L{Stats.types} for each AMF0 type marker.
+AMF0_TYPES = (
+    'number', 'boolean', 'string', 'object', 'movieclip', 'null', 'undefined',
+    'reference', 'mixedarray', 'objectterm', 'array', 'date', 'longstring',
+    'unsupported', 'recordset', 'xml', 'typedobject', 'amf3',
+)
+
+#: The names used in L{Stats.types} for each AMF3 type marker.
+AMF3_TYPES = (
+    'undefined', 'null', 'false', 'true', 'integer', 'number', 'string',
+    'xml', 'date', 'array', 'object', 'xmlstring', 'bytearray', 'vector_int',
+    'vector_uint', 'vector_double',
+)
+
+# frame kinds
+_VALUES = 0
+_KEYS = 1
+
+_NO_LIMIT = sys.maxsize
+
+
+class LimitExceeded(pyamf.DecodeError):
+    """
+    Raised by L{scan} when the data exceeds one of its L{Limits}.
+
+    @ivar name: The name of the limit, e.g. C{max_depth}.
+    @ivar limit: The value of the limit.
+    @ivar value: The value that exceeded it.
+    @ivar offset: The offset into the stream where it was exceeded.
+    """
+
+    def __init__(self, name, limit, value, offset):
+        pyamf.DecodeError.__init__(
+            self,
+            '%s of %d exceeded (%d at offset %d)' % (
+                name, limit, value, offset
+            )
+        )
+
+        self.name = name
+        self.limit = limit
+        self.value = value
+        self.offset = offset
+
+
+class Limits(object):
+    """
+    Upper bounds enforced by L{scan}. C{None} means unbounded.
+
+    @ivar max_depth: The nesting depth of objects and arrays.
+    @ivar max_elements: The number of elements, including attribute values and
+        array items.
+    @ivar max_string_length: The length in bytes of a string, attribute name
+        or XML document.
+    @ivar max_length: The number of items declared by an array or vector, or
+        the length in bytes of a ByteArray.
+    """
+
+    def __init__(self, max_depth=None, max_elements=None,
+                 max_string_length=None, max_length=None):
+        self.max_depth = max_depth
+        self.max_elements = max_elements
+        self.max_string_length = max_string_length
+        self.max_length = max_length
+
+    def __repr__(self):
+        return '<%s max_depth=%r max_elements=%r max_string_length=%r ' \
+            'max_length=%r>' % (
+                self.__class__.__name__,
+                self.max_depth,
+                self.max_elements,
+                self.max_string_length,
+                self.max_length,
+            )
+
+
+class Stats(object):
+    """
+    The structure of the data walked by L{scan}.
+
+    @ivar elements: The number of elements, including attribute values and
+        array items.
+    @ivar depth: The deepest nesting of objects and arrays.
+    @ivar strings: The number of non empty strings (values, attribute and
+        class names) sent in full rather than by reference.
+    @ivar string_bytes: The total length in bytes of those strings.
+    @ivar max_string_length: The length in bytes of the longest of them.
+    @ivar objects: The number of complex elements (objects, arrays, dates
+        etc.) sent in full rather than by reference.
+    @ivar references: The number of elements sent as a reference to a
+        previous string or complex element.
+    @ivar types: A C{dict} of type names (see L{AMF0_TYPES} and
+        L{AMF3_TYPES}) to the number of elements of that type.
+    @ivar offsets: A C{list} of the C{(start, end)} offsets of each top
+        level element.
+    @ivar size: The number of bytes walked.
+    """
+
+    def __init__(self):
+        self.elements = 0
+        self.depth = 0
+        self.strings = 0
+        self.string_bytes = 0
+        self.max_string_length = 0
+        self.objects = 0
+        self.references = 0
+        self.types = {}
+        self.offsets = []
+        self.size = 0
+
+    def __repr__(self):
+        return '<%s elements=%d depth=%d objects=%d size=%d>' % (
+            self.__class__.__name__,
+            self.elements,
+            self.depth,
+            self.objects,
+            self.size,
+        )
+
+
+def _limit(value):
+    if value is None:
+        return _NO_LIMIT
+
+    return value
+
+
+class Scanner(object):
+    """
+    Walks the elements in a C{memoryview}, see L{scan}.
+
+    The walk is iterative so that deeply nested data cannot exhaust the
+    Python stack.
+
+    @ivar pos: The offset of the next element.
+    """
+
+    def __init__(self, buf, pos=0, limits=None):
+        if limits is None:
+            limits = Limits()
+
+        self.buf = buf
+        self.end = len(buf)
+        self.pos = pos
+        self.limits = limits
+
+        self.max_depth = _limit(limits.max_depth)
+        self.max_elements = _limit(limits.max_elements)
+        self.max_string_length = _limit(limits.max_string_length)
+        self.max_length = _limit(limits.max_length)
+
+        self.stats = Stats()
+        self.amf0_types = [0] * len(AMF0_TYPES)
+        self.amf3_types = [0] * len(AMF3_TYPES)
+
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the reference tables, as L{pyamf.codec.Context.clear} does.
+        """
+        self.amf0_objects = 0
+        self.amf3_objects = 0
+        self.amf3_strings = []
+        self.amf3_traits = []
+
+    def getStats(self):
+        """
+        Returns the L{Stats} for the elements walked so far.
+        """
+        stats = self.stats
+        types = {}
+
+        for names, counts in ((AMF0_TYPES, self.amf0_types),
+                              (AMF3_TYPES, self.amf3_types)):
+            for name, count in zip(names, counts):
+                if count:
+                    types[name] = types.get(name, 0) + count
+
+        stats.types = types
+
+        return stats
+
+    def _exceeded(self, name, value, pos):
+        raise LimitExceeded(name, getattr(self.limits, name), value, pos)
+
+    def _truncated(self, pos):
+        raise pyamf.DecodeError('Unexpected end of stream at offset %d' % (
+            pos,
+        ))
+
+    def _string(self, pos, length):
+        """
+        Checks a string of C{length} bytes starting at C{pos} and returns the
+        offset of the end of it.
+        """
+        if length > self.max_string_length:
+            self._exceeded('max_string_length', length, pos)
+
+        end = pos + length
+
+        if end > self.end:
+            self._truncated(pos)
+
+        if length:
+            stats = self.stats
+            stats.strings += 1
+            stats.string_bytes += length
+
+            if length > stats.max_string_length:
+                stats.max_string_length = length
+
+        return end
+
+    def _open(self, depth, pos):
+        """
+        Called when a container is found at C{depth}. Returns the depth of
+        its children.
+        """
+        depth += 1
+
+        if depth > self.max_depth:
+            self._exceeded('max_depth', depth, pos)
+
+        if depth > self.stats.depth:
+            self.stats.depth = depth
+
+        return depth
+
+    def _count(self, pos):
+        stats = self.stats
+        stats.elements += 1
+
+        if stats.elements > self.max_elements:
+            self._exceeded('max_elements', stats.elements, pos)
+
+    def readElement(self, encoding):
+        """
+        Walks the next element and records its offsets in L{Stats.offsets}.
+        """
+        start = self.pos
+
+        try:
+            if encoding == pyamf.AMF0:
+                self.pos = self.amf0(start, 0)
+            else:
+                self.pos = self.amf3(start, 0)
+        except IndexError:
+            self._truncated(self.end)
+
+        self.stats.offsets.append((start, self.pos))
+        self.stats.size += self.pos - start
+
+    def readEnvelope(self):
+        """
+        Walks a remoting envelope.
+        """
+        version = self._ushort()
+
+        if version > 0x09:
+            raise pyamf.DecodeError('Malformed stream (amfVersion=%d)' % (
+                version,
+            ))
+
+        for i in range(self._ushort()):
+            # name, required flag and data length
+            self._skipUTF8(5)
+            self.readElement(pyamf.AMF0)
+
+        body_count = self._ushort()
+
+        if body_count & 0x8000:
+            # read as a signed short by the decoder
+            body_count = 0
+
+        for i in range(body_count):
+            # the decoder uses a new context for each body
+            self.reset()
+
+            # target, response and data length
+            self._skipUTF8(0)
+            self._skipUTF8(4)
+            self.readElement(pyamf.AMF0)
+
+    def _ushort(self):
+        pos = self.pos
+
+        if pos + 2 > self.end:
+            self._truncated(pos)
+
+        self.pos = pos + 2
+
+        return (self.buf[pos] << 8) | self.buf[pos + 1]
+
+    def _skipUTF8(self, extra):
+        """
+        Skips a string prefixed with its length and C{extra} bytes after it.
+        """
+        length = self._ushort()
+        pos = self._string(self.pos, length) + extra
+
+        if pos > self.end:
+            self._truncated(self.pos)
+
+        self.pos = pos
+
+    def amf0(self, pos, depth):
+        """
+        Walks the AMF0 element at C{pos}, nested at C{depth}, and returns the
+        offset of the end of it.
+        """
+        buf = self.buf
+        types = self.amf0_types
+        stats = self.stats
+        count = self._count
+        string = self._string
+        stack = [[_VALUES, 1, depth]]
+
+        while stack:
+            frame = stack[-1]
+
+            if frame[0] == _VALUES:
+                if not frame[1]:
+                    stack.pop()
+
+                    continue
+
+                frame[1] -= 1
+            else:
+                pos = string(pos + 2, (buf[pos] << 8) | buf[pos + 1])
+
+                if buf[pos] == 0x09:
+                    pos += 1
+                    stack.pop()
+
+                    continue
+
+            depth = frame[2]
+            start = pos
+            marker = buf[pos]
+            pos += 1
+
+            count(start)
+
+            if marker < 0x12:
+                types[marker] += 1
+
+            if marker == 0x00:
+                pos += 8
+            elif marker == 0x01:
+                pos += 1
+            elif marker == 0x02:
+                pos = string(pos + 2, (buf[pos] << 8) | buf[pos + 1])
+            elif marker == 0x03:
+                self.amf0_objects += 1
+                stats.objects += 1
+                stack.append([_KEYS, 0, self._open(depth, start)])
+            elif marker in (0x05, 0x06, 0x0D):
+                pass
+            elif marker == 0x07:
+                ref = (buf[pos] << 8) | buf[pos + 1]
+                pos += 2
+
+                if ref >= self.amf0_objects:
+                    raise pyamf.DecodeError(
+                        'Unknown reference %d at offset %d' % (ref, start)
+                    )
+
+                stats.references += 1
+            elif marker == 0x08:
+                pos += 4
+                self.amf0_objects += 1
+                stats.objects += 1
+                stack.append([_KEYS, 0, self._open(depth, start)])
+            elif marker == 0x0A:
+                length = self._ulong(pos)
+                pos += 4
+
+                if length > self.max_length:
+                    self._exceeded('max_length', length, start)
+
+                self.amf0_objects += 1
+                stats.objects += 1
+                stack.append([_VALUES, length, self._open(depth, start)])
+            elif marker == 0x0B:
+                pos += 10
+                self.amf0_objects += 1
+                stats.objects += 1
+            elif marker == 0x0C:
+                pos = string(pos + 4, self._ulong(pos))
+            elif marker == 0x0F:
+                pos = string(pos + 4, self._ulong(pos))
+                self.amf0_objects += 1
+                stats.objects += 1
+            elif marker == 0x10:
+                pos = string(pos + 2, (buf[pos] << 8) | buf[pos + 1])
+                self.amf0_objects += 1
+                stats.objects += 1
+                stack.append([_KEYS, 0, self._open(depth, start)])
+            elif marker == 0x11:
+                pos = self.amf3(pos, depth)
+            else:
+                raise pyamf.DecodeError(
+                    'Unsupported AMF0 type 0x%02x at offset %d' % (
+                        marker, start
+                    )
+                )
+
+            if pos > self.end:
+                self._truncated(start)
+
+        return pos
+
+    def _ulong(self, pos):
+        if pos + 4 > self.end:
+            self._truncated(pos)
+
+        return int.from_bytes(self.buf[pos:pos + 4], 'big')
+
+    def _u29(self, pos):
+        """
+        Returns the AMF3 variable length unsigned integer at C{pos} and the
+        offset of the end of it.
+        """
+        buf = self.buf
+        b = buf[pos]
+
+        if b < 0x80:
+            return b, pos + 1
+
+        n = b & 0x7f
+        b = buf[pos + 1]
+
+        if b < 0x80:
+            return (n << 7) | b, pos + 2
+
+        n = (n << 7) | (b & 0x7f)
+        b = buf[pos + 2]
+
+        if b < 0x80:
+            return (n << 7) | b, pos + 3
+
+        return (((n << 7) | (b & 0x7f)) << 8) | buf[pos + 3], pos + 4
+
+    def _amf3String(self, pos):
+        """
+        Walks the AMF3 string (without a type marker) at C{pos}, adding it to
+        the string table. Returns the C{memoryview} of its bytes and the
+        offset of the end of it.
+        """
+        ref, end = self._u29(pos)
+
+        if ref & 1 == 0:
+            ref >>= 1
+
+            try:
+                value = self.amf3_strings[ref]
+            except IndexError:
+                raise pyamf.DecodeError(
+                    'Unknown string reference %d at offset %d' % (ref, pos)
+                )
+
+            self.stats.references += 1
+
+            return value, end
+
+        pos = end
+        end = self._string(pos, ref >> 1)
+        value = self.buf[pos:end]
+
+        if value:
+            self.amf3_strings.append(value)
+
+        return value, end
+
+    def _amf3Traits(self, ref, pos):
+        """
+        Returns the C{(name, encoding, attr_len)} of the traits of an object
+        and the offset of the end of them.
+        """
+        if ref & 1 == 0:
+            ref >>= 1
+
+            try:
+                return self.amf3_traits[ref], pos
+            except IndexError:
+                raise pyamf.DecodeError(
+                    'Unknown class reference %d at offset %d' % (ref, pos)
+                )
+
+        ref >>= 1
+        attr_len = ref >> 2
+        name, pos = self._amf3String(pos)
+
+        for i in range(attr_len):
+            pos = self._amf3String(pos)[1]
+
+        traits = (name, ref & 0x03, attr_len)
+        self.amf3_traits.append(traits)
+
+        return traits, pos
+
+    def amf3(self, pos, depth):
+        """
+        Walks the AMF3 element at C{pos}, nested at C{depth}, and returns the
+        offset of the end of it.
+        """
+        buf = self.buf
+        types = self.amf3_types
+        stats = self.stats
+        count = self._count
+        u29 = self._u29
+        read_string = self._amf3String
+        stack = [[_VALUES, 1, depth]]
+
+        while stack:
+            frame = stack[-1]
+
+            if frame[0] == _VALUES:
+                if not frame[1]:
+                    stack.pop()
+
+                    continue
+
+                frame[1] -= 1
+            else:
+                key, pos = read_string(pos)
+
+                if not key:
+                    stack.pop()
+
+                    continue
+
+            depth = frame[2]
+            start = pos
+            marker = buf[pos]
+            pos += 1
+
+            count(start)
+
+            if marker < 0x10:
+                types[marker] += 1
+
+            if marker < 0x04:
+                continue
+            elif marker == 0x04:
+                pos = u29(pos)[1]
+            elif marker == 0x05:
+                pos += 8
+            elif marker == 0x06:
+                pos = read_string(pos)[1]
+            elif marker > 0x0F:
+                raise pyamf.DecodeError(
+                    'Unsupported AMF3 type 0x%02x at offset %d' % (
+                        marker, start
+                    )
+                )
+            else:
+                ref, pos = u29(pos)
+
+                if ref & 1 == 0:
+                    if ref >> 1 >= self.amf3_objects:
+                        raise pyamf.DecodeError(
+                            'Unknown reference %d at offset %d' % (
+                                ref >> 1, start
+                            )
+                        )
+
+                    stats.references += 1
+
+                    continue
+
+                ref >>= 1
+                self.amf3_objects += 1
+                stats.objects += 1
+
+                if marker == 0x0A:
+                    traits, pos = self._amf3Traits(ref, pos)
+                    name, encoding, attr_len = traits
+                    depth = self._open(depth, start)
+
+                    if encoding & 0x01:
+                        # externalised
+                        alias = bytes(name).decode('utf-8', 'replace')
+
+                        try:
+                            length = EXTERNAL_ELEMENTS[alias]
+                        except KeyError:
+                            raise pyamf.DecodeError(
+                                'Unable to scan externalised class %r at '
+                                'offset %d' % (alias, start)
+                            )
+
+                        stack.append([_VALUES, length, depth])
+
+                        continue
+
+                    if encoding == 0x02:
+                        stack.append([_KEYS, 0, depth])
+
+                    stack.append([_VALUES, attr_len, depth])
+                elif marker == 0x09:
+                    if ref > self.max_length:
+                        self._exceeded('max_length', ref, start)
+
+                    depth = self._open(depth, start)
+
+                    stack.append([_VALUES, ref, depth])
+                    stack.append([_KEYS, 0, depth])
+                elif marker == 0x08:
+                    pos += 8
+                elif marker in (0x07, 0x0B):
+                    pos = self._string(pos, ref)
+                elif marker == 0x0C:
+                    if ref > self.max_length:
+                        self._exceeded('max_length', ref, start)
+
+                    pos += ref
+                else:
+                    # vectors
+                    if ref > self.max_length:
+                        self._exceeded('max_length', ref, start)
+
+                    pos += 1 + ref * (8 if marker == 0x0F else 4)
+
+            if pos > self.end:
+                self._truncated(start)
+
+        return pos
+
+
+def _get_buffer(stream):
+    """
+    Returns a C{memoryview} of the bytes in C{stream} and the offset of its
+    current position. The view must be released once the walk is complete.
+    """
+    if isinstance(stream, util.BufferedByteStream):
+        with stream.getbuffer() as buf:
+            return buf.cast('B')[:len(stream)], stream.tell()
+
+    if isinstance(stream, python.buffer_types):
+        with memoryview(stream) as buf:
+            return buf.cast('B'), 0
+
+    raise TypeError('Expected bytes or a BufferedByteStream (got %r)' % (
+        type(stream),
+    ))
+
+
+def scan(stream, encoding=pyamf.AMF3, limits=None):
+    """
+    Walks all of the elements in C{stream}.
+
+    @param stream: The data to walk. C{bytes} like objects are read in place.
+        A L{BufferedByteStream<pyamf.util.BufferedByteStream>} is read from
+        its current position, which is left unchanged.
+    @param encoding: The AMF encoding of C{stream}.
+    @param limits: Optional L{Limits} to enforce.
+    @rtype: L{Stats}
+    @raise LimitExceeded: The data exceeds one of C{limits}.
+    @raise pyamf.DecodeError: The data is malformed, truncated or contains an
+        externalised class that cannot be walked.
+    """
+    buf, pos = _get_buffer(stream)
+
+    with buf:
+        scanner = Scanner(buf, pos, limits)
+
+        while scanner.pos < scanner.end:
+            scanner.readElement(encoding)
+
+        return scanner.getStats()
+
+
+def scan_envelope(stream, limits=None):
+    """
+    Walks the headers and bodies of a remoting envelope (see
+    L{pyamf.remoting.decode}). L{Stats.offsets} contains the offsets of the
+    data of each header followed by each body. C{limits} apply to the
+    envelope as a whole.
+
+    @see: L{scan}
+    """
+    buf, pos = _get_buffer(stream)
+
+    with buf:
+        scanner = Scanner(buf, pos, limits)
+        scanner.readEnvelope()
+
+        return scanner.getStats()
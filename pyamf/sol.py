@@ -15,7 +15,7 @@ a per-domain basis.
 """
 
 import pyamf
-from pyamf import util
+from pyamf import util, python
 
 #: Magic Number - 2 bytes
 HEADER_VERSION = b'\x00\xbf'
@@ -25,15 +25,18 @@ HEADER_SIGNATURE = b'TCSO\x00\x04\x00\x00\x00\x00'
 PADDING_BYTE = b'\x00'
 
 
-def decode(stream, strict=True):
+def decode(stream, strict=True, **kwargs):
     """
     Decodes a SOL stream. L{strict} mode ensures that the sol stream is as spec
-    compatible as possible.
+    compatible as possible. Any other keyword arguments are passed to
+    L{pyamf.get_decoder}.
 
     @return: A C{tuple} containing the C{root_name} and a C{dict} of name,
         value pairs.
     """
-    if not isinstance(stream, util.BufferedByteStream):
+    if isinstance(stream, python.buffer_types):
+        stream = util.get_read_stream(stream)
+    elif not isinstance(stream, util.BufferedByteStream):
         stream = util.BufferedByteStream(stream)
 
     # read the version
@@ -61,7 +64,7 @@ def decode(stream, strict=True):
     if stream.read(3) != PADDING_BYTE * 3:
         raise pyamf.DecodeError('Invalid padding read')
 
-    decoder = pyamf.get_decoder(stream.read_uchar())
+    decoder = pyamf.get_decoder(stream.read_uchar(), **kwargs)
     decoder.stream = stream
 
     values = {}
@@ -82,9 +85,10 @@ def decode(stream, strict=True):
     return (root_name, values)
 
 
-def encode(name, values, strict=True, encoding=pyamf.AMF0):
+def encode(name, values, strict=True, encoding=pyamf.AMF0, **kwargs):
     """
-    Produces a SharedObject encoded stream based on the name and values.
+    Produces a SharedObject encoded stream based on the name and values. Any
+    other keyword arguments are passed to L{pyamf.get_encoder}.
 
     @param name: The root name of the SharedObject.
     @param values: A `dict` of name value pairs to be encoded in the stream.
@@ -94,7 +98,7 @@ def encode(name, values, strict=True, encoding=pyamf.AMF0):
     @rtype: L{BufferedByteStream<pyamf.util.BufferedByteStream>}, a file like
         object.
     """
-    encoder = pyamf.get_encoder(encoding)
+    encoder = pyamf.get_encoder(encoding, **kwargs)
     stream = encoder.stream
 
     # write the header
@@ -134,31 +138,39 @@ def encode(name, values, strict=True, encoding=pyamf.AMF0):
     return stream
 
 
-def load(name_or_file):
+def load(name_or_file, mmap=False):
     """
     Loads a sol file and returns a L{SOL} object.
 
     @param name_or_file: Name of file, or file-object.
     @type name_or_file: C{string}
+    @param mmap: Memory map the file and decode it in place instead of
+        reading it into memory (see L{util.mmap_stream}). Added in 0.8.9.
+    @type mmap: C{bool}
     """
-    f = name_or_file
-    opened = False
+    if mmap:
+        with util.mmap_stream(name_or_file) as stream:
+            name, values = decode(stream)
+    else:
+        f = name_or_file
+        opened = False
 
-    if isinstance(name_or_file, str):
-        f = open(name_or_file, 'rb')
-        opened = True
-    elif not hasattr(f, 'read'):
-        raise ValueError('Readable stream expected')
+        if isinstance(name_or_file, str):
+            f = open(name_or_file, 'rb')
+            opened = True
+        elif not hasattr(f, 'read'):
+            raise ValueError('Readable stream expected')
+
+        name, values = decode(f.read())
+
+        if opened is True:
+            f.close()
 
-    name, values = decode(f.read())
     s = SOL(name)
 
     for n, v in values.items():
         s[n] = v
 
-    if opened is True:
-        f.close()
-
     return s
 
 
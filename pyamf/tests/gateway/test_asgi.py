@@ -0,0 +1,351 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+ASGI gateway tests.
+
+@since: 0.8.9
+"""
+
+import asyncio
+import unittest
+
+import pyamf
+from pyamf import remoting, scan
+from pyamf.flex import messaging
+from pyamf.remoting import gateway
+from pyamf.remoting.gateway.asgi import ASGIGateway
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class ASGIGatewayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.gw = ASGIGateway()
+
+    def doRequest(self, body, method='POST', chunks=1):
+        """
+        Sends C{body} to the gateway in C{chunks} and returns the status,
+        headers and body of the response.
+        """
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': '/',
+            'headers': [],
+        }
+        size = len(body) // chunks + 1
+        received = [
+            {
+                'type': 'http.request',
+                'body': body[i:i + size],
+                'more_body': i + size < len(body),
+            }
+            for i in range(0, len(body), size)
+        ]
+        sent = []
+
+        async def receive():
+            return received.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        run(self.gw(scope, receive, send))
+
+        start = sent[0]
+
+        self.assertEqual(start['type'], 'http.response.start')
+
+        return (
+            start['status'],
+            dict(start['headers']),
+            b''.join(m.get('body', b'') for m in sent[1:])
+        )
+
+    def makeRequest(self, *calls):
+        envelope = remoting.Envelope(pyamf.AMF3)
+
+        for i, (service, body) in enumerate(calls):
+            envelope['/%d' % (i + 1,)] = remoting.Request(service, body=body)
+
+        return remoting.encode(envelope).getvalue()
+
+    def test_bad_method(self):
+        status, headers, body = self.doRequest(b'', method='GET')
+
+        self.assertEqual(status, 400)
+        self.assertTrue(body.startswith(b'400 Bad Request'))
+
+    def test_bad_request(self):
+        status, headers, body = self.doRequest(b'Bad request')
+
+        self.assertEqual(status, 400)
+        self.assertEqual(headers[b'content-type'], b'text/plain')
+
+    def test_limits(self):
+        self.gw = ASGIGateway(limits=scan.Limits(max_depth=2))
+
+        status, headers, body = self.doRequest(
+            self.makeRequest(('echo', [[[[1]]]]))
+        )
+
+        self.assertEqual(status, 400)
+
+    def test_sync_service(self):
+        self.gw.addService(lambda x: x, 'echo')
+
+        status, headers, body = self.doRequest(
+            self.makeRequest(('echo', [u'spam'])), chunks=3
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            headers[b'content-type'], remoting.CONTENT_TYPE.encode('ascii')
+        )
+        self.assertEqual(headers[b'content-length'], str(len(body)).encode())
+
+        envelope = remoting.decode(body)
+
+        self.assertEqual(envelope['/1'].body, u'spam')
+
+    def test_concurrent(self):
+        events = []
+
+        async def wait(name, delay):
+            events.append(('start', name))
+            await asyncio.sleep(delay)
+            events.append(('end', name))
+
+            return name
+
+        self.gw.addService(wait)
+
+        status, headers, body = self.doRequest(self.makeRequest(
+            ('wait', [u'a', 0.05]),
+            ('wait', [u'b', 0.01]),
+            ('wait', [u'c', 0]),
+        ))
+
+        self.assertEqual(status, 200)
+        # all calls started before any finished
+        self.assertEqual(
+            [e[0] for e in events], ['start'] * 3 + ['end'] * 3
+        )
+        self.assertEqual(events[-1], ('end', u'a'))
+
+        envelope = remoting.decode(body)
+
+        self.assertEqual(envelope.keys(), ['/1', '/2', '/3'])
+        self.assertEqual(
+            [message.body for name, message in envelope], [u'a', u'b', u'c']
+        )
+
+    def test_error(self):
+        async def fail():
+            raise ValueError('spam')
+
+        self.gw.addService(fail)
+        self.gw.addService(lambda: u'ok', 'ok')
+
+        status, headers, body = self.doRequest(
+            self.makeRequest(('fail', []), ('ok', []))
+        )
+
+        envelope = remoting.decode(body)
+        error = envelope['/1']
+
+        self.assertEqual(error.status, remoting.STATUS_ERROR)
+        self.assertEqual(error.body.code, 'ValueError')
+        self.assertEqual(error.body.description, 'spam')
+        self.assertEqual(envelope['/2'].body, u'ok')
+
+    def test_unknown_service(self):
+        status, headers, body = self.doRequest(
+            self.makeRequest(('spam.eggs', []))
+        )
+
+        envelope = remoting.decode(body)
+
+        self.assertEqual(envelope['/1'].status, remoting.STATUS_ERROR)
+        self.assertEqual(
+            envelope['/1'].body.code, 'Service.ResourceNotFound'
+        )
+
+    def test_authenticator(self):
+        async def auth(username, password):
+            return username == 'fred'
+
+        self.gw = ASGIGateway(authenticator=auth)
+        self.gw.addService(lambda: u'ok', 'ok')
+
+        envelope = remoting.Envelope(pyamf.AMF0)
+        request = remoting.Request('ok', body=[])
+        envelope['/1'] = request
+        envelope.headers['Credentials'] = {
+            'userid': 'fred', 'password': 'wilma'
+        }
+
+        status, headers, body = self.doRequest(
+            remoting.encode(envelope).getvalue()
+        )
+
+        self.assertEqual(remoting.decode(body)['/1'].body, u'ok')
+
+        envelope.headers['Credentials']['userid'] = 'barney'
+
+        status, headers, body = self.doRequest(
+            remoting.encode(envelope).getvalue()
+        )
+        response = remoting.decode(body)['/1']
+
+        self.assertEqual(response.status, remoting.STATUS_ERROR)
+        self.assertEqual(response.body.code, 'AuthenticationError')
+
+    def test_expose_request(self):
+        requests = []
+
+        @gateway.expose_request
+        async def echo(http_request, x):
+            requests.append(http_request)
+
+            return x
+
+        self.gw.addService(echo)
+
+        self.doRequest(self.makeRequest(('echo', [1]), ('echo', [2])))
+
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0]['type'], 'http')
+        self.assertEqual(requests[0]['pyamf.request'].body, [1])
+        self.assertEqual(requests[1]['pyamf.request'].body, [2])
+
+    def test_remoting_message(self):
+        async def echo(x):
+            await asyncio.sleep(0)
+
+            return x
+
+        self.gw.addService(echo)
+
+        message = messaging.RemotingMessage(
+            operation='echo', body=[u'spam'], headers={'DSId': 'foo'}
+        )
+
+        status, headers, body = self.doRequest(
+            self.makeRequest(('null', [message]))
+        )
+
+        ack = remoting.decode(body)['/1'].body
+
+        self.assertTrue(isinstance(ack, messaging.AcknowledgeMessage))
+        self.assertEqual(ack.body, u'spam')
+        self.assertEqual(ack.headers['DSId'], 'foo')
+
+    def test_remoting_message_error(self):
+        errors = []
+
+        async def fail():
+            raise ValueError('spam')
+
+        self.gw.addService(fail)
+        self.gw.onServiceError = lambda request, fault: errors.append(fault)
+
+        message = messaging.RemotingMessage(operation='fail', body=[])
+
+        status, headers, body = self.doRequest(
+            self.makeRequest(('null', [message]))
+        )
+
+        response = remoting.decode(body)['/1']
+
+        self.assertEqual(response.status, remoting.STATUS_ERROR)
+        self.assertTrue(isinstance(response.body, messaging.ErrorMessage))
+        self.assertEqual(len(errors), 1)
+
+    def test_cache(self):
+        calls = []
+
+        async def echo(x):
+            calls.append(x)
+
+            return x
+
+        self.gw.addService(echo, cache=True)
+
+        for i in range(2):
+            status, headers, body = self.doRequest(self.makeRequest(
+                ('echo', [u'spam']),
+                ('null', [messaging.RemotingMessage(
+                    operation='echo', body=[u'eggs']
+                )]),
+            ))
+
+            envelope = remoting.decode(body)
+
+            self.assertEqual(envelope['/1'].body, u'spam')
+            self.assertEqual(envelope['/2'].body.body, u'eggs')
+
+        self.assertEqual(calls, [u'spam', u'eggs'])
+
+    def test_cache_externalised(self):
+        class Spam(object):
+            class __amf__:
+                external = True
+
+            def __writeamf__(self, output):
+                output.writeUTF(u'eggs')
+
+            def __readamf__(self, input):
+                self.value = input.readUTF()
+
+        pyamf.register_class(Spam, 'test.Spam')
+        self.addCleanup(pyamf.unregister_class, Spam)
+
+        self.gw.addService(lambda: Spam(), 'spam', cache=True)
+
+        status, headers, body = self.doRequest(self.makeRequest(
+            ('spam', []),
+        ))
+        response = remoting.decode(body)['/1']
+
+        self.assertEqual(response.status, remoting.STATUS_OK)
+        self.assertEqual(response.body.value, u'eggs')
+
+    def test_chunk_size(self):
+        self.gw = ASGIGateway(chunk_size=8)
+        self.gw.addService(lambda x: x, 'echo')
+
+        status, headers, body = self.doRequest(
+            self.makeRequest(('echo', [u'spam' * 10]))
+        )
+
+        self.assertEqual(status, 200)
+        self.assertFalse(b'content-length' in headers)
+        self.assertEqual(remoting.decode(body)['/1'].body, u'spam' * 10)
+
+    def test_lifespan(self):
+        received = [
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ]
+        sent = []
+
+        async def receive():
+            return received.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        run(self.gw({'type': 'lifespan'}, receive, send))
+
+        self.assertEqual(sent, [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete'
+        ])
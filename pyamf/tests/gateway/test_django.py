@@ -12,6 +12,7 @@ Django gateway tests.
 import unittest
 import sys
 import os
+import types
 
 try:
     from cStringIO import StringIO
@@ -27,6 +28,7 @@ except ImportError:
 
 import pyamf
 from pyamf import remoting, util
+from pyamf.tests import util as test_util
 
 
 def make_http_request(method, body=''):
@@ -249,3 +251,145 @@ class DjangoGatewayTestCase(BaseTestCase):
         self.assertTrue(self.executed)
 
         self.assertEqual(res['/1'].body, now)
+
+    def test_chunk_size(self):
+        gw = django.DjangoGateway(
+            {'test.test': lambda x: x},
+            expose_request=False,
+            chunk_size=8
+        )
+
+        msg = remoting.Envelope(amfVersion=pyamf.AMF0)
+        msg['/1'] = remoting.Request(target='test.test', body=['spam' * 10])
+
+        http_request = make_http_request(
+            'POST',
+            remoting.encode(msg).getvalue()
+        )
+
+        http_response = gw(http_request)
+
+        self.assertTrue(http_response.streaming)
+        self.assertFalse(http_response.has_header('Content-Length'))
+
+        res = remoting.decode(b''.join(http_response.streaming_content))
+
+        self.assertEqual(res['/1'].body, 'spam' * 10)
+
+
+class FakeHttpResponse(object):
+    """
+    Stands in for C{django.http.HttpResponse}.
+    """
+
+    streaming = False
+
+    def __init__(self, content=b'', content_type=None):
+        self.content = content
+        self.content_type = content_type
+        self.status_code = 200
+        self.headers = {}
+
+    def __setitem__(self, name, value):
+        self.headers[name] = value
+
+    def write(self, data):
+        self.content += data
+
+
+class FakeStreamingHttpResponse(FakeHttpResponse):
+    """
+    Stands in for C{django.http.StreamingHttpResponse}.
+    """
+
+    streaming = True
+
+    def __init__(self, streaming_content, content_type=None):
+        FakeHttpResponse.__init__(self, content_type=content_type)
+
+        self.streaming_content = streaming_content
+
+
+class FakeHttpRequest(object):
+    """
+    Stands in for C{django.http.HttpRequest}.
+    """
+
+    method = 'POST'
+
+    def __init__(self, body):
+        self.body = body
+
+
+def load_fake_django():
+    """
+    Returns a copy of L{pyamf.remoting.gateway.django} that uses the fakes
+    above instead of Django.
+    """
+    fake_django = types.ModuleType('django')
+    fake_django.http = types.ModuleType('django.http')
+    fake_django.conf = types.ModuleType('django.conf')
+
+    fake_django.http.HttpResponse = FakeHttpResponse
+    fake_django.http.HttpResponseServerError = FakeHttpResponse
+    fake_django.http.StreamingHttpResponse = FakeStreamingHttpResponse
+    fake_django.conf.settings = object()
+
+    return test_util.load_module('pyamf.remoting.gateway.django', {
+        'django': fake_django,
+        'django.http': fake_django.http,
+        'django.conf': fake_django.conf,
+    })
+
+
+class FakeDjangoStreamingTestCase(unittest.TestCase):
+    """
+    Tests for streamed responses that run without Django installed.
+    """
+
+    def setUp(self):
+        self.module = load_fake_django()
+
+    def makeRequest(self, body):
+        msg = remoting.Envelope(amfVersion=pyamf.AMF0)
+        msg['/1'] = remoting.Request(target='echo', body=[body])
+
+        return FakeHttpRequest(remoting.encode(msg).getvalue())
+
+    def test_chunk_size(self):
+        gw = self.module.DjangoGateway(
+            {'echo': lambda x: x},
+            expose_request=False,
+            chunk_size=8
+        )
+
+        http_response = gw(self.makeRequest('spam' * 10))
+
+        self.assertTrue(isinstance(http_response, FakeStreamingHttpResponse))
+        self.assertFalse('Content-Length' in http_response.headers)
+        self.assertEqual(http_response.content_type, remoting.CONTENT_TYPE)
+
+        chunks = list(http_response.streaming_content)
+
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(len(chunks[0]), 8)
+
+        res = remoting.decode(b''.join(chunks))
+
+        self.assertEqual(res['/1'].body, 'spam' * 10)
+
+    def test_chunk_size_encode_error(self):
+        """
+        A response that fails to encode before the first chunk is sent is
+        reported as a server error.
+        """
+        gw = self.module.DjangoGateway(
+            {'echo': lambda x: len},
+            expose_request=False,
+            chunk_size=8
+        )
+
+        http_response = gw(self.makeRequest('spam'))
+
+        self.assertFalse(http_response.streaming)
+        self.assertTrue(http_response.content.startswith('500 '))
@@ -7,6 +7,8 @@ Twisted gateway tests.
 @since: 0.1.0
 """
 
+import types
+
 try:
     from twisted.internet import reactor, defer
     from twisted.python import failure
@@ -23,6 +25,7 @@ import pyamf
 from pyamf import remoting
 from pyamf.remoting import gateway
 from pyamf.flex import messaging
+from pyamf.tests import util
 
 
 class TestService(object):
@@ -890,3 +893,162 @@ class AMF3RequestProcessorTestCase(BaseTestCase):
         proc(request).addCallback(cb).addErrback(lambda failure: d.errback())
 
         return d
+
+
+class FakeFailure(object):
+    """
+    Stands in for C{twisted.python.failure.Failure}.
+    """
+
+    def __init__(self, exc):
+        self.value = exc
+        self.type = type(exc)
+
+    def getErrorMessage(self):
+        return str(self.value)
+
+    def getTraceback(self):
+        return ''
+
+
+class FakeDeferred(object):
+    """
+    Stands in for the C{Deferred} returned by C{threads.deferToThread}, the
+    function is called straight away.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        try:
+            self.result = func(*args, **kwargs)
+            self.failure = None
+        except Exception as e:
+            self.failure = FakeFailure(e)
+
+    def addCallbacks(self, callback, errback):
+        if self.failure is None:
+            callback(self.result)
+        else:
+            errback(self.failure)
+
+        return self
+
+
+class FakeRequest(object):
+    """
+    Stands in for C{twisted.web.http.Request}.
+    """
+
+    def __init__(self):
+        self.code = None
+        self.headers = {}
+        self.written = []
+        self.finished = False
+        self.lost = False
+
+    def setResponseCode(self, code):
+        self.code = code
+
+    def setHeader(self, name, value):
+        self.headers[name] = value
+
+    def write(self, data):
+        self.written.append(data)
+
+    def finish(self):
+        self.finished = True
+
+    def loseConnection(self):
+        self.lost = True
+
+
+def load_fake_twisted():
+    """
+    Returns a copy of L{pyamf.remoting.gateway.twisted} that uses the fakes
+    above instead of Twisted.
+    """
+    names = [
+        'twisted',
+        'twisted.internet',
+        'twisted.internet.defer',
+        'twisted.internet.threads',
+        'twisted.web',
+        'twisted.web.resource',
+        'twisted.web.server',
+    ]
+    modules = dict((name, types.ModuleType(name)) for name in names)
+
+    for name in names[1:]:
+        parent, _, child = name.rpartition('.')
+
+        setattr(modules[parent], child, modules[name])
+
+    modules['twisted.internet.threads'].deferToThread = FakeDeferred
+    modules['twisted.web.resource'].Resource = type(
+        'Resource', (object,), {}
+    )
+    modules['twisted.web.server'].NOT_DONE_YET = 1
+
+    return util.load_module('pyamf.remoting.gateway.twisted', modules)
+
+
+class FakeTwistedStreamingTestCase(unittest.TestCase):
+    """
+    Tests for streamed responses that run without Twisted installed.
+    """
+
+    def setUp(self):
+        self.module = load_fake_twisted()
+        self.request = FakeRequest()
+
+    def makeResponse(self, body):
+        msg = remoting.Envelope(amfVersion=pyamf.AMF0)
+        msg['/1'] = remoting.Response(body)
+
+        return msg
+
+    def test_chunk_size(self):
+        gw = self.module.TwistedGateway(chunk_size=8)
+
+        gw.sendResponse(self.makeResponse('spam' * 10), self.request)
+
+        self.assertEqual(self.request.code, 200)
+        self.assertFalse('Content-Length' in self.request.headers)
+        self.assertEqual(
+            self.request.headers['Content-Type'],
+            remoting.CONTENT_TYPE
+        )
+        self.assertTrue(self.request.finished)
+        self.assertTrue(len(self.request.written) > 1)
+        self.assertEqual(len(self.request.written[0]), 8)
+
+        res = remoting.decode(b''.join(self.request.written))
+
+        self.assertEqual(res['/1'].body, 'spam' * 10)
+
+    def test_chunk_size_encode_error(self):
+        """
+        A response that fails to encode before the first chunk is sent is
+        reported as a server error.
+        """
+        gw = self.module.TwistedGateway(chunk_size=8)
+
+        gw.sendResponse(self.makeResponse(len), self.request)
+
+        self.assertEqual(self.request.code, 500)
+        self.assertFalse(self.request.lost)
+        self.assertTrue(self.request.written[0].startswith('500 '))
+
+    def test_chunk_size_stream_error(self):
+        """
+        The connection is dropped if encoding fails once the response has
+        started.
+        """
+        gw = self.module.TwistedGateway(chunk_size=8)
+        msg = self.makeResponse('spam')
+        msg['/2'] = remoting.Response(len)
+
+        gw.sendResponse(msg, self.request)
+
+        self.assertEqual(self.request.code, 200)
+        self.assertTrue(self.request.lost)
+        self.assertFalse(self.request.finished)
@@ -12,7 +12,8 @@ WSGI gateway tests.
 import unittest
 
 import pyamf
-from pyamf import remoting, util
+from pyamf import remoting, scan, util
+from pyamf.remoting import gateway
 from pyamf.remoting.gateway.wsgi import WSGIGateway
 
 
@@ -189,3 +190,77 @@ class WSGIServerTestCase(unittest.TestCase):
         message = envelope['/1']
 
         self.assertEqual(message.body, now)
+
+    def test_chunk_size(self):
+        def echo(data):
+            return data
+
+        def start_response(status, headers):
+            self.assertEqual(status, '200 OK')
+            self.assertFalse('Content-Length' in dict(headers))
+
+        self.gw = WSGIGateway(chunk_size=8)
+        self.gw.addService(echo)
+
+        response = self.doRequest(
+            self.makeRequest('echo', 'spam' * 10), start_response)
+        chunks = list(response)
+
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(len(chunks[0]), 8)
+
+        envelope = remoting.decode(b''.join(chunks))
+
+        self.assertEqual(envelope['/1'].body, 'spam' * 10)
+
+    def test_codec_pool(self):
+        def echo(data):
+            return data
+
+        self.gw = WSGIGateway(codec_pool=True)
+        self.gw.addService(echo)
+
+        for i in range(2):
+            response = self.doRequest(self.makeRequest('echo', 'spam'), None)
+            envelope = remoting.decode(b''.join(response))
+
+            self.assertEqual(envelope['/1'].body, 'spam')
+
+    def test_limits(self):
+        def echo(data):
+            self.fail('The request should not be decoded')
+
+        def start_response(status, headers):
+            self.assertEqual(status, '400 Bad Request')
+
+        self.gw = WSGIGateway(limits=scan.Limits(max_depth=2))
+        self.gw.addService(echo)
+
+        self.doRequest(self.makeRequest('echo', [[[1]]]), start_response)
+
+        self.assertTrue(self.executed)
+
+    def test_concurrency(self):
+        requests = []
+
+        @gateway.expose_request
+        def echo(environ, data):
+            requests.append(environ['pyamf.request'])
+
+            return data
+
+        self.gw = WSGIGateway(concurrency=2)
+        self.gw.addService(echo)
+
+        envelope = remoting.Envelope(pyamf.AMF3)
+        envelope['/1'] = remoting.Request('echo', body=['spam'])
+        envelope['/2'] = remoting.Request('echo', body=['eggs'])
+
+        response = self.doRequest(remoting.encode(envelope), None)
+        envelope = remoting.decode(b''.join(response))
+
+        self.assertEqual(envelope['/1'].body, 'spam')
+        self.assertEqual(envelope['/2'].body, 'eggs')
+        self.assertEqual(
+            sorted(request.body[0] for request in requests), ['eggs', 'spam']
+        )
@@ -0,0 +1,255 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Tests for L{pyamf.remoting.batch}.
+
+@since: 0.8.9
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import pyamf
+from pyamf import remoting
+from pyamf.remoting import batch
+
+
+class Spam(object):
+    pass
+
+
+def get_targets(envelope):
+    return [message.target for name, message in envelope]
+
+
+def get_body_types(envelope):
+    return [type(message.body[0]).__name__ for name, message in envelope]
+
+
+#: Set by L{initialize} in the worker processes.
+initialized = []
+
+
+def initialize(*args):
+    initialized.append(args)
+
+
+def get_initialized(envelope):
+    return list(initialized)
+
+
+class BaseTestCase(unittest.TestCase):
+    """
+    Provides some encoded envelopes.
+    """
+
+    def setUp(self):
+        self.envelopes = []
+
+        for i in range(10):
+            msg = remoting.Envelope(pyamf.AMF0)
+            msg['/1'] = remoting.Request('spam.eggs%d' % (i,), [i])
+
+            self.envelopes.append(remoting.encode(msg).getvalue())
+
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+
+class ArchiveTestCase(BaseTestCase):
+    """
+    Tests for L{batch.read_archive} and L{batch.write_archive}.
+    """
+
+    def test_round_trip(self):
+        stream = io.BytesIO()
+
+        self.assertEqual(batch.write_archive(stream, self.envelopes), 10)
+
+        stream.seek(0)
+
+        self.assertEqual(list(batch.read_archive(stream)), self.envelopes)
+
+    def test_envelope(self):
+        msg = remoting.decode(self.envelopes[0])
+        stream = io.BytesIO()
+
+        batch.write_archive(stream, [msg])
+        stream.seek(0)
+
+        self.assertEqual(list(batch.read_archive(stream)), self.envelopes[:1])
+
+    def test_file_name(self):
+        filename = os.path.join(self.tmpdir, 'traffic.amfa')
+
+        batch.write_archive(filename, self.envelopes)
+
+        self.assertEqual(list(batch.read_source(filename)), self.envelopes)
+
+    def test_truncated(self):
+        stream = io.BytesIO()
+
+        batch.write_archive(stream, self.envelopes[:1])
+
+        for size in (2, len(stream.getvalue()) - 1):
+            truncated = io.BytesIO(stream.getvalue()[:size])
+
+            self.assertRaises(
+                pyamf.DecodeError,
+                list,
+                batch.read_archive(truncated)
+            )
+
+    def test_directory(self):
+        for i, data in enumerate(reversed(self.envelopes)):
+            name = os.path.join(self.tmpdir, '%02d.amf' % (9 - i,))
+
+            with open(name, 'wb') as f:
+                f.write(data)
+
+        os.mkdir(os.path.join(self.tmpdir, 'subdir'))
+
+        self.assertEqual(list(batch.read_source(self.tmpdir)), self.envelopes)
+
+
+class DecodeAllTestCase(BaseTestCase):
+    """
+    Tests for L{batch.decode_all}.
+    """
+
+    def test_in_process(self):
+        results = list(batch.decode_all(self.envelopes, max_workers=0))
+
+        self.assertEqual(len(results), 10)
+        self.assertTrue(isinstance(results[0], remoting.Envelope))
+        self.assertEqual(results[3]['/1'].target, 'spam.eggs3')
+
+    def test_ordered(self):
+        results = batch.decode_all(
+            self.envelopes,
+            func=get_targets,
+            max_workers=2,
+            chunk_size=1
+        )
+
+        self.assertEqual(
+            list(results),
+            [['spam.eggs%d' % (i,)] for i in range(10)]
+        )
+
+    def test_envelopes(self):
+        results = list(batch.decode_all(self.envelopes, max_workers=2))
+
+        self.assertEqual(results[9]['/1'].body, [9])
+
+    def test_shared_aliases(self):
+        pyamf.register_class(Spam, 'batch.Spam')
+        self.addCleanup(pyamf.unregister_class, Spam)
+
+        msg = remoting.Envelope(pyamf.AMF3)
+        msg['/1'] = remoting.Request('spam', [Spam()])
+
+        results = batch.decode_all(
+            [remoting.encode(msg).getvalue()],
+            func=get_body_types,
+            max_workers=1
+        )
+
+        self.assertEqual(list(results), [['Spam']])
+
+    def test_initializer(self):
+        results = batch.decode_all(
+            self.envelopes[:1],
+            func=get_initialized,
+            max_workers=1,
+            initializer=initialize,
+            initargs=('spam', 'eggs')
+        )
+
+        self.assertEqual(list(results), [[('spam', 'eggs')]])
+        self.assertEqual(initialized, [])
+
+    def test_error(self):
+        results = batch.decode_all(
+            self.envelopes[:2] + [b'\x00\x0a'],
+            max_workers=1
+        )
+
+        self.assertRaises(pyamf.DecodeError, list, results)
+
+    def test_chunk_size(self):
+        self.assertRaises(
+            ValueError,
+            list,
+            batch.decode_all(self.envelopes, chunk_size=0)
+        )
+
+
+class MainTestCase(BaseTestCase):
+    """
+    Tests for the command line interface.
+    """
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        err = io.StringIO()
+
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            ret = batch.main(list(args))
+
+        return ret, out.getvalue(), err.getvalue()
+
+    def test_summary(self):
+        filename = os.path.join(self.tmpdir, 'traffic.amfa')
+
+        batch.write_archive(filename, self.envelopes[:2])
+
+        ret, out, err = self.run_main('-j', '0', filename)
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(
+            out,
+            '0\t0\t\t/1=spam.eggs0\n'
+            '1\t0\t\t/1=spam.eggs1\n'
+        )
+
+    def test_error(self):
+        filename = os.path.join(self.tmpdir, 'traffic.amfa')
+
+        with open(filename, 'wb') as f:
+            f.write(b'\x00\x00')
+
+        ret, out, err = self.run_main('-j', '0', filename)
+
+        self.assertEqual(ret, 1)
+        self.assertTrue(err.startswith('error: '))
+
+    def test_truncated_envelope(self):
+        filename = os.path.join(self.tmpdir, 'traffic.amfa')
+
+        batch.write_archive(filename, [self.envelopes[0][:-3]])
+
+        ret, out, err = self.run_main('-j', '0', filename)
+
+        self.assertEqual(ret, 1)
+        self.assertEqual(out, '')
+        self.assertTrue(err.startswith('error: '))
+
+    def test_module(self):
+        filename = os.path.join(self.tmpdir, 'traffic.amfa')
+
+        batch.write_archive(filename, self.envelopes[:1])
+
+        ret, out, err = self.run_main(
+            '-j', '1', '-m', 'pyamf.tests.remoting.test_batch', filename
+        )
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(out, '0\t0\t\t/1=spam.eggs0\n')
@@ -0,0 +1,143 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Tests for L{pyamf.remoting.cache}.
+
+@since: 0.8.9
+"""
+
+import datetime
+import unittest
+
+import pyamf
+from pyamf.remoting import cache
+from pyamf.tests.util import ClassCacheClearingTestCase
+
+
+class Spam(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """
+    Tests for L{cache.LRUCache}.
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = cache.LRUCache(max_size=2, clock=self.clock)
+
+    def test_get(self):
+        self.assertEqual(self.cache.get('a'), None)
+
+        self.cache.set('a', 1)
+
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evict(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get('b'), None)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('c'), 3)
+
+    def test_ttl(self):
+        self.cache.set('a', 1, 10)
+        self.cache.set('b', 2)
+
+        self.clock.now = 9.9
+
+        self.assertEqual(self.cache.get('a'), 1)
+
+        self.clock.now = 10
+
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.get('b'), 2)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_delete(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+
+        self.cache.delete('a')
+        self.cache.delete('spam')
+
+        self.assertEqual(self.cache.get('a'), None)
+
+        self.cache.clear()
+
+        self.assertEqual(len(self.cache), 0)
+
+
+class MakeKeyTestCase(ClassCacheClearingTestCase):
+    """
+    Tests for L{cache.make_key}.
+    """
+
+    def assertSameKey(self, *args):
+        keys = set(cache.make_key('spam', arg) for arg in args)
+
+        self.assertEqual(len(keys), 1)
+
+    def assertDifferentKeys(self, *args):
+        keys = set(cache.make_key('spam', arg) for arg in args)
+
+        self.assertEqual(len(keys), len(args))
+
+    def test_key(self):
+        key = cache.make_key('spam', [1, u'eggs'])
+
+        self.assertEqual(len(key), 40)
+        self.assertEqual(key, cache.make_key('spam', [1, u'eggs']))
+        self.assertNotEqual(key, cache.make_key('eggs', [1, u'eggs']))
+
+    def test_scalars(self):
+        self.assertDifferentKeys(
+            1, 1.0, True, u'1', b'1', None, pyamf.Undefined,
+            datetime.date(2010, 1, 1), datetime.datetime(2010, 1, 1),
+        )
+
+    def test_dict(self):
+        self.assertSameKey({'a': 1, 'b': 2}, {'b': 2, 'a': 1})
+        self.assertDifferentKeys(
+            {'a': 1, 'b': 2}, {'a': 2, 'b': 1}, pyamf.ASObject(a=1, b=2)
+        )
+
+    def test_list(self):
+        self.assertSameKey([1, [2]], [1, [2]])
+        self.assertDifferentKeys([1, [2]], [[1], 2], (1, [2]), [1, 2])
+
+    def test_object(self):
+        pyamf.register_class(Spam, 'spam.Spam')
+
+        self.assertSameKey(Spam(a=1, b=[2]), Spam(b=[2], a=1))
+        self.assertDifferentKeys(Spam(a=1), Spam(a=2), {'a': 1})
+
+    def test_cycle(self):
+        a = [1]
+        a.append(a)
+        b = [1]
+        b.append(b)
+
+        self.assertSameKey(a, b)
+
+        # the same object twice is not a cycle
+        c = [1]
+
+        self.assertSameKey([c, c], [[1], [1]])
@@ -213,6 +213,149 @@ class GetEncodableAttributesTestCase(unittest.TestCase):
         self.assertEquals(ret, {'bar': 'bar', 'spam': 'eggs'})
 
 
+class EncodePlanTestCase(unittest.TestCase):
+    """
+    Tests for L{ClassAlias.getEncodePlan}
+    """
+
+    def setUp(self):
+        self.alias = ClassAlias(Spam, 'foo', defer=True)
+        self.obj = Spam()
+
+    def test_static(self):
+        self.alias.static_attrs = ['foo', 'bar']
+        self.alias.compile()
+
+        self.obj.foo = 'bar'
+        self.obj.spam = 'eggs'
+
+        plan = self.alias.getEncodePlan()
+
+        self.assertEqual(plan.static_attrs, ('bar', 'foo'))
+        self.assertEqual(plan.static_names, (b'bar', b'foo'))
+        self.assertEqual(
+            plan.getStaticValues(self.obj), (pyamf.Undefined, 'bar'))
+        self.assertEqual(
+            list(plan.getDynamicItems(self.obj)), [('spam', 'eggs')])
+
+    def test_matches_attributes(self):
+        self.alias.static_attrs = ['foo']
+        self.alias.exclude_attrs = ['baz']
+        self.alias.compile()
+
+        self.obj.foo = 'bar'
+        self.obj.spam = 'eggs'
+        self.obj.baz = 'gak'
+
+        plan = self.alias.getEncodePlan()
+        attrs = dict(zip(plan.static_attrs, plan.getStaticValues(self.obj)))
+        attrs.update(plan.getDynamicItems(self.obj))
+
+        self.assertEqual(
+            attrs, self.alias.getEncodableAttributes(self.obj))
+
+    def test_not_dynamic(self):
+        self.alias.compile()
+        self.alias.dynamic = False
+
+        self.obj.foo = 'bar'
+
+        plan = self.alias.getEncodePlan()
+
+        self.assertEqual(list(plan.getDynamicItems(self.obj)), [])
+
+    def test_cached(self):
+        self.alias.compile()
+
+        plan = self.alias.getEncodePlan()
+
+        self.assertIdentical(plan, self.alias.getEncodePlan())
+
+        self.alias.static_attrs = ['foo']
+
+        self.assertNotIdentical(plan, self.alias.getEncodePlan())
+        self.assertEqual(self.alias.getEncodePlan().static_attrs, ('foo',))
+
+    def test_unsupported(self):
+        self.alias.synonym_attrs = {'foo': 'bar'}
+        self.alias.compile()
+
+        self.assertEqual(self.alias.getEncodePlan(), None)
+
+        self.alias = ClassAlias(Spam, 'foo', proxy_attrs=['foo'])
+        self.assertEqual(self.alias.getEncodePlan(), None)
+
+        class MyAlias(ClassAlias):
+            def getEncodableAttributes(self, obj, codec=None):
+                return {}
+
+        self.alias = MyAlias(Spam, 'foo')
+        self.assertEqual(self.alias.getEncodePlan(), None)
+
+        self.alias = ClassAlias(Spam, 'foo')
+        self.alias.getAttribute = lambda *args, **kwargs: None
+
+        self.assertEqual(self.alias.getEncodePlan(), None)
+
+
+class DecodePlanTestCase(unittest.TestCase):
+    """
+    Tests for L{ClassAlias.getDecodePlan}
+    """
+
+    def setUp(self):
+        self.alias = ClassAlias(Spam, 'foo', defer=True)
+        self.obj = Spam()
+
+    def test_shortcut(self):
+        plan = self.alias.getDecodePlan([b'foo', b'bar'])
+
+        self.assertEqual(plan.names, ('foo', 'bar'))
+        self.assertEqual(plan.slots, ((0, 'foo'), (1, 'bar')))
+
+        plan.apply(self.obj, ['spam', 'eggs'])
+
+        self.assertEqual(self.obj.__dict__, {'foo': 'spam', 'bar': 'eggs'})
+
+    def test_filtered(self):
+        self.alias.readonly_attrs = ['bar']
+        self.alias.exclude_attrs = ['baz']
+        self.alias.synonym_attrs = {'spam': 'foo'}
+
+        plan = self.alias.getDecodePlan(['foo', 'bar', 'baz', 'gak'])
+
+        self.assertEqual(plan.slots, ((0, 'spam'), (3, 'gak')))
+
+        plan.apply(self.obj, [1, 2, 3, 4])
+
+        self.assertEqual(self.obj.__dict__, {'spam': 1, 'gak': 4})
+
+    def test_cached(self):
+        plan = self.alias.getDecodePlan(['foo'])
+
+        self.assertIdentical(plan, self.alias.getDecodePlan(['foo']))
+        self.assertNotIdentical(plan, self.alias.getDecodePlan(['bar']))
+
+        self.alias.exclude_attrs = ['foo']
+
+        self.assertNotIdentical(plan, self.alias.getDecodePlan(['foo']))
+
+    def test_missing_static(self):
+        self.alias.static_attrs = ['foo', 'bar']
+
+        self.assertEqual(self.alias.getDecodePlan(['foo']), None)
+        self.assertNotEqual(self.alias.getDecodePlan(['bar', 'foo']), None)
+
+    def test_unsupported(self):
+        class MyAlias(ClassAlias):
+            def applyAttributes(self, obj, attrs, codec=None):
+                pass
+
+        self.alias = MyAlias(Spam, 'foo')
+
+        self.assertEqual(self.alias.getDecodePlan(['foo']), None)
+
+
 class GetDecodableAttributesTestCase(unittest.TestCase):
     """
     Tests for L{ClassAlias.getDecodableAttributes}
@@ -1065,6 +1208,16 @@ class CompilationIntegrationTestCase(unittest.TestCase):
         self.assertEqual(d.encodable_properties, ['bar', 'foo', 'gak', 'spam'])
         self.assertEqual(d.decodable_properties, ['bar', 'foo', 'gak', 'spam'])
 
+    def test_slots_dict(self):
+        class A(dict):
+            __slots__ = ('alias',)
+
+        a = ClassAlias(A)
+
+        self.assertTrue(a.dynamic)
+        self.assertEqual(a.encodable_properties, None)
+        self.assertEqual(a.decodable_properties, None)
+
     def test_properties(self):
         class A:
             a_rw = property(lambda _: None, lambda _, x: None)
@@ -63,6 +63,33 @@ class EncoderTestCase(ClassCacheClearingTestCase, EncoderMixIn):
         self.assertEncoded(-123, b'\x00\xc0\x5e\xc0\x00\x00\x00\x00\x00')
         self.assertEncoded(1.23456789, b'\x00\x3f\xf3\xc0\xca\x42\x83\xde\x1b')
 
+    def test_references_none(self):
+        y = [1]
+        encoder = amf0.Encoder(references='none')
+
+        encoder.writeElement([y, y])
+
+        self.assertEqual(
+            encoder.stream.getvalue(),
+            b'\n\x00\x00\x00\x02\n\x00\x00\x00\x01\x00?\xf0\x00\x00\x00'
+            b'\x00\x00\x00\n\x00\x00\x00\x01\x00?\xf0\x00\x00\x00\x00'
+            b'\x00\x00'
+        )
+
+    def test_references_amf3(self):
+        encoder = amf0.Encoder(
+            use_amf3=True,
+            references='none',
+            detect_cycles=True
+        )
+
+        encoder.writeElement(u'spam')
+
+        amf3_encoder = encoder.context.getAMF3Encoder(encoder)
+
+        self.assertEqual(amf3_encoder.references, 'none')
+        self.assertTrue(amf3_encoder.detect_cycles)
+
     def test_boolean(self):
         self.assertEncoded(True, b'\x01\x01')
         self.assertEncoded(False, b'\x01\x00')
@@ -68,6 +68,179 @@ class TypesTestCase(unittest.TestCase):
         self.assertEqual(amf3.TYPE_BYTEARRAY, b'\x0c')
 
 
+class IntegerEncodingTestCase(unittest.TestCase):
+    """
+    Tests for L{amf3.encode_int} and L{amf3.encode_ints}.
+    """
+
+    values = [
+        (0, b'\x00'),
+        (0x7f, b'\x7f'),
+        (0x80, b'\x81\x00'),
+        (0x3fff, b'\xff\x7f'),
+        (0x4000, b'\x81\x80\x00'),
+        (0x1fffff, b'\xff\xff\x7f'),
+        (0x200000, b'\x80\xc0\x80\x00'),
+        (-1, b'\xff\xff\xff\xff'),
+        (amf3.ENCODED_INT_MIN, b'\xff\xff\xfc\x00'),
+        (amf3.ENCODED_INT_MIN - 1, b'\xff\xff\xfb\xff'),
+        (amf3.ENCODED_INT_MAX, b'\x83\xff\x7f'),
+        (amf3.ENCODED_INT_MAX + 1, b'\x84\x80\x00'),
+        (amf3.MIN_29B_INT, b'\xc0\x80\x80\x00'),
+        (amf3.MAX_29B_INT, b'\xbf\xff\xff\xff'),
+    ]
+
+    def test_encode_int(self):
+        for n, expected in self.values:
+            self.assertEqual(amf3.encode_int(n), expected, n)
+
+    def test_round_trip(self):
+        for n, expected in self.values:
+            stream = util.BufferedByteStream(expected)
+
+            self.assertEqual(amf3.decode_int(stream, signed=True), n)
+
+    def test_overflow(self):
+        self.assertRaises(OverflowError, amf3.encode_int, amf3.MIN_29B_INT - 1)
+        self.assertRaises(OverflowError, amf3.encode_int, amf3.MAX_29B_INT + 1)
+        self.assertRaises(
+            OverflowError, amf3.encode_ints, [1, amf3.MAX_29B_INT + 1]
+        )
+
+    def test_table(self):
+        self.assertEqual(
+            len(amf3.get_encoded_int_table()),
+            amf3.ENCODED_INT_MAX - amf3.ENCODED_INT_MIN + 1
+        )
+        self.assertIdentical(
+            amf3.get_encoded_int_table(),
+            amf3.ENCODED_INT_TABLE
+        )
+
+    def test_lazy_table(self):
+        """
+        The table is only built once an int is encoded.
+        """
+        table = amf3.ENCODED_INT_TABLE
+        self.addCleanup(setattr, amf3, 'ENCODED_INT_TABLE', table)
+
+        amf3.ENCODED_INT_TABLE = None
+
+        self.assertEqual(amf3.encode_int(0x80), b'\x81\x00')
+        self.assertNotEqual(amf3.ENCODED_INT_TABLE, None)
+
+    def test_encode_ints(self):
+        import array
+
+        self.assertEqual(amf3.encode_ints([]), b'')
+        self.assertEqual(
+            amf3.encode_ints([n for n, expected in self.values]),
+            b''.join([expected for n, expected in self.values])
+        )
+        self.assertEqual(
+            amf3.encode_ints(array.array('i', [1, 0x80, -1])),
+            b'\x01\x81\x00\xff\xff\xff\xff'
+        )
+
+
+class IntegerDecodingTestCase(unittest.TestCase):
+    """
+    Tests for L{amf3.decode_ints}.
+    """
+
+    values = [0, 0x7f, 0x80, 0x4000, 0x200000, -1, amf3.MIN_29B_INT,
+              amf3.MAX_29B_INT]
+
+    def get_streams(self, data):
+        return [
+            util.BufferedByteStream(data),
+            util.ReadOnlyByteStream(data),
+            ExtensionStream(data),
+        ]
+
+    def test_decode(self):
+        data = amf3.encode_ints(self.values) + b'\x01'
+
+        for stream in self.get_streams(data):
+            self.assertEqual(
+                amf3.decode_ints(stream, len(self.values)), self.values
+            )
+            self.assertEqual(stream.read(), b'\x01')
+
+    def test_unsigned(self):
+        data = amf3.encode_ints([amf3.MAX_29B_INT, -1])
+        expected = []
+
+        for stream in self.get_streams(data):
+            expected.append(amf3.decode_int(stream, False))
+            expected.append(amf3.decode_int(stream, False))
+
+            stream.seek(0)
+
+            self.assertEqual(
+                amf3.decode_ints(stream, 2, signed=False), expected[-2:]
+            )
+
+    def test_typecode(self):
+        import array
+
+        result = amf3.decode_ints(
+            util.BufferedByteStream(amf3.encode_ints([1, -1])), 2,
+            typecode='i'
+        )
+
+        self.assertEqual(result, array.array('i', [1, -1]))
+
+    def test_truncated(self):
+        data = amf3.encode_ints([1, 0x200000])[:-1]
+
+        for stream in self.get_streams(data):
+            self.assertRaises(IOError, amf3.decode_ints, stream, 2)
+            self.assertEqual(stream.tell(), 0)
+
+    def test_marker(self):
+        data = b'\x04\x01\x04\x81\x00\x06\x01\x04'
+
+        for stream in self.get_streams(data):
+            self.assertEqual(
+                amf3.decode_ints(stream, 5, marker=amf3.TYPE_INTEGER),
+                [1, 0x80]
+            )
+            self.assertEqual(stream.tell(), 5)
+
+            stream.seek(7)
+
+            self.assertEqual(
+                amf3.decode_ints(stream, 1, marker=amf3.TYPE_INTEGER), []
+            )
+            self.assertEqual(stream.tell(), 7)
+
+    def test_array(self):
+        values = [1, 2, u'spam', 3, 1.5, 4, 5, amf3.MIN_29B_INT, [6, 7]]
+
+        encoded = pyamf.encode(values, encoding=pyamf.AMF3).getvalue()
+
+        for stream in self.get_streams(encoded):
+            decoder = amf3.Decoder(stream)
+
+            self.assertEqual(decoder.readElement(), values)
+
+
+class ExtensionStream(object):
+    """
+    A stream without C{getbuffer}, like the compiled one.
+    """
+
+    def __init__(self, data):
+        self._stream = util.BufferedByteStream(data)
+
+    def __getattr__(self, name):
+        if name == 'getbuffer':
+            raise AttributeError(name)
+
+        return getattr(self._stream, name)
+
+
 class ContextTestCase(ClassCacheClearingTestCase):
     def test_create(self):
         c = amf3.Context()
@@ -77,6 +250,23 @@ class ContextTestCase(ClassCacheClearingTestCase):
         self.assertEqual(len(c.strings), 0)
         self.assertEqual(len(c.classes), 0)
 
+    def test_rollback(self):
+        x = amf3.Context()
+        x.addString(b'spam')
+        checkpoint = x.checkpoint()
+
+        x.addString(b'eggs')
+        x.addObject([])
+        x.addClass(amf3.ClassDefinition(pyamf.ClassAlias(Spam)), Spam)
+
+        x.rollback(checkpoint)
+
+        self.assertEqual(x.strings, [b'spam'])
+        self.assertEqual(len(x._objects), 0)
+        self.assertEqual(x.classes, {})
+        self.assertEqual(x.class_ref, {})
+        self.assertEqual(x.class_idx, 0)
+
     def test_add_string(self):
         x = amf3.Context()
         y = b'abc'
@@ -89,6 +279,31 @@ class ContextTestCase(ClassCacheClearingTestCase):
 
         self.assertRaises(TypeError, x.addString, 132)
 
+    def test_encoded_string(self):
+        x = amf3.Context()
+
+        self.assertEqual(x.getEncodedString(u'spam'), (b'spam', b'\x09spam'))
+        self.assertIdentical(
+            x.getEncodedString(u'spam'), x.getEncodedString(u'spam')
+        )
+
+        x.clear()
+
+        self.assertTrue(u'spam' in x._encoded_strings)
+
+        long_string = u'a' * (amf3.MAX_ENCODED_STRING_LENGTH + 1)
+        x.getEncodedString(long_string)
+
+        self.assertFalse(long_string in x._encoded_strings)
+
+    def test_encoded_string_limit(self):
+        x = amf3.Context()
+
+        for i in range(amf3.MAX_ENCODED_STRINGS + 1):
+            x.getEncodedString(u'%d' % (i,))
+
+        self.assertEqual(len(x._encoded_strings), 1)
+
     def test_add_class(self):
         x = amf3.Context()
 
@@ -262,6 +477,71 @@ class EncoderTestCase(ClassCacheClearingTestCase, EncoderMixIn):
         self.assertEncoded(y, b'\x09\x00', clear=False)
         self.assertEncoded(y, b'\x09\x00', clear=False)
 
+    def test_references_none(self):
+        y = [0, 1]
+        encoder = amf3.Encoder(references='none')
+
+        encoder.writeElement([y, y])
+
+        self.assertEqual(
+            encoder.stream.getvalue(),
+            b'\t\x05\x01\t\x05\x01\x04\x00\x04\x01\t\x05\x01\x04\x00\x04\x01'
+        )
+        self.assertEqual(len(encoder.context._objects), 0)
+
+    def test_references_value(self):
+        encoder = amf3.Encoder(references='value')
+
+        encoder.writeElement([(0, 1), (0, 1)])
+
+        self.assertEqual(
+            encoder.stream.getvalue(),
+            b'\t\x05\x01\t\x05\x01\x04\x00\x04\x01\t\x02'
+        )
+
+    def test_references_value_types(self):
+        """
+        Values that are equal but of different types decode as written.
+        """
+        for value in [
+            [(1, 2), (1.0, 2.0)],
+            [(True,), (1,)],
+            [(1,), (True,)],
+            [(0.0,), (-0.0,)],
+        ]:
+            encoder = amf3.Encoder(references='value')
+            encoder.writeElement(value)
+
+            decoded = pyamf.decode(
+                encoder.stream.getvalue(),
+                encoding=pyamf.AMF3
+            ).readElement()
+
+            self.assertEqual(
+                [[(type(x), repr(x)) for x in item] for item in decoded],
+                [[(type(x), repr(x)) for x in item] for item in value]
+            )
+
+    def test_detect_cycles(self):
+        x = []
+        x.append(x)
+
+        encoder = amf3.Encoder(references='none', detect_cycles=True)
+
+        self.assertRaises(pyamf.EncodeError, encoder.writeElement, x)
+
+        # shared references that are not cycles are fine
+        y = [1]
+        encoder = amf3.Encoder(references='none', detect_cycles=True)
+        encoder.writeElement([y, {'y': y}])
+
+        self.assertEqual(pyamf.decode(encoder.stream.getvalue(),
+                                      encoding=pyamf.AMF3).readElement(),
+                         [[1], {'y': [1]}])
+
+        # with references cycles can be encoded
+        amf3.Encoder(detect_cycles=True).writeElement(x)
+
     def test_list_proxy_references(self):
         self.encoder.use_proxies = True
         y = [0, 1, 2, 3]
@@ -362,6 +642,55 @@ class EncoderTestCase(ClassCacheClearingTestCase, EncoderMixIn):
     def test_byte_array(self):
         self.assertEncoded(amf3.ByteArray('hello'), b'\x0c\x0bhello')
 
+    def test_string_table(self):
+        self.assertEncoded(
+            [u'spam', u'eggs', u'spam', b'eggs', u''],
+            b'\t\x0b\x01\x06\tspam\x06\teggs\x06\x00\x06\x02\x06\x01'
+        )
+
+        self.assertEqual(self.context.string_table, {u'spam': 0, u'eggs': 1})
+        self.assertEqual(
+            self.context.getStringStats(),
+            {'hits': 2, 'misses': 2, 'strings': 2}
+        )
+
+        self.context.clear()
+
+        self.assertEqual(self.context.string_table, {})
+        self.assertEqual(self.context.string_hits, 2)
+
+    def test_string_table_bytes_first(self):
+        self.assertEncoded(
+            [b'spam', u'spam'], b'\t\x05\x01\x06\tspam\x06\x00'
+        )
+
+        self.assertEqual(self.context.string_table, {u'spam': 0})
+
+    def test_no_string_references(self):
+        self.encoder.string_references = False
+
+        self.assertEncoded(
+            [u'spam', u'spam'], b'\t\x05\x01\x06\tspam\x06\tspam'
+        )
+
+    def test_vector(self):
+        import array
+
+        x = array.array('h', [1, -1])
+
+        self.assertEncoded(
+            x, b'\x0d\x05\x00\x00\x00\x00\x01\xff\xff\xff\xff'
+        )
+        self.assertEncoded(x, b'\x0d\x00', clear=False)
+        self.assertEncoded(
+            array.array('B', [1]), b'\x0e\x03\x00\x00\x00\x00\x01'
+        )
+        self.assertEncoded(
+            array.array('d', [0.5]),
+            b'\x0f\x03\x00\x3f\xe0\x00\x00\x00\x00\x00\x00'
+        )
+        self.assertEncoded(array.array('i'), b'\x0d\x01\x00')
+
     def test_xmlstring(self):
         x = xml.fromstring('<a><b>hello world</b></a>')
         self.assertEqual(self.encode(x), b'\x0b\x33<a><b>hello world</b></a>')
@@ -813,6 +1142,31 @@ class DecoderTestCase(ClassCacheClearingTestCase, DecoderMixIn):
     def test_byte_array(self):
         self.assertDecoded(amf3.ByteArray('hello'), b'\x0c\x0bhello')
 
+    def test_vector(self):
+        import array
+
+        self.assertDecoded(
+            array.array('i', [1, -1]),
+            b'\x0d\x05\x00\x00\x00\x00\x01\xff\xff\xff\xff'
+        )
+        self.assertDecoded(
+            array.array('I', [1, 0xffffffff]),
+            b'\x0e\x05\x01\x00\x00\x00\x01\xff\xff\xff\xff'
+        )
+        self.assertDecoded(
+            array.array('d', [0.5]),
+            b'\x0f\x03\x00\x3f\xe0\x00\x00\x00\x00\x00\x00'
+        )
+        self.assertDecoded(array.array('d'), b'\x0f\x01\x00')
+
+    def test_vector_reference(self):
+        x = self.decode(
+            b'\x09\x05\x01\x0d\x03\x00\x00\x00\x00\x07\x0d\x02'
+        )
+
+        self.assertEqual(len(x), 2)
+        self.assertIdentical(x[0], x[1])
+
     def test_date(self):
         import datetime
 
@@ -1107,6 +1461,139 @@ class ObjectEncodingTestCase(ClassCacheClearingTestCase, EncoderMixIn):
         )
 
 
+class TraitsCacheTestCase(ClassCacheClearingTestCase):
+    """
+    Tests for L{pyamf.TRAITS_CACHE}.
+    """
+
+    def setUp(self):
+        ClassCacheClearingTestCase.setUp(self)
+
+        self.alias = pyamf.register_class(Spam, 'abc.xyz')
+        self.alias.static_attrs = ['spam', 'eggs']
+
+    def encode(self, *args, **kwargs):
+        encoder = amf3.Encoder(**kwargs)
+
+        for arg in args:
+            encoder.writeElement(arg)
+
+        return encoder.stream.getvalue()
+
+    def test_cached(self):
+        expected = (
+            b'\n+\x0fabc.xyz\teggs\tspam\x06\x07bar\x06\x07foo\x01'
+        )
+
+        self.assertEqual(self.encode(Spam({'spam': 'foo', 'eggs': 'bar'})),
+                         expected)
+
+        traits = pyamf.TRAITS_CACHE[Spam]
+
+        self.assertEqual(traits.data, b'+\x0fabc.xyz\teggs\tspam')
+        self.assertEqual(
+            traits.strings,
+            [('abc.xyz', b'abc.xyz'), ('eggs', b'eggs'), ('spam', b'spam')]
+        )
+
+        # a new encoder uses the cached traits
+        self.assertEqual(self.encode(Spam({'spam': 'foo', 'eggs': 'bar'})),
+                         expected)
+
+    def test_references(self):
+        x = Spam({'spam': 'eggs', 'eggs': 'spam'})
+
+        self.assertEqual(
+            self.encode(x, Spam({'spam': 'abc.xyz', 'eggs': None})),
+            b'\n+\x0fabc.xyz\teggs\tspam\x06\x04\x06\x02\x01'
+            b'\n\x01\x01\x06\x00\x01'
+        )
+
+    def test_string_already_referenced(self):
+        x = Spam({'spam': 1, 'eggs': 2})
+
+        self.assertEqual(
+            self.encode('eggs', x),
+            b'\x06\teggs\n+\x0fabc.xyz\x00\tspam\x04\x02\x04\x01\x01'
+        )
+
+        # the context is untouched after falling back
+        encoder = amf3.Encoder()
+        encoder.writeElement('eggs')
+        encoder.writeElement(x)
+
+        self.assertEqual(encoder.context.getStringReference(b'spam'), 2)
+
+    def test_no_string_references(self):
+        self.assertEqual(
+            self.encode(Spam({'spam': 1, 'eggs': 2}), string_references=False),
+            b'\n+\x0fabc.xyz\teggs\tspam\x04\x02\x04\x01\x01'
+        )
+
+    def test_duplicate_names(self):
+        self.alias.static_attrs = ['abc.xyz']
+
+        self.assertEqual(
+            self.encode(Spam({'abc.xyz': 1})),
+            b'\n\x1b\x0fabc.xyz\x00\x04\x01\x01'
+        )
+        self.assertEqual(pyamf.TRAITS_CACHE[Spam].data, None)
+
+    def test_alias_changed(self):
+        self.encode(Spam())
+        self.alias.static_attrs = ['spam']
+
+        self.assertEqual(
+            self.encode(Spam({'spam': 1, 'eggs': 2})),
+            b'\n\x1b\x0fabc.xyz\tspam\x04\x01\teggs\x04\x02\x01'
+        )
+
+    def test_register_class(self):
+        self.encode(Spam())
+
+        self.assertTrue(Spam in pyamf.TRAITS_CACHE)
+
+        class Foo(object):
+            pass
+
+        pyamf.register_class(Foo, 'foo')
+
+        self.assertEqual(pyamf.TRAITS_CACHE, {})
+
+    def test_unregister_class(self):
+        self.encode(Spam())
+
+        self.assertTrue(Spam in pyamf.TRAITS_CACHE)
+
+        pyamf.unregister_class(Spam)
+
+        self.assertEqual(pyamf.TRAITS_CACHE, {})
+
+    def test_unregistered_class(self):
+        """
+        Encoding an unregistered class does not add an entry to the cache
+        each time a new alias is built for it.
+        """
+        class Foo(object):
+            pass
+
+        for i in range(10):
+            self.encode(Foo())
+
+        self.assertEqual(len(pyamf.TRAITS_CACHE), 1)
+        self.assertTrue(Foo in pyamf.TRAITS_CACHE)
+
+    def test_max_size(self):
+        self.addCleanup(setattr, amf3, 'MAX_CACHED_TRAITS',
+                        amf3.MAX_CACHED_TRAITS)
+        amf3.MAX_CACHED_TRAITS = 4
+
+        for i in range(10):
+            self.encode(type('Foo%d' % (i,), (object,), {})())
+
+            self.assertTrue(len(pyamf.TRAITS_CACHE) <= 4)
+
+
 class ObjectDecodingTestCase(ClassCacheClearingTestCase, DecoderMixIn):
     """
     """
@@ -1131,6 +1618,49 @@ class ObjectDecodingTestCase(ClassCacheClearingTestCase, DecoderMixIn):
 
         self.assertEqual(id(obj1), id(obj2))
 
+    def test_proxied_static(self):
+        """
+        Proxied sealed attributes decode the same whether or not the object
+        also has dynamic members.
+        """
+        from pyamf.flex import ArrayCollection
+
+        class Source(object):
+            class __amf__:
+                static = ('items',)
+
+        class Target(object):
+            class __amf__:
+                proxy = ('items',)
+
+        pyamf.register_class(Source, 'a.A')
+
+        streams = []
+
+        for dynamic in (False, True):
+            obj = Source()
+            obj.items = ArrayCollection([1, 2])
+
+            if dynamic:
+                obj.spam = 'eggs'
+
+            streams.append(pyamf.encode(obj, encoding=pyamf.AMF3).getvalue())
+
+        pyamf.unregister_class(Source)
+        pyamf.register_class(Target, 'a.A')
+
+        types = []
+
+        for data in streams:
+            obj = pyamf.decode(data, encoding=pyamf.AMF3).readElement()
+
+            self.assertTrue(isinstance(obj, Target))
+            self.assertEqual(list(obj.items), [1, 2])
+
+            types.append(type(obj.items))
+
+        self.assertEqual(types, [ArrayCollection, ArrayCollection])
+
     def test_static(self):
         pyamf.register_class(Spam, 'abc.xyz')
 
@@ -1146,6 +1676,27 @@ class ObjectDecodingTestCase(ClassCacheClearingTestCase, DecoderMixIn):
         self.assertTrue(isinstance(obj, Spam))
         self.assertEqual(obj.__dict__, {'spam': 'eggs'})
 
+    def test_decode_plan(self):
+        alias = pyamf.register_class(Spam, 'abc.xyz')
+        alias.readonly_attrs = ['foo']
+
+        # sealed spam and foo, then a dynamic bar in the second object
+        self.buf.write(
+            b'\x0a\x2b\x0fabc.xyz\x09spam\x07foo\x06\x09eggs\x04\x01\x01'
+            b'\x0a\x01\x06\x07baz\x04\x02\x07bar\x04\x03\x01'
+        )
+        self.buf.seek(0, 0)
+
+        obj = self.decoder.readElement()
+        class_def = self.context.getClass(Spam)
+
+        self.assertNotEqual(class_def.decode_plan, None)
+        self.assertEqual(obj.__dict__, {'spam': 'eggs'})
+
+        obj = self.decoder.readElement()
+
+        self.assertEqual(obj.__dict__, {'spam': 'baz', 'bar': 3})
+
     def test_dynamic(self):
         pyamf.register_class(Spam, 'abc.xyz')
 
@@ -1791,3 +2342,198 @@ class ByteArrayTestCase(unittest.TestCase):
         ba = amf3.ByteArray(z)
 
         self.assertTrue(ba.compressed)
+
+
+class Point(object):
+    """
+    An externalised class for L{LazyDecoderTestCase}.
+    """
+
+    class __amf__:
+        external = True
+
+    def __init__(self, x=None, y=None):
+        self.x = x
+        self.y = y
+
+    def __readamf__(self, input):
+        self.x = input.readObject()
+        self.y = input.readObject()
+
+    def __writeamf__(self, output):
+        output.writeObject(self.x)
+        output.writeObject(self.y)
+
+
+class LazyDecoderTestCase(ClassCacheClearingTestCase):
+    """
+    Tests for L{amf3.Decoder} in lazy mode.
+    """
+
+    def setUp(self):
+        ClassCacheClearingTestCase.setUp(self)
+
+        pyamf.register_class(Spam, 'abc.xyz')
+        pyamf.register_class(Point, 'abc.Point')
+
+    def encode(self, *args):
+        encoder = amf3.Encoder()
+
+        for arg in args:
+            encoder.writeElement(arg)
+
+        return encoder.stream.getvalue()
+
+    def decode(self, data):
+        return amf3.Decoder(data, lazy=True).readElement()
+
+    def get_graph(self):
+        spam = Spam({'name': 'spam', 'when': datetime.datetime(2010, 1, 1)})
+        shared = {'foo': 'bar'}
+
+        return [
+            {'spam': spam, 'shared': shared, 'number': 1.5},
+            [spam, Spam({'name': 'eggs'})],
+            shared,
+            amf3.ByteArray(b'bytes'),
+            pyamf.MixedArray(a=1, b='spam'),
+            spam,
+        ]
+
+    def test_views(self):
+        view = self.decode(self.encode(self.get_graph()))
+
+        self.assertTrue(isinstance(view, amf3.LazyArray))
+        self.assertEqual(len(view), 6)
+
+        obj = view[0]
+
+        self.assertTrue(isinstance(obj, amf3.LazyObject))
+        self.assertEqual(sorted(obj.keys()), ['number', 'shared', 'spam'])
+        self.assertEqual(obj['number'], 1.5)
+        self.assertEqual(obj.get('missing'), None)
+        self.assertTrue(obj['spam'].alias.klass is Spam)
+        self.assertEqual(obj['spam']['name'], 'spam')
+        self.assertEqual(
+            obj['spam']['when'],
+            datetime.datetime(2010, 1, 1)
+        )
+
+        self.assertTrue(isinstance(view[3], amf3.LazyElement))
+        self.assertEqual(view[3].decode(), b'bytes')
+        self.assertEqual(view[4].keys(), ['a', 'b'])
+        self.assertEqual(view[4]['b'], 'spam')
+
+    def test_references(self):
+        view = self.decode(self.encode(self.get_graph()))
+
+        # the second Spam uses the string and trait references read while
+        # skipping over the first
+        self.assertEqual(view[1][1]['name'], 'eggs')
+        self.assertTrue(view[5] is view[0]['spam'])
+        self.assertTrue(view[2] is view[0]['shared'])
+
+    def test_decode(self):
+        data = self.encode(self.get_graph())
+        result = self.decode(data).decode()
+
+        self.assertEqual(self.encode(result), data)
+        self.assertTrue(result[5] is result[1][0])
+        self.assertTrue(result[2] is result[0]['shared'])
+
+    def test_decode_child_first(self):
+        view = self.decode(self.encode(self.get_graph()))
+
+        spam = view[1][0].decode()
+        shared = view[2].decode()
+        result = view.decode()
+
+        self.assertTrue(result[0]['spam'] is spam)
+        self.assertTrue(result[5] is spam)
+        self.assertTrue(result[0]['shared'] is shared)
+        self.assertTrue(view[1][0] is spam)
+        self.assertTrue(view.decode() is result)
+
+    def test_cycle(self):
+        a = {'name': 'a'}
+        b = {'name': 'b', 'a': a}
+        a['b'] = b
+
+        view = self.decode(self.encode([a]))
+
+        b = view[0]['b'].decode()
+
+        self.assertTrue(b['a']['b'] is b)
+        self.assertTrue(view.decode()[0] is b['a'])
+
+    def test_external(self):
+        data = self.encode([Point(1, {'x': 'y'}), {'z': 1}, Spam()])
+        view = self.decode(data)
+
+        point = view[0]
+
+        self.assertTrue(isinstance(point, Point))
+        self.assertEqual(point.y, {'x': 'y'})
+        self.assertEqual(view[1]['z'], 1)
+        self.assertEqual(self.encode(view.decode()), data)
+
+    def test_array_collection(self):
+        from pyamf.flex import ArrayCollection
+
+        data = self.encode([ArrayCollection([{'a': 1}]), {'b': 2}])
+        view = self.decode(data)
+
+        self.assertEqual(view[0].keys(), [])
+        self.assertEqual(view[1]['b'], 2)
+        self.assertEqual(view[0].decode(), [{'a': 1}])
+        self.assertEqual(self.encode(view.decode()), data)
+
+    def test_clear(self):
+        decoder = amf3.Decoder(self.encode({'foo': 'bar'}), lazy=True)
+        view = decoder.readElement()
+
+        decoder.context.clear()
+
+        self.assertEqual(view['foo'], 'bar')
+        self.assertEqual(view.decode(), {'foo': 'bar'})
+
+    def test_stream_position(self):
+        data = self.encode({'foo': 'bar'}, {'baz': 'gak'})
+        decoder = amf3.Decoder(data, lazy=True)
+
+        first = decoder.readElement()
+
+        self.assertEqual(first['foo'], 'bar')
+        self.assertEqual(decoder.readElement()['baz'], 'gak')
+        self.assertTrue(decoder.stream.at_eof())
+
+    def test_unknown_reference(self):
+        decoder = amf3.Decoder(b'\n\x02', lazy=True)
+
+        self.assertRaises(pyamf.ReferenceError, decoder.readElement)
+
+    def test_unsupported_type(self):
+        decoder = amf3.Decoder(b'\t\x03\x01\x10', lazy=True)
+
+        self.assertRaises(pyamf.DecodeError, decoder.readElement)
+
+    def test_remoting(self):
+        from pyamf import remoting
+        from pyamf.flex import messaging
+
+        msg = remoting.Envelope(pyamf.AMF3)
+        msg['/1'] = remoting.Request(u'null', [messaging.RemotingMessage(
+            destination=u'spam',
+            operation=u'eggs',
+            body=[[1, 2, 3]],
+            headers={u'DSId': u'abc'}
+        )])
+
+        data = remoting.encode(msg).getvalue()
+        view = remoting.decode(data, lazy=True)['/1'].body[0]
+
+        self.assertTrue(isinstance(view, amf3.LazyObject))
+        self.assertTrue(view.alias.klass is messaging.RemotingMessage)
+        self.assertEqual(view['operation'], u'eggs')
+        self.assertEqual(view['headers']['DSId'], u'abc')
+        self.assertEqual(view.decode().body, [[1, 2, 3]])
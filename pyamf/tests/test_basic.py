@@ -7,6 +7,9 @@ General tests.
 @since: 0.1.0
 """
 
+import os
+import pickle
+import tempfile
 import unittest
 import types
 
@@ -76,6 +79,22 @@ class ASObjectTestCase(unittest.TestCase):
 
         self.assertNotEquals(None, hash(bag))
 
+    def test_slots(self):
+        bag = pyamf.ASObject(spam='eggs')
+
+        self.assertFalse(hasattr(bag, '__dict__'))
+
+        bag.baz = 'gak'
+
+        self.assertEqual(bag, {'spam': 'eggs', 'baz': 'gak'})
+
+    def test_pickle(self):
+        bag = pyamf.ASObject(spam='eggs')
+        copy = pickle.loads(pickle.dumps(bag))
+
+        self.assertTrue(isinstance(copy, pyamf.ASObject))
+        self.assertEqual(copy, bag)
+
 
 class HelperTestCase(unittest.TestCase):
     """
@@ -123,6 +142,37 @@ class HelperTestCase(unittest.TestCase):
             pyamf.encode(u'connect', 1.0).getvalue()
         )
 
+    def test_encode_many(self):
+        values = [u'spam', [u'spam'], {u'spam': u'eggs'}]
+
+        for encoding in (pyamf.AMF0, pyamf.AMF3):
+            encoded = pyamf.encode_many(values, encoding=encoding)
+
+            self.assertEqual(encoded, [
+                pyamf.encode(v, encoding=encoding).getvalue() for v in values
+            ])
+
+            buf, offsets = pyamf.encode_many(
+                iter(values), encoding=encoding, as_buffer=True)
+
+            self.assertEqual(buf, b''.join(encoded))
+            self.assertEqual(len(offsets), 4)
+            self.assertEqual(buf[offsets[1]:offsets[2]], encoded[1])
+
+    def test_encode_many_shared_context(self):
+        encoded = pyamf.encode_many(
+            [u'spam', u'spam'], encoding=pyamf.AMF3,
+            reset_context_per_item=False
+        )
+
+        self.assertEqual(encoded, [b'\x06\x09spam', b'\x06\x00'])
+        self.assertEqual(
+            list(pyamf.decode(b''.join(encoded), encoding=pyamf.AMF3)),
+            [u'spam', u'spam']
+        )
+
+        self.assertEqual(pyamf.encode_many([]), [])
+
     def test_decode(self):
         expected = [u'connect', 1.0]
         bytes = b'\x06\x0fconnect\x05?\xf0\x00\x00\x00\x00\x00\x00'
@@ -131,6 +181,26 @@ class HelperTestCase(unittest.TestCase):
 
         self.assertEqual(expected, returned)
 
+    def test_decode_file(self):
+        fd, name = tempfile.mkstemp()
+        os.write(fd, b'\x06\x0fconnect\x05?\xf0\x00\x00\x00\x00\x00\x00')
+        os.close(fd)
+
+        try:
+            self.assertEqual(list(pyamf.decode_file(name)), [u'connect', 1.0])
+
+            with open(name, 'rb') as fp:
+                self.assertEqual(
+                    list(pyamf.decode_file(fp)),
+                    [u'connect', 1.0]
+                )
+
+            open(name, 'wb').close()
+
+            self.assertEqual(list(pyamf.decode_file(name)), [])
+        finally:
+            os.unlink(name)
+
     def test_default_encoding(self):
         pyamf.DEFAULT_ENCODING = pyamf.AMF3
 
@@ -438,6 +508,18 @@ class TypedObjectTestCase(unittest.TestCase):
         self.assertRaises(pyamf.DecodeError, o.__readamf__, None)
         self.assertRaises(pyamf.EncodeError, o.__writeamf__, None)
 
+    def test_slots(self):
+        o = pyamf.TypedObject('spam')
+        o['foo'] = 'bar'
+
+        self.assertFalse(hasattr(o, '__dict__'))
+        self.assertEqual(o.alias, 'spam')
+
+        copy = pickle.loads(pickle.dumps(o))
+
+        self.assertEqual(copy.alias, 'spam')
+        self.assertEqual(copy, {'foo': 'bar'})
+
     def test_alias(self):
         class Foo:
             pass
@@ -621,6 +703,137 @@ class UndefinedTestCase(unittest.TestCase):
         self.assertFalse(pyamf.Undefined is None)
 
 
+class RawAMFTestCase(ClassCacheClearingTestCase):
+    """
+    Tests for L{pyamf.RawAMF}.
+    """
+
+    def setUp(self):
+        ClassCacheClearingTestCase.setUp(self)
+
+        pyamf.register_class(Spam, 'spam.Spam')
+
+    def encode(self, value, encoding=pyamf.AMF3, **kwargs):
+        return pyamf.encode(value, encoding=encoding, **kwargs).getvalue()
+
+    def decode(self, data, encoding=pyamf.AMF3):
+        return pyamf.decode(data, encoding=encoding).readElement()
+
+    def get_spam(self, name):
+        spam = Spam()
+        spam.name = name
+
+        return spam
+
+    def test_create(self):
+        data = self.encode([u'spam', {'a': u'eggs'}])
+        raw = pyamf.RawAMF(data)
+
+        self.assertEqual(raw.data, data)
+        self.assertEqual(raw.encoding, pyamf.AMF3)
+        self.assertEqual(raw.references, 0)
+        self.assertEqual(raw.amf3_objects, 2)
+        self.assertEqual(raw.amf3_strings, [b'spam', b'a', b'eggs'])
+        self.assertEqual(raw.amf3_classes, 1)
+        self.assertEqual(raw, pyamf.RawAMF(bytearray(data)))
+        self.assertNotEqual(raw, pyamf.RawAMF(self.encode(u'spam')))
+        self.assertEqual(
+            repr(pyamf.RawAMF(b'\x01')), '<RawAMF encoding=3 1 bytes>'
+        )
+
+    def test_bad_data(self):
+        self.assertRaises(pyamf.DecodeError, pyamf.RawAMF, b'\x06\x07sp')
+        self.assertRaises(pyamf.DecodeError, pyamf.RawAMF, b'\x01\x01')
+        self.assertRaises(pyamf.DecodeError, pyamf.RawAMF, b'', pyamf.AMF0)
+
+    def test_top_level(self):
+        for encoding in (pyamf.AMF0, pyamf.AMF3):
+            spam = self.get_spam(u'spam')
+            data = self.encode([spam, spam, u'spam'], encoding)
+            raw = pyamf.RawAMF(data, encoding)
+
+            self.assertTrue(raw.references > 0)
+            self.assertEqual(self.encode(raw, encoding), data)
+
+    def test_amf3(self):
+        spam = self.get_spam(u'spam')
+        raw = pyamf.RawAMF(self.encode([self.get_spam(u'eggs'), u'spam']))
+
+        data = self.encode([u'spam', spam, raw, u'spam', spam, u'eggs'])
+        value = self.decode(data)
+
+        self.assertEqual(value[0], u'spam')
+        self.assertEqual(value[1].name, u'spam')
+        self.assertEqual(value[2][0].name, u'eggs')
+        self.assertEqual(value[2][1], u'spam')
+        self.assertEqual(value[3], u'spam')
+        self.assertIdentical(value[1], value[4])
+        self.assertEqual(value[5], u'eggs')
+
+    def test_amf3_references(self):
+        spam = self.get_spam(u'spam')
+        raw = pyamf.RawAMF(self.encode([spam, spam]))
+
+        self.assertRaises(pyamf.EncodeError, self.encode, [u'spam', raw])
+        self.assertRaises(
+            pyamf.EncodeError, self.encode, raw, string_references=False
+        )
+
+    def test_amf0_in_amf3(self):
+        raw = pyamf.RawAMF(self.encode(u'spam', pyamf.AMF0), pyamf.AMF0)
+
+        self.assertRaises(pyamf.EncodeError, self.encode, [raw])
+
+    def test_amf0(self):
+        spam = self.get_spam(u'spam')
+        raw = pyamf.RawAMF(
+            self.encode([{'a': 1}, self.get_spam(u'eggs')], pyamf.AMF0),
+            pyamf.AMF0
+        )
+
+        self.assertEqual(raw.amf0_objects, 3)
+
+        data = self.encode([spam, raw, spam], pyamf.AMF0)
+        value = self.decode(data, pyamf.AMF0)
+
+        self.assertEqual(value[1][0], {'a': 1})
+        self.assertEqual(value[1][1].name, u'eggs')
+        self.assertIdentical(value[0], value[2])
+
+        self.assertRaises(
+            pyamf.EncodeError,
+            self.encode, [spam, pyamf.RawAMF(data, pyamf.AMF0)], pyamf.AMF0
+        )
+
+    def test_amf3_in_amf0(self):
+        spam = self.get_spam(u'spam')
+        raw = pyamf.RawAMF(self.encode([self.get_spam(u'eggs'), u'spam']))
+
+        encoder = pyamf.get_encoder(pyamf.AMF0, use_amf3=True)
+
+        for value in (spam, raw, spam, u'spam', raw):
+            encoder.writeElement(value)
+
+        decoder = pyamf.decode(
+            encoder.stream.getvalue(), encoding=pyamf.AMF0
+        )
+        value = list(decoder)
+
+        self.assertIdentical(value[0], value[2])
+        self.assertEqual(value[3], u'spam')
+        self.assertEqual(value[4][0].name, u'eggs')
+
+    def test_amf0_in_amf3_envelope(self):
+        """
+        AMF0 data is written as is by an encoder that switches to AMF3.
+        """
+        data = self.encode(self.get_spam(u'spam'))
+        encoder = pyamf.get_encoder(pyamf.AMF0, use_amf3=True)
+        encoder.writeElement(pyamf.RawAMF(b'\x11' + data, pyamf.AMF0))
+
+        self.assertEqual(encoder.stream.getvalue(), b'\x11' + data)
+
+
 class TestAMF0Codecs(unittest.TestCase):
     """
     Tests for getting encoder/decoder for AMF0 with extension support.
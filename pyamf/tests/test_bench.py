@@ -0,0 +1,135 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Tests for L{pyamf.bench}.
+
+@since: 0.8.9
+"""
+
+import contextlib
+import io
+import unittest
+
+from pyamf import bench
+from pyamf.bench import __main__ as cli
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    """
+    Tests for L{bench.Benchmark}.
+    """
+
+    def test_run(self):
+        calls = []
+
+        def setup(backend):
+            return lambda: calls.append(backend), 10
+
+        benchmark = bench.Benchmark('spam', setup)
+        backend = bench.get_backends(['pure'])[0]
+
+        result = benchmark.run(backend, repeat=2, min_time=0.001)
+
+        self.assertEqual(result['name'], 'spam')
+        self.assertEqual(result['backend'], 'pure')
+        self.assertEqual(result['bytes'], 10)
+        self.assertTrue(len(calls) >= result['loops'] * 2 + 1)
+        self.assertEqual(
+            result['bytes_per_sec'], result['ops_per_sec'] * 10
+        )
+
+    def test_register(self):
+        bench.get_benchmarks()
+
+        self.assertRaises(
+            KeyError,
+            bench.register('amf3.encode.objects'),
+            lambda backend: None
+        )
+
+
+class RunTestCase(unittest.TestCase):
+    """
+    Tests for L{bench.run} and friends.
+    """
+
+    def test_backends(self):
+        self.assertEqual(bench.get_backends()[0].name, 'pure')
+        self.assertRaises(ValueError, bench.get_backends, ['spam'])
+
+    def test_benchmarks(self):
+        names = [b.name for b in bench.get_benchmarks(['remoting.'])]
+
+        self.assertEqual(names, ['remoting.encode', 'remoting.decode'])
+
+    def test_all(self):
+        results = bench.run(
+            bench.get_benchmarks(),
+            bench.get_backends(['pure']),
+            repeat=1,
+            min_time=0
+        )
+
+        self.assertEqual(results['meta']['backends'], ['pure'])
+        self.assertEqual(len(results['results']), len(bench.BENCHMARKS))
+
+        for result in results['results']:
+            self.assertTrue(result['bytes'] > 0, result['name'])
+
+    def test_save_load(self):
+        results = bench.run(
+            bench.get_benchmarks(['stream.']),
+            repeat=1,
+            min_time=0
+        )
+
+        stream = io.StringIO()
+        bench.save(results, stream)
+        stream.seek(0)
+
+        loaded = bench.load(stream)
+
+        self.assertEqual(loaded, results)
+
+        comparison = bench.compare(loaded, results)
+
+        self.assertEqual(len(comparison), len(results['results']))
+        self.assertEqual(comparison[0][:2], ('stream.write_double', 'pure'))
+        self.assertEqual(comparison[0][4], 1.0)
+
+
+class MainTestCase(unittest.TestCase):
+    """
+    Tests for the command line interface.
+    """
+
+    def run_main(self, *args):
+        out = io.StringIO()
+        err = io.StringIO()
+
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            ret = cli.main(list(args))
+
+        return ret, out.getvalue(), err.getvalue()
+
+    def test_list(self):
+        ret, out, err = self.run_main('--list', '-k', 'sol.')
+
+        self.assertEqual(ret, 0)
+        self.assertEqual(len(out.splitlines()), 2)
+
+    def test_run(self):
+        ret, out, err = self.run_main(
+            '-k', 'sol.decode', '-b', 'pure', '-r', '1', '-t', '0'
+        )
+
+        self.assertEqual(ret, 0)
+        self.assertTrue(out.startswith('sol.decode'))
+        self.assertTrue('ops/s' in out)
+
+    def test_unknown_backend(self):
+        ret, out, err = self.run_main('-b', 'spam')
+
+        self.assertEqual(ret, 1)
+        self.assertTrue(err.startswith('error: '))
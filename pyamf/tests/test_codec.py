@@ -7,10 +7,11 @@ Tests for AMF utilities.
 @since: 0.1.0
 """
 
+import datetime
 import unittest
 
 import pyamf
-from pyamf import codec
+from pyamf import codec, amf3
 
 try:
     unicode
@@ -141,6 +142,143 @@ class IndexedCollectionTestCase(unittest.TestCase):
         self.assertEqual(self.collection.getReferenceTo(o), -1)
 
 
+    def test_truncate(self):
+        x, y, z = object(), object(), object()
+
+        for o in (x, y, z):
+            self.collection.append(o)
+
+        self.collection.truncate(1)
+
+        self.assertEqual(self.collection, [x])
+        self.assertEqual(self.collection.getReferenceTo(x), 0)
+        self.assertEqual(self.collection.getReferenceTo(y), -1)
+        self.assertEqual(self.collection.getReferenceTo(z), -1)
+
+    def test_replace(self):
+        x, y, z = object(), object(), object()
+
+        self.collection.append(x)
+        self.collection.append(y)
+        self.collection.replace(0, z)
+
+        self.assertEqual(self.collection, [z, y])
+        self.assertEqual(self.collection.getReferenceTo(z), 0)
+        self.assertEqual(self.collection.getReferenceTo(x), -1)
+
+
+class ListReferenceCollectionTestCase(unittest.TestCase):
+    """
+    Tests for L{codec.ListReferenceCollection}
+    """
+
+    def test_collection(self):
+        collection = codec.ListReferenceCollection()
+        x, y, z = [1], [2], [3]
+
+        self.assertEqual(collection.append(x), 0)
+        self.assertEqual(collection.append(y), 1)
+
+        collection.replace(0, z)
+
+        self.assertEqual(collection, [z, y])
+        self.assertEqual(collection.getReferenceTo(y), 1)
+        self.assertEqual(collection.getReferenceTo(x), -1)
+
+        collection.truncate(1)
+
+        self.assertEqual(collection, [z])
+
+
+class ValueReferenceCollectionTestCase(unittest.TestCase):
+    """
+    Tests for L{codec.ValueReferenceCollection}
+    """
+
+    def setUp(self):
+        self.collection = codec.ValueReferenceCollection()
+
+    def test_hashable(self):
+        self.assertEqual(self.collection.append((1, 2)), 0)
+        self.assertEqual(self.collection.getReferenceTo((1, 2)), 0)
+        self.assertEqual(self.collection.getReferenceTo((2, 1)), -1)
+
+    def test_unhashable(self):
+        x = [1, 2]
+
+        self.assertEqual(self.collection.append(x), 0)
+        self.assertEqual(self.collection.getReferenceTo(x), 0)
+        self.assertEqual(self.collection.getReferenceTo([1, 2]), -1)
+
+    def test_truncate(self):
+        x = [1]
+
+        self.collection.append((1,))
+        self.collection.append(x)
+        self.collection.append((2,))
+
+        self.collection.truncate(1)
+
+        self.assertEqual(self.collection, [(1,)])
+        self.assertEqual(self.collection.getReferenceTo((1,)), 0)
+        self.assertEqual(self.collection.getReferenceTo(x), -1)
+        self.assertEqual(self.collection.getReferenceTo((2,)), -1)
+
+    def test_types(self):
+        """
+        Values that are equal but of different types do not share a
+        reference.
+        """
+        for x, y in [
+            ((1, 2), (1.0, 2.0)),
+            ((True,), (1,)),
+            ((0.0,), (-0.0,)),
+            ((1, (2,)), (1, (2.0,))),
+            (datetime.datetime(2000, 1, 1), datetime.date(2000, 1, 1)),
+        ]:
+            collection = codec.ValueReferenceCollection()
+
+            self.assertEqual(collection.append(x), 0)
+            self.assertEqual(collection.getReferenceTo(x), 0)
+            self.assertEqual(collection.getReferenceTo(y), -1, (x, y))
+
+    def test_custom_eq(self):
+        """
+        Objects with a custom C{__eq__} are referenced by identity.
+        """
+        class Spam(object):
+            def __eq__(self, other):
+                return True
+
+            def __hash__(self):
+                return 0
+
+        class Tuple(tuple):
+            pass
+
+        for x, y in [(Spam(), Spam()), (Tuple((1,)), Tuple((1,)))]:
+            collection = codec.ValueReferenceCollection()
+
+            self.assertEqual(collection.append(x), 0)
+            self.assertEqual(collection.getReferenceTo(x), 0)
+            self.assertEqual(collection.getReferenceTo(y), -1)
+            self.assertEqual(collection.getReferenceTo((x,)), -1)
+
+
+class NullReferenceCollectionTestCase(unittest.TestCase):
+    """
+    Tests for L{codec.NullReferenceCollection}
+    """
+
+    def test_append(self):
+        collection = codec.NullReferenceCollection()
+        x = [1]
+
+        self.assertEqual(collection.append(x), -1)
+        self.assertEqual(collection.getReferenceTo(x), -1)
+        self.assertEqual(len(collection), 0)
+
+
 class ContextTestCase(unittest.TestCase):
     """
     Tests for L{codec.Context}
@@ -156,6 +294,19 @@ class ContextTestCase(unittest.TestCase):
         self.assertEqual(self.context.addObject(y), 0)
         self.assertEqual(self.context.getObjectReference(y), 0)
 
+    def test_rollback(self):
+        x, y = [1], [2]
+
+        self.context.addObject(x)
+        checkpoint = self.context.checkpoint()
+        self.context.addObject(y)
+
+        self.context.rollback(checkpoint)
+
+        self.assertEqual(self.context.getObjectReference(x), 0)
+        self.assertEqual(self.context.getObjectReference(y), -1)
+        self.assertEqual(self.context.getObject(1), None)
+
     def test_clear(self):
         y = [1, 2, 3]
 
@@ -167,6 +318,19 @@ class ContextTestCase(unittest.TestCase):
 
         self.assertEqual(self.context.getObjectReference(y), -1)
 
+    def test_set_references(self):
+        self.context.setReferences('value')
+
+        self.assertEqual(self.context.addObject((1,)), 0)
+        self.assertEqual(self.context.getObjectReference((1,)), 0)
+
+        self.context.setReferences('none')
+
+        self.assertEqual(self.context.addObject((1,)), -1)
+        self.assertEqual(self.context.getObjectReference((1,)), -1)
+
+        self.assertRaises(ValueError, self.context.setReferences, 'spam')
+
     def test_get_by_reference(self):
         y = [1, 2, 3]
         z = {'spam': 'eggs'}
@@ -270,3 +434,321 @@ class ContextTestCase(unittest.TestCase):
         i = self.context.getBytesForString(s)
 
         self.assertNotIdentical(i, s)
+
+
+class PushDecoderTestCase(unittest.TestCase):
+    """
+    Tests for L{codec.Decoder.feed} and friends.
+    """
+
+    def chunked(self, encoding, data, size):
+        decoder = pyamf.get_decoder(encoding)
+        elements = []
+
+        for i in range(0, len(data), size):
+            decoder.feed(data[i:i + size])
+            elements.extend(decoder.elements())
+
+        decoder.close()
+        events = list(decoder.events())
+
+        self.assertEqual(events[-1], ('end', None))
+
+        return elements + [v for e, v in events if e == 'element']
+
+    def test_chunks(self):
+        values = [
+            u'spam', [u'spam', u'eggs', {u'spam': [u'eggs']}], 1.5, None,
+            {u'eggs': u'spam', u'a': [1, 2, 3]},
+        ]
+
+        for encoding in (pyamf.AMF0, pyamf.AMF3):
+            data = pyamf.encode(*values, encoding=encoding).getvalue()
+
+            for size in (1, 2, 7, len(data)):
+                self.assertEqual(
+                    self.chunked(encoding, data, size), values)
+
+    def test_amf3_in_amf0(self):
+        encoder = pyamf.get_encoder(pyamf.AMF0, use_amf3=True)
+        values = [[u'spam', u'spam'], {u'spam': u'eggs'}]
+
+        for value in values:
+            encoder.writeElement(value)
+
+        data = encoder.stream.getvalue()
+
+        self.assertEqual(self.chunked(pyamf.AMF0, data, 1), values)
+
+    def test_events(self):
+        decoder = pyamf.get_decoder(pyamf.AMF3)
+
+        decoder.feed(b'\x06\x07foo\x06')
+
+        self.assertEqual(list(decoder.events()), [
+            ('element', u'foo'), ('need-data', 1)
+        ])
+
+        # the partial element is only retried once its data has doubled
+        decoder.feed(b'\x07')
+        self.assertEqual(list(decoder.events()), [('need-data', 2)])
+
+        decoder.feed(b'ba')
+        self.assertEqual(list(decoder.events()), [('need-data', 4)])
+
+        decoder.feed(b'r')
+        decoder.close()
+
+        self.assertEqual(list(decoder.events()), [
+            ('element', u'bar'), ('end', None)
+        ])
+        self.assertRaises(pyamf.DecodeError, decoder.feed, b'')
+
+    def test_close_partial(self):
+        decoder = pyamf.get_decoder(pyamf.AMF0)
+
+        decoder.feed(b'\x02\x00\x05hel')
+        decoder.close()
+
+        self.assertRaises(pyamf.DecodeError, list, decoder.elements())
+
+    def test_read_only(self):
+        decoder = pyamf.decode(b'\x06\x07foo')
+        decoder.feed(b'\x06\x07bar')
+
+        self.assertEqual(list(decoder.elements()), [u'foo', u'bar'])
+
+
+class CodecPoolTestCase(unittest.TestCase):
+    """
+    Tests for L{codec.CodecPool}
+    """
+
+    def setUp(self):
+        self.pool = codec.CodecPool(pyamf.AMF3)
+
+    def test_reuse_encoder(self):
+        encoder = self.pool.acquireEncoder()
+        encoder.writeElement('spam')
+        stream = encoder.stream
+
+        self.pool.release(encoder)
+
+        self.assertEqual(len(self.pool), 1)
+        self.assertEqual(stream.getvalue(), b'\x06\tspam')
+
+        other = self.pool.acquireEncoder()
+
+        self.assertIdentical(other, encoder)
+        self.assertNotIdentical(other.stream, stream)
+        self.assertEqual(other.stream.getvalue(), b'')
+        self.assertEqual(len(other.context.strings), 0)
+        self.assertTrue(unicode in other._func_cache)
+
+    def test_kwargs(self):
+        encoder = self.pool.acquireEncoder(strict=True)
+        self.pool.release(encoder)
+
+        other = self.pool.acquireEncoder()
+
+        self.assertNotIdentical(other, encoder)
+        self.assertFalse(other.strict)
+
+        self.assertIdentical(self.pool.acquireEncoder(strict=True), encoder)
+
+    def test_decoder(self):
+        with self.pool.decoder(b'\x06\tspam') as decoder:
+            self.assertEqual(decoder.readElement(), 'spam')
+
+        with self.pool.decoder(b'\x04\x01') as other:
+            self.assertIdentical(other, decoder)
+            self.assertEqual(other.readElement(), 1)
+            self.assertEqual(len(other.context.strings), 0)
+
+    def test_release_unknown(self):
+        self.pool.release(pyamf.get_encoder(pyamf.AMF3))
+
+        self.assertEqual(len(self.pool), 0)
+
+    def test_max_size(self):
+        self.pool.max_size = 1
+
+        x = self.pool.acquireEncoder()
+        y = self.pool.acquireEncoder()
+
+        self.pool.release(x)
+        self.pool.release(y)
+
+        self.assertEqual(len(self.pool), 1)
+
+        self.pool.clear()
+
+        self.assertEqual(len(self.pool), 0)
+
+    def test_global(self):
+        pool = pyamf.codec_pool(pyamf.AMF0)
+
+        self.assertIdentical(pool, pyamf.codec_pool(pyamf.AMF0))
+        self.assertEqual(pool.encoding, pyamf.AMF0)
+        self.assertRaises(ValueError, pyamf.codec_pool, 2)
+
+    def test_add_type(self):
+        """
+        Pooled encoders must not hold on to type functions resolved before a
+        type was added.
+        """
+        encoder = self.pool.acquireEncoder()
+        encoder.writeElement(TestObject())
+        self.pool.release(encoder)
+
+        pyamf.add_type(TestObject, lambda obj, encoder: 'spam')
+        self.addCleanup(pyamf.remove_type, TestObject)
+
+        other = self.pool.acquireEncoder()
+        other.writeElement(TestObject())
+
+        self.assertIdentical(other, encoder)
+        self.assertEqual(other.stream.getvalue(), b'\x06\tspam')
+        self.assertEqual(
+            other.stream.getvalue(),
+            pyamf.encode(TestObject(), encoding=pyamf.AMF3).getvalue()
+        )
+
+    def test_add_type_amf3(self):
+        """
+        The AMF3 encoder nested in a pooled AMF0 encoder must not hold on to
+        type functions resolved before a type was added.
+        """
+        pool = codec.CodecPool(pyamf.AMF0)
+
+        encoder = pool.acquireEncoder(use_amf3=True)
+        encoder.writeElement(TestObject())
+        pool.release(encoder)
+
+        pyamf.add_type(TestObject, lambda obj, encoder: 'spam')
+        self.addCleanup(pyamf.remove_type, TestObject)
+
+        other = pool.acquireEncoder(use_amf3=True)
+        other.writeElement(TestObject())
+
+        self.assertIdentical(other, encoder)
+        self.assertEqual(other.stream.getvalue(), b'\x11\x06\tspam')
+
+
+class TypeFuncCacheTestCase(unittest.TestCase):
+    """
+    Tests for L{pyamf.TYPE_FUNC_CACHE}.
+    """
+
+    def setUp(self):
+        self.type_map = pyamf.TYPE_MAP.copy()
+
+        pyamf.TYPE_FUNC_CACHE.clear()
+
+    def tearDown(self):
+        pyamf.TYPE_MAP.clear()
+        pyamf.TYPE_MAP.update(self.type_map)
+        pyamf.TYPE_FUNC_CACHE.clear()
+
+    def get_encoder(self, encoding=pyamf.AMF3, **kwargs):
+        encoder = pyamf.get_encoder(encoding, **kwargs)
+        calls = []
+
+        def getTypeFunc(data):
+            calls.append(data)
+
+            return encoder.__class__.getTypeFunc(encoder, data)
+
+        encoder.getTypeFunc = getTypeFunc
+
+        return encoder, calls
+
+    def test_shared(self):
+        encoder, calls = self.get_encoder()
+        encoder.writeElement(TestObject())
+
+        self.assertEqual(len(calls), 2)
+
+        other, calls = self.get_encoder()
+        other.writeElement(TestObject())
+
+        self.assertEqual(calls, [])
+        self.assertEqual(
+            other.stream.getvalue(),
+            encoder.stream.getvalue()
+        )
+
+    def test_custom_type(self):
+        pyamf.add_type(TestObject, lambda obj, encoder: None)
+
+        encoder, calls = self.get_encoder()
+        encoder.writeElement(TestObject())
+
+        other, calls = self.get_encoder(use_proxies=False)
+        func = other._resolveTypeFunc(TestObject())
+
+        self.assertEqual(calls, [])
+        self.assertIdentical(func.encoder, other)
+
+    def test_add_type(self):
+        encoder, calls = self.get_encoder()
+        encoder.writeElement(TestObject())
+
+        self.assertNotEqual(pyamf.TYPE_FUNC_CACHE, {})
+
+        pyamf.add_type(TestObject, lambda obj, encoder: None)
+
+        self.assertEqual(pyamf.TYPE_FUNC_CACHE, {})
+
+        pyamf.remove_type(TestObject)
+        pyamf.encode(TestObject())
+
+        self.assertNotEqual(pyamf.TYPE_FUNC_CACHE, {})
+
+        pyamf.register_class(TestObject, 'spam.eggs')
+        self.addCleanup(pyamf.unregister_class, TestObject)
+
+        self.assertEqual(pyamf.TYPE_FUNC_CACHE, {})
+
+    def test_mro(self):
+        class SubObject(TestObject):
+            pass
+
+        pyamf.add_type(SubObject, lambda obj, encoder: u'sub')
+        pyamf.add_type(TestObject, lambda obj, encoder: u'base')
+
+        self.assertEqual(
+            pyamf.encode(SubObject(), encoding=pyamf.AMF3).getvalue(),
+            b'\x06\x07sub'
+        )
+
+    def test_predicate(self):
+        pyamf.add_type(
+            lambda obj: getattr(obj, 'name', None) == u'spam',
+            lambda obj, encoder: u'spam'
+        )
+
+        encoder, calls = self.get_encoder()
+        encoder.writeElement(TestObject())
+
+        self.assertFalse(
+            (amf3.Encoder, TestObject) in pyamf.TYPE_FUNC_CACHE
+        )
+
+        spam = TestObject()
+        spam.name = u'spam'
+
+        self.assertEqual(
+            pyamf.encode(spam, encoding=pyamf.AMF3).getvalue(),
+            b'\x06\tspam'
+        )
+
+    def test_use_amf3(self):
+        encoder, calls = self.get_encoder(pyamf.AMF0)
+        encoder.writeElement(u'spam')
+
+        other, calls = self.get_encoder(pyamf.AMF0, use_amf3=True)
+        other.writeElement(u'spam')
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(other.stream.getvalue(), b'\x11\x06\tspam')
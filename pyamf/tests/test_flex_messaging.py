@@ -28,6 +28,58 @@ class AbstractMessageTestCase(unittest.TestCase):
         except:
             raise
 
+    def test_init_once(self):
+        calls = []
+
+        class Message(messaging.AbstractMessage):
+            def __init__(self, *args, **kwargs):
+                calls.append(kwargs)
+
+                messaging.AbstractMessage.__init__(self, *args, **kwargs)
+
+        msg = Message(body='spam')
+
+        self.assertEqual(calls, [{'body': 'spam'}])
+        self.assertEqual(msg.body, 'spam')
+
+    def test_alias(self):
+        alias = pyamf.get_class_alias(messaging.RemotingMessage)
+
+        self.assertTrue(isinstance(alias, messaging.MessageAlias))
+        self.assertEqual(alias.createInstance().headers, {})
+
+    def test_required_init_args(self):
+        """
+        Messages whose class requires arguments to be constructed can still
+        be decoded.
+        """
+        class Message(messaging.AsyncMessage):
+            def __init__(self, spam, **kwargs):
+                messaging.AsyncMessage.__init__(self, **kwargs)
+
+                self.spam = spam
+
+        pyamf.register_class(Message, 'test.Message')
+        self.addCleanup(pyamf.unregister_class, Message)
+
+        alias = pyamf.get_class_alias(Message)
+        msg = Message('eggs', body='foo')
+        msg.headers = {'spam': 'eggs'}
+
+        self.assertTrue(isinstance(alias, messaging.MessageAlias))
+        self.assertEqual(alias.createInstance().headers, {})
+
+        for encoding in pyamf.ENCODING_TYPES:
+            decoded = pyamf.decode(
+                pyamf.encode(msg, encoding=encoding).getvalue(),
+                encoding=encoding
+            ).readElement()
+
+            self.assertTrue(isinstance(decoded, Message))
+            self.assertEqual(decoded.spam, 'eggs')
+            self.assertEqual(decoded.body, 'foo')
+            self.assertEqual(decoded.headers, {'spam': 'eggs'})
+
 
 class EncodingTestCase(unittest.TestCase):
     """
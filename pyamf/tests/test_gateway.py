@@ -9,10 +9,11 @@ General gateway tests.
 
 import unittest
 import sys
+import threading
 
 import pyamf
 from pyamf import remoting
-from pyamf.remoting import gateway, amf0
+from pyamf.remoting import gateway, amf0, cache
 
 
 class TestService(object):
@@ -208,6 +209,13 @@ class BaseGatewayTestCase(unittest.TestCase):
         self.assertRaises(TypeError, gateway.BaseGateway, [])
         self.assertRaises(TypeError, gateway.BaseGateway, foo='bar')
 
+    def test_codec_pool(self):
+        x = gateway.BaseGateway()
+        self.assertEqual(x.codec_pool, None)
+
+        x = gateway.BaseGateway(codec_pool=True)
+        self.assertIdentical(x.codec_pool, pyamf.codec_pool(pyamf.AMF0))
+
     def test_add_service(self):
         gw = gateway.BaseGateway()
         self.assertEqual(gw.services, {})
@@ -817,3 +825,564 @@ class PreProcessingTestCase(unittest.TestCase):
 
         self.assertTrue(isinstance(response, remoting.Response))
         self.assertEqual(response.status, remoting.STATUS_ERROR)
+
+
+class ProcessBodiesTestCase(unittest.TestCase):
+    """
+    Tests for L{gateway.BaseGateway.processBodies}.
+    """
+
+    def getRequest(self, *calls):
+        envelope = remoting.Envelope(pyamf.AMF3)
+
+        for i, (target, body) in enumerate(calls):
+            envelope['/%d' % (i + 1,)] = remoting.Request(
+                target, body=body, envelope=envelope
+            )
+
+        return envelope
+
+    def process(self, gw, request):
+        def process(message):
+            return gw.getProcessor(message)(message)
+
+        return gw.processBodies(request, process)
+
+    def test_create(self):
+        gw = gateway.BaseGateway()
+
+        self.assertEqual(gw.executor, None)
+
+        gw = gateway.BaseGateway(concurrency=2, timeout=1)
+
+        self.assertEqual(gw.executor._max_workers, 2)
+        self.assertEqual(gw.timeout, 1)
+
+        self.assertRaises(ValueError, gateway.BaseGateway, timeout=1)
+
+    def test_sequential(self):
+        threads = []
+
+        def echo(x):
+            threads.append(threading.current_thread())
+
+            return x
+
+        gw = gateway.BaseGateway({'echo': echo})
+        response = self.process(
+            gw, self.getRequest(('echo', [1]), ('echo', [2]))
+        )
+
+        self.assertEqual(response.keys(), ['/1', '/2'])
+        self.assertEqual([r.body for n, r in response], [1, 2])
+        self.assertEqual(threads, [threading.current_thread()] * 2)
+
+    def test_concurrent(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def wait(x):
+            # only completes once all three calls are running
+            barrier.wait()
+
+            return x
+
+        gw = gateway.BaseGateway({'wait': wait}, concurrency=3)
+        response = self.process(gw, self.getRequest(
+            ('wait', [1]), ('wait', [2]), ('wait', [3])
+        ))
+
+        self.assertEqual(response.keys(), ['/1', '/2', '/3'])
+        self.assertEqual([r.status for n, r in response], [0, 0, 0])
+        self.assertEqual([r.body for n, r in response], [1, 2, 3])
+
+    def test_error(self):
+        def fail():
+            raise IndexError('spam')
+
+        gw = gateway.BaseGateway(
+            {'fail': fail, 'echo': lambda x: x}, concurrency=2
+        )
+        response = self.process(
+            gw, self.getRequest(('fail', []), ('echo', [1]))
+        )
+
+        self.assertEqual(response['/1'].status, remoting.STATUS_ERROR)
+        self.assertEqual(response['/1'].body.code, 'IndexError')
+        self.assertEqual(response['/2'].body, 1)
+
+    def test_timeout(self):
+        event = threading.Event()
+        self.addCleanup(event.set)
+
+        def block():
+            event.wait(5)
+
+        gw = gateway.BaseGateway(
+            {'block': block, 'echo': lambda x: x},
+            concurrency=2,
+            timeout=0.05
+        )
+        response = self.process(
+            gw, self.getRequest(('block', []), ('echo', [1]))
+        )
+
+        self.assertEqual(response['/1'].status, remoting.STATUS_ERROR)
+        self.assertTrue(isinstance(response['/1'].body, remoting.ErrorFault))
+        self.assertEqual(response['/1'].body.code, 'Service.Timeout')
+        self.assertEqual(response['/2'].body, 1)
+
+    def test_timeout_amf3(self):
+        from pyamf.flex import messaging
+
+        event = threading.Event()
+        self.addCleanup(event.set)
+        errors = []
+
+        def block():
+            event.wait(5)
+
+        gw = gateway.BaseGateway(
+            {'block': block}, concurrency=1, timeout=0.05
+        )
+        gw.onServiceError = lambda request, fault: errors.append(fault)
+
+        message = messaging.RemotingMessage(
+            operation='block', body=[], headers={'DSId': 'foo'}
+        )
+        response = self.process(gw, self.getRequest(('null', [message])))
+
+        self.assertEqual(response['/1'].status, remoting.STATUS_ERROR)
+
+        error = response['/1'].body
+
+        self.assertTrue(isinstance(error, messaging.ErrorMessage))
+        self.assertEqual(error.faultCode, 'Service.Timeout')
+        self.assertEqual(error.headers['DSId'], 'foo')
+        self.assertEqual(errors, [error])
+
+    def test_timeout_from_start(self):
+        """
+        Service calls that timed out but are still running do not make the
+        bodies of later requests time out while they wait for a worker.
+        """
+        event = threading.Event()
+        self.addCleanup(event.set)
+
+        def slow():
+            event.wait(5)
+
+        gw = gateway.BaseGateway(
+            {'slow': slow, 'fast': lambda: 'spam'},
+            concurrency=2,
+            timeout=0.2
+        )
+        self.addCleanup(gw.close)
+
+        response = self.process(
+            gw, self.getRequest(('slow', []), ('slow', []))
+        )
+
+        self.assertEqual(
+            [r.body.code for n, r in response],
+            ['Service.Timeout', 'Service.Timeout']
+        )
+
+        # both workers are still busy with the slow calls, which return
+        # after the timeout of the next request would have passed
+        timer = threading.Timer(0.3, event.set)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        response = self.process(gw, self.getRequest(('fast', [])))
+
+        self.assertEqual(response['/1'].status, remoting.STATUS_OK)
+        self.assertEqual(response['/1'].body, 'spam')
+
+    def test_close(self):
+        gw = gateway.BaseGateway({'echo': lambda x: x}, concurrency=2)
+
+        response = self.process(gw, self.getRequest(('echo', [1])))
+
+        self.assertEqual(response['/1'].body, 1)
+
+        gw.close()
+
+        self.assertRaises(
+            RuntimeError,
+            self.process, gw, self.getRequest(('echo', [1]))
+        )
+
+        # no thread pool to shut down
+        gateway.BaseGateway().close()
+
+
+class DispatchTableTestCase(unittest.TestCase):
+    """
+    Tests for L{gateway.BaseGateway.dispatch_table}.
+    """
+
+    def setUp(self):
+        self.gw = gateway.BaseGateway()
+        self.envelope = remoting.Envelope()
+
+    def getServiceRequest(self, target):
+        request = remoting.Request(target, envelope=self.envelope)
+
+        return self.gw.getServiceRequest(request, target)
+
+    def test_add_service(self):
+        self.gw.addService(TestService, 'test')
+        self.gw.addService(lambda x: x, 'echo')
+
+        self.assertEqual(
+            sorted(self.gw.dispatch_table.keys()),
+            ['echo', 'test', 'test.echo', 'test.spam']
+        )
+
+        entry = self.gw.dispatch_table['test.spam']
+
+        self.assertEqual(entry.name, 'test')
+        self.assertEqual(entry.method, 'spam')
+        self.assertIdentical(entry.service, self.gw.services['test'])
+        # classes are instantiated for each call
+        self.assertEqual(entry.func, None)
+
+        sr = self.getServiceRequest('test.spam')
+
+        self.assertIdentical(sr.entry, entry)
+        self.assertEqual(sr.method, 'spam')
+        self.assertEqual(sr(), 'spam')
+        self.assertEqual(self.getServiceRequest('echo')('foo'), 'foo')
+
+    def test_instance(self):
+        service = TestService()
+
+        self.gw.addService(service, 'test')
+
+        entry = self.gw.dispatch_table['test.echo']
+
+        self.assertEqual(entry.func, service.echo)
+        self.assertEqual(self.getServiceRequest('test.echo')('foo'), 'foo')
+
+    def test_remove_service(self):
+        self.gw.addService(TestService, 'test')
+        self.gw.removeService('test')
+
+        self.assertEqual(self.gw.dispatch_table, {})
+        self.assertRaises(
+            gateway.UnknownServiceError, self.getServiceRequest, 'test.spam'
+        )
+
+    def test_removed_directly(self):
+        self.gw.addService(TestService, 'test')
+
+        del self.gw.services['test']
+
+        self.assertRaises(
+            gateway.UnknownServiceError, self.getServiceRequest, 'test.spam'
+        )
+
+    def test_not_compiled(self):
+        # methods added after the service are routed the slow way
+        service = TestService()
+
+        self.gw.addService(service, 'test')
+        service.eggs = lambda: 'eggs'
+
+        sr = self.getServiceRequest('test.eggs')
+
+        self.assertEqual(sr.entry, None)
+        self.assertEqual(sr(), 'eggs')
+
+        self.gw.compileServices()
+
+        self.assertNotEqual(self.getServiceRequest('test.eggs').entry, None)
+
+    def test_private(self):
+        self.gw.addService(TestService(), 'test')
+
+        sr = self.getServiceRequest('test.__init__')
+
+        self.assertEqual(sr.entry, None)
+        self.assertRaises(gateway.InvalidServiceMethodError, sr)
+
+    def test_service_name_precedence(self):
+        self.gw.addService(lambda: 'service', 'test.spam')
+        self.gw.addService(TestService, 'test')
+
+        self.assertEqual(self.getServiceRequest('test.spam')(), 'service')
+
+        self.gw.removeService('test')
+        self.gw.addService(TestService, 'test')
+        self.gw.removeService('test.spam')
+
+        self.assertEqual(self.getServiceRequest('test.spam')(), 'spam')
+
+    def test_flags(self):
+        def auth(username, password):
+            return True
+
+        def preproc(service_request):
+            pass
+
+        class Service(object):
+            def spam(self):
+                return 'spam'
+
+            @gateway.expose_request
+            def eggs(self, request):
+                return 'eggs'
+
+        Service.spam = gateway.authenticate(Service.spam, auth)
+        Service.spam = gateway.preprocess(Service.spam, preproc)
+
+        self.gw.addService(Service, 'test', expose_request=False)
+
+        spam = self.gw.dispatch_table['test.spam']
+        eggs = self.gw.dispatch_table['test.eggs']
+
+        self.assertIdentical(spam.authenticator, auth)
+        self.assertIdentical(spam.preprocessor, preproc)
+        self.assertFalse(spam.expose_request)
+        self.assertEqual(eggs.authenticator, None)
+        self.assertTrue(eggs.expose_request)
+
+        sr = self.getServiceRequest('test.spam')
+
+        self.assertIdentical(self.gw.getAuthenticator(sr), auth)
+        self.assertIdentical(self.gw.getPreprocessor(sr), preproc)
+        self.assertFalse(self.gw.mustExposeRequest(sr))
+        self.assertTrue(
+            self.gw.mustExposeRequest(self.getServiceRequest('test.eggs'))
+        )
+
+
+class FakeMemcache(object):
+    """
+    A stand in for a memcached client.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.times = {}
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def set(self, key, value, time=0):
+        self.items[key] = value
+        self.times[key] = time
+
+        return True
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """
+    Tests for caching the responses of services.
+    """
+
+    def setUp(self):
+        self.calls = []
+        self.memcache = FakeMemcache()
+        self.gw = gateway.BaseGateway(response_cache=self.memcache)
+
+    def echo(self, *args):
+        self.calls.append(args)
+
+        return list(args)
+
+    def getRequest(self, target, body, amfVersion=pyamf.AMF0):
+        envelope = remoting.Envelope(amfVersion)
+        envelope['/1'] = remoting.Request(
+            target, body=body, envelope=envelope
+        )
+
+        return envelope['/1']
+
+    def call(self, target, *args):
+        request = self.getRequest(target, list(args))
+
+        return self.gw.getProcessor(request)(request)
+
+    def test_default(self):
+        gw = gateway.BaseGateway()
+
+        self.assertTrue(isinstance(gw.response_cache, cache.LRUCache))
+
+    def test_externalised(self):
+        """
+        A response that cannot be kept encoded (L{pyamf.RawAMF} cannot walk
+        externalised objects) is sent as is and not cached.
+        """
+        class Spam(object):
+            class __amf__:
+                external = True
+
+            def __writeamf__(self, output):
+                output.writeUTF('eggs')
+
+            def __readamf__(self, input):
+                self.value = input.readUTF()
+
+        pyamf.register_class(Spam, 'test.Spam')
+        self.addCleanup(pyamf.unregister_class, Spam)
+
+        def spam():
+            self.calls.append(())
+
+            return Spam()
+
+        self.gw.addService(spam, 'spam', cache=True)
+
+        for i in range(2):
+            request = self.getRequest('spam', [], pyamf.AMF3)
+            response = self.gw.getProcessor(request)(request)
+
+            self.assertEqual(response.status, remoting.STATUS_OK)
+            self.assertTrue(isinstance(response.body, Spam))
+
+            envelope = remoting.Envelope(pyamf.AMF3)
+            envelope['/1'] = response
+
+            body = remoting.decode(remoting.encode(envelope))['/1'].body
+
+            self.assertEqual(body.value, 'eggs')
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.memcache.items, {})
+
+    def test_not_cached(self):
+        self.gw.addService(self.echo, 'echo')
+
+        self.assertEqual(self.call('echo', 1).body, [1])
+        self.assertEqual(self.call('echo', 1).body, [1])
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.memcache.items, {})
+
+    def test_cached(self):
+        self.gw.addService(self.echo, 'echo', cache=60)
+
+        response = self.call('echo', {'a': 1, 'b': 2})
+
+        self.assertEqual(response.status, remoting.STATUS_OK)
+        self.assertTrue(isinstance(response.body, pyamf.RawAMF))
+
+        envelope = remoting.Envelope(pyamf.AMF0)
+        envelope['/1'] = response
+
+        self.assertEqual(
+            remoting.decode(remoting.encode(envelope))['/1'].body,
+            [{'a': 1, 'b': 2}]
+        )
+
+        self.assertEqual(self.call('echo', {'b': 2, 'a': 1}), response)
+        self.assertEqual(self.calls, [({'a': 1, 'b': 2},)])
+
+        self.call('echo', {'b': 2})
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(list(self.memcache.times.values()), [60, 60])
+
+    def test_amf_version(self):
+        self.gw.addService(self.echo, 'echo', cache=True)
+
+        for amfVersion in (pyamf.AMF0, pyamf.AMF3, pyamf.AMF3):
+            request = self.getRequest('echo', [u'spam'], amfVersion)
+            response = self.gw.getProcessor(request)(request)
+
+            envelope = remoting.Envelope(amfVersion)
+            envelope['/1'] = response
+
+            self.assertEqual(
+                remoting.decode(remoting.encode(envelope))['/1'].body,
+                [u'spam']
+            )
+
+        self.assertEqual(len(self.calls), 2)
+
+    def test_errors(self):
+        def fail(x):
+            self.calls.append(x)
+
+            raise ValueError(x)
+
+        self.gw.addService(fail, cache=True)
+
+        self.assertEqual(self.call('fail', 1).status, remoting.STATUS_ERROR)
+        self.assertEqual(self.call('fail', 1).status, remoting.STATUS_ERROR)
+        self.assertEqual(self.calls, [1, 1])
+
+    def test_cacheable(self):
+        calls = self.calls
+
+        class Service(object):
+            def spam(self, x):
+                calls.append(('spam', x))
+
+            @gateway.cacheable
+            def eggs(self, x):
+                calls.append(('eggs', x))
+
+            def ham(self, x):
+                calls.append(('ham', x))
+
+        Service.ham = gateway.cacheable(Service.ham, False)
+
+        self.gw.addService(Service, 'test')
+        self.gw.addService(Service, 'cached', cache=True)
+
+        for i in range(2):
+            self.call('test.spam', 1)
+            self.call('test.eggs', 1)
+            self.call('cached.spam', 1)
+            self.call('cached.ham', 1)
+
+        self.assertEqual(sorted(calls), [
+            ('eggs', 1),
+            ('ham', 1),
+            ('ham', 1),
+            ('spam', 1),
+            ('spam', 1),
+            ('spam', 1),
+        ])
+
+    def test_unknown_key(self):
+        class Unkeyable(object):
+            def __repr__(self):
+                return 'Unkeyable'
+
+        alias = pyamf.ClassAlias(Unkeyable, defer=True)
+        alias.getEncodableAttributes = None
+
+        self.gw.addService(self.echo, 'echo', cache=True)
+
+        request = self.getRequest('echo', [Unkeyable()])
+        sr = self.gw.getServiceRequest(request, 'echo')
+
+        try:
+            pyamf.CLASS_CACHE[Unkeyable] = alias
+            key = self.gw.getCacheKey(sr, 'echo', request.body)
+        finally:
+            del pyamf.CLASS_CACHE[Unkeyable]
+
+        self.assertEqual(key, None)
+
+    def test_remoting_message(self):
+        from pyamf.flex import messaging
+
+        self.gw.addService(self.echo, 'echo', cache=True)
+
+        for i in range(2):
+            message = messaging.RemotingMessage(
+                operation='echo', body=[u'spam'], messageId=str(i)
+            )
+            request = self.getRequest('null', [message], pyamf.AMF3)
+            response = self.gw.getProcessor(request)(request)
+
+            self.assertEqual(response.body.body, [u'spam'])
+            self.assertEqual(response.body.correlationId, str(i))
+
+        self.assertEqual(len(self.calls), 1)
+        # the result is cached, not the acknowledgement
+        self.assertEqual(list(self.memcache.items.values()), [([u'spam'],)])
+        self.assertEqual(list(self.memcache.times.values()), [0])
@@ -9,10 +9,11 @@ Tests for AMF Remoting.
 @since: 0.1.0
 """
 
+import datetime
 import unittest
 
 import pyamf
-from pyamf import remoting, util
+from pyamf import remoting, util, codec
 
 
 class DecoderTestCase(unittest.TestCase):
@@ -41,6 +42,21 @@ class DecoderTestCase(unittest.TestCase):
 
         self.assertEqual(y, [])
 
+    def test_buffer(self):
+        """
+        C{bytes} like objects are decoded in place.
+        """
+        data = (
+            b'\x00\x00\x00\x01\x00\x04name\x00\x00\x00\x00'
+            b'\x05\x0a\x00\x00\x00\x00\x00\x00'
+        )
+
+        for buf in (bytearray(data), memoryview(data)):
+            msg = remoting.decode(buf)
+
+            self.assertEqual(msg.headers['name'], [])
+            self.assertEqual(msg, {})
+
     def test_simple_header(self):
         """
         Test header decoder.
@@ -407,6 +423,148 @@ class ContextTextCase(unittest.TestCase):
         )
 
 
+class CodecPoolTestCase(unittest.TestCase):
+    """
+    Tests for using a L{pyamf.codec.CodecPool} to en/decode envelopes.
+    """
+
+    def setUp(self):
+        self.pool = codec.CodecPool(pyamf.AMF0)
+
+    def test_encode(self):
+        msg = remoting.Envelope(pyamf.AMF3)
+        msg['/1'] = remoting.Response(['spam'])
+
+        expected = remoting.encode(msg).getvalue()
+
+        for i in range(2):
+            stream = remoting.encode(msg, codec_pool=self.pool)
+
+            self.assertEqual(stream.getvalue(), expected)
+            self.assertEqual(len(self.pool), 1)
+
+    def test_decode(self):
+        msg = remoting.Envelope(pyamf.AMF3)
+        msg['/1'] = remoting.Request('spam.eggs', body=[['foo', 'bar']])
+        msg['/2'] = remoting.Request('spam.eggs', body=[['foo', 'bar']])
+
+        data = remoting.encode(msg).getvalue()
+
+        for i in range(2):
+            envelope = remoting.decode(data, codec_pool=self.pool)
+
+            self.assertEqual(envelope, msg)
+            self.assertEqual(len(self.pool), 1)
+
+    def test_decode_error(self):
+        self.assertRaises(
+            IOError,
+            remoting.decode,
+            b'\x00\x00\x00\x00\x00\x01',
+            codec_pool=self.pool
+        )
+
+        self.assertEqual(len(self.pool), 1)
+
+
+class EncodeIterTestCase(unittest.TestCase):
+    """
+    Tests for L{remoting.encode_iter}.
+    """
+
+    def setUp(self):
+        self.msg = remoting.Envelope(pyamf.AMF0)
+        self.msg.headers['spam'] = 'eggs'
+        self.msg['/1'] = remoting.Response(['spam'] * 100)
+        self.msg['/2'] = remoting.Request('spam.eggs', body=['foo', 'bar'])
+
+    def test_chunks(self):
+        for strict in (False, True):
+            expected = remoting.encode(self.msg, strict=strict).getvalue()
+
+            for chunk_size in (1, 7, 100, len(expected) * 2):
+                chunks = list(remoting.encode_iter(
+                    self.msg, strict=strict, chunk_size=chunk_size))
+
+                self.assertEqual(b''.join(chunks), expected)
+                self.assertTrue(len(chunks[-1]) <= chunk_size)
+
+                for chunk in chunks[:-1]:
+                    self.assertEqual(len(chunk), chunk_size)
+
+    def test_per_body(self):
+        """
+        The first body is handed out before the second is encoded.
+        """
+        chunks = remoting.encode_iter(self.msg, chunk_size=200)
+
+        first = next(chunks)
+        self.msg['/2'] = remoting.Response('changed')
+
+        envelope = remoting.decode(first + b''.join(chunks))
+
+        self.assertEqual(envelope['/2'].body, 'changed')
+
+    def test_codec_pool(self):
+        pool = codec.CodecPool(pyamf.AMF0)
+        expected = remoting.encode(self.msg).getvalue()
+
+        chunks = remoting.encode_iter(self.msg, chunk_size=10, codec_pool=pool)
+
+        self.assertEqual(b''.join(chunks), expected)
+        self.assertEqual(len(pool), 1)
+
+
+class EncodeBodyTestCase(unittest.TestCase):
+    """
+    Tests for L{remoting.encode_body}.
+    """
+
+    def test_encode(self):
+        body = [{'a': u'spam', 'b': u'spam'}, datetime.datetime(2010, 1, 1)]
+
+        for amfVersion in (pyamf.AMF0, pyamf.AMF3):
+            for strict in (False, True):
+                msg = remoting.Envelope(amfVersion)
+                msg['/1'] = remoting.Response(u'spam')
+                msg['/2'] = remoting.Response(body)
+
+                expected = remoting.encode(msg, strict=strict).getvalue()
+
+                msg['/2'] = remoting.Response(
+                    remoting.encode_body(body, amfVersion, strict=strict)
+                )
+
+                self.assertEqual(
+                    remoting.encode(msg, strict=strict).getvalue(), expected
+                )
+                self.assertEqual(
+                    b''.join(remoting.encode_iter(msg, strict=strict)),
+                    expected
+                )
+
+    def test_raw_bodies(self):
+        """
+        The context is cleared for each body, so every body can be a
+        L{pyamf.RawAMF} that contains references.
+        """
+        value = [{'a': u'spam'}] * 2
+
+        msg = remoting.Envelope(pyamf.AMF3)
+        msg['/1'] = remoting.Response(value)
+        msg['/2'] = remoting.Response(value)
+        expected = remoting.encode(msg).getvalue()
+
+        raw = remoting.encode_body(value, pyamf.AMF3)
+
+        self.assertTrue(raw.references > 0)
+
+        msg['/1'] = remoting.Response(raw)
+        msg['/2'] = remoting.Response(raw)
+
+        self.assertEqual(remoting.encode(msg).getvalue(), expected)
+
+
 class FunctionalTestCase(unittest.TestCase):
     def test_encode_bytearray(self):
         from pyamf.amf3 import ByteArray
@@ -0,0 +1,272 @@
+# Copyright (c) The PyAMF Project.
+# See LICENSE.txt for details.
+
+"""
+Tests for L{pyamf.scan}.
+
+@since: 0.8.9
+"""
+
+import datetime
+import unittest
+
+import pyamf
+from pyamf import remoting, scan, util
+from pyamf.flex import ArrayCollection
+from pyamf.tests.util import ClassCacheClearingTestCase
+
+
+class Spam(object):
+    class __amf__:
+        static = ('name',)
+
+    def __init__(self, name=None):
+        self.name = name
+
+
+class ScanTestCase(ClassCacheClearingTestCase):
+    """
+    Tests for L{scan.scan}.
+    """
+
+    def setUp(self):
+        ClassCacheClearingTestCase.setUp(self)
+
+        pyamf.register_class(Spam, 'spam.Spam')
+
+        self.created = []
+
+        def createInstance(alias, *args, **kwargs):
+            self.created.append(alias)
+
+        self.addCleanup(
+            setattr, pyamf.ClassAlias, 'createInstance',
+            pyamf.ClassAlias.createInstance
+        )
+        pyamf.ClassAlias.createInstance = createInstance
+
+    def encode(self, encoding, *args):
+        return pyamf.encode(*args, encoding=encoding).getvalue()
+
+    def get_value(self):
+        spam = Spam(u'foo')
+
+        return [
+            {u'a': 1, u'b': [1.5, None, True]},
+            spam,
+            spam,
+            u'foo',
+            datetime.datetime(2010, 1, 1),
+            pyamf.MixedArray(a=1),
+        ]
+
+    def test_amf0(self):
+        data = self.encode(pyamf.AMF0, self.get_value(), u'bar')
+
+        stats = scan.scan(data, pyamf.AMF0)
+
+        self.assertEqual(stats.elements, 15)
+        self.assertEqual(stats.depth, 3)
+        self.assertEqual(stats.objects, 6)
+        self.assertEqual(stats.references, 1)
+        self.assertEqual(stats.size, len(data))
+        self.assertEqual(stats.types, {
+            'array': 2,
+            'boolean': 1,
+            'date': 1,
+            'mixedarray': 1,
+            'null': 1,
+            'number': 3,
+            'object': 1,
+            'reference': 1,
+            'string': 3,
+            'typedobject': 1,
+        })
+        self.assertEqual(len(stats.offsets), 2)
+        self.assertEqual(stats.offsets[1], (len(data) - 6, len(data)))
+        self.assertEqual(self.created, [])
+
+    def test_amf3(self):
+        data = self.encode(pyamf.AMF3, self.get_value(), u'foo')
+
+        stats = scan.scan(data, pyamf.AMF3)
+
+        self.assertEqual(stats.elements, 15)
+        self.assertEqual(stats.depth, 3)
+        self.assertEqual(stats.objects, 6)
+        # the second spam, the name of the first and the two later u'foo's
+        self.assertEqual(stats.references, 4)
+        # spam.Spam
+        self.assertEqual(stats.max_string_length, 9)
+        self.assertEqual(stats.types['string'], 3)
+        self.assertEqual(stats.types['object'], 3)
+        self.assertEqual(stats.offsets, [
+            (0, len(data) - 2), (len(data) - 2, len(data))
+        ])
+        self.assertEqual(self.created, [])
+
+    def test_amf3_in_amf0(self):
+        encoder = pyamf.get_encoder(pyamf.AMF0)
+        encoder.use_amf3 = True
+        encoder.writeElement(self.get_value())
+        data = encoder.stream.getvalue()
+
+        stats = scan.scan(data, pyamf.AMF0)
+
+        self.assertEqual(stats.types['amf3'], 1)
+        self.assertEqual(stats.elements, 15)
+        self.assertEqual(stats.offsets, [(0, len(data))])
+
+    def test_externalised(self):
+        data = self.encode(pyamf.AMF3, ArrayCollection([1, 2]))
+
+        stats = scan.scan(data)
+
+        self.assertEqual(stats.elements, 4)
+        self.assertEqual(stats.depth, 2)
+
+    def test_unknown_externalised(self):
+        # an externalised class with the alias 'foo'
+        data = b'\n\x07\x07foo'
+
+        self.assertRaises(pyamf.DecodeError, scan.scan, data)
+
+    def test_stream(self):
+        stream = util.BufferedByteStream(b'\x06\x07foo\x04\x01')
+        stream.seek(5)
+
+        stats = scan.scan(stream)
+
+        self.assertEqual(stats.offsets, [(5, 7)])
+        self.assertEqual(stream.tell(), 5)
+
+        # the buffer has been released
+        stream.write(b'\x01')
+
+    def test_read_only_stream(self):
+        stats = scan.scan(util.get_read_stream(memoryview(b'\x04\x01\x01')))
+
+        self.assertEqual(stats.elements, 2)
+
+    def test_truncated(self):
+        data = self.encode(pyamf.AMF3, self.get_value())
+
+        for i in (1, 5, len(data) // 2, len(data) - 1):
+            self.assertRaises(
+                pyamf.DecodeError, scan.scan, data[:i], pyamf.AMF3
+            )
+
+    def test_bad_reference(self):
+        self.assertRaises(pyamf.DecodeError, scan.scan, b'\x06\x00')
+        self.assertRaises(pyamf.DecodeError, scan.scan, b'\x09\x02')
+        self.assertRaises(pyamf.DecodeError, scan.scan, b'\n\x03')
+        self.assertRaises(
+            pyamf.DecodeError, scan.scan, b'\x07\x00\x00', pyamf.AMF0
+        )
+
+    def test_unsupported(self):
+        self.assertRaises(pyamf.DecodeError, scan.scan, b'\x10')
+        self.assertRaises(pyamf.DecodeError, scan.scan, b'\x04', pyamf.AMF0)
+
+    def test_deep(self):
+        data = b'\t\x03\x01' * 10000 + b'\x01'
+
+        self.assertEqual(scan.scan(data).depth, 10000)
+
+
+class LimitsTestCase(unittest.TestCase):
+    """
+    Tests for L{scan.Limits}.
+    """
+
+    def assertExceeded(self, name, data, encoding=pyamf.AMF3, **kwargs):
+        limits = scan.Limits(**kwargs)
+
+        with self.assertRaises(scan.LimitExceeded) as cm:
+            scan.scan(data, encoding, limits)
+
+        self.assertEqual(cm.exception.name, name)
+        self.assertEqual(cm.exception.limit, kwargs[name])
+
+        return cm.exception
+
+    def test_depth(self):
+        data = pyamf.encode([[[1]]]).getvalue()
+
+        stats = scan.scan(data, limits=scan.Limits(max_depth=3))
+
+        self.assertEqual(stats.depth, 3)
+
+        e = self.assertExceeded('max_depth', data, max_depth=2)
+
+        self.assertEqual(e.value, 3)
+        self.assertEqual(e.offset, 6)
+
+    def test_elements(self):
+        data = pyamf.encode([1, 2, 3], encoding=pyamf.AMF0).getvalue()
+
+        self.assertExceeded('max_elements', data, pyamf.AMF0, max_elements=3)
+
+    def test_string_length(self):
+        data = pyamf.encode({u'spam': u'eggs'}).getvalue()
+
+        self.assertEqual(
+            scan.scan(data, limits=scan.Limits(max_string_length=4)).strings,
+            2
+        )
+
+        self.assertExceeded('max_string_length', data, max_string_length=3)
+
+    def test_length(self):
+        # an array declaring 0x10000 items, with none present
+        data = b'\t\x88\x80\x01\x01'
+
+        self.assertExceeded('max_length', data, max_length=0xffff)
+        self.assertExceeded(
+            'max_length', b'\n\x00\x01\x00\x00', pyamf.AMF0, max_length=255
+        )
+
+
+class ScanEnvelopeTestCase(unittest.TestCase):
+    """
+    Tests for L{scan.scan_envelope} and the C{limits} argument of
+    L{remoting.decode}.
+    """
+
+    def setUp(self):
+        self.msg = remoting.Envelope(pyamf.AMF3)
+        self.msg.headers['spam'] = u'eggs'
+        self.msg['/1'] = remoting.Request(u'foo.bar', [[1, [2, [3]]]])
+        self.msg['/2'] = remoting.Request(u'foo.baz', [u'foo', u'foo'])
+
+        self.data = remoting.encode(self.msg).getvalue()
+
+    def test_scan(self):
+        stats = scan.scan_envelope(self.data)
+
+        self.assertEqual(len(stats.offsets), 3)
+        self.assertEqual(stats.depth, 4)
+        self.assertEqual(stats.offsets[-1][1], len(self.data))
+        # the string table is cleared for each body
+        self.assertEqual(stats.references, 1)
+
+    def test_bad_version(self):
+        self.assertRaises(
+            pyamf.DecodeError, scan.scan_envelope, b'\x00\x0a\x00\x00\x00\x00'
+        )
+
+    def test_truncated(self):
+        self.assertRaises(
+            pyamf.DecodeError, scan.scan_envelope, self.data[:-4]
+        )
+
+    def test_decode(self):
+        limits = scan.Limits(max_depth=4)
+
+        self.assertEqual(remoting.decode(self.data, limits=limits), self.msg)
+
+        limits.max_depth = 3
+
+        self.assertRaises(
+            scan.LimitExceeded, remoting.decode, self.data, limits=limits
+        )
@@ -202,6 +202,18 @@ class HelperTestCase(unittest.TestCase):
         self.assertEqual(s, {'name': 'value', 'spam': 'eggs'})
         self.assertEqual(y, fp.tell())
 
+    def test_load_mmap(self):
+        fp = self._load()
+        fp.seek(0)
+
+        for name_or_file in (self.file_name, fp):
+            s = sol.load(name_or_file, mmap=True)
+
+            self.assertEqual(s.name, 'hello')
+            self.assertEqual(s, {'name': 'value', 'spam': 'eggs'})
+
+        fp.close()
+
     def test_save_name(self):
         s = sol.SOL('hello')
         s.update({'name': 'value', 'spam': 'eggs'})
@@ -9,6 +9,8 @@ Tests for AMF utilities.
 @since: 0.1.0
 """
 
+import os
+import tempfile
 import unittest
 
 from datetime import datetime
@@ -920,6 +922,158 @@ class BufferedByteStreamTestCase(unittest.TestCase):
         self.assertEqual(len(a), 3)
 
 
+class ReadOnlyByteStreamTestCase(unittest.TestCase):
+    """
+    Tests for L{ReadOnlyByteStream<util.ReadOnlyByteStream>}
+    """
+
+    def test_create(self):
+        x = util.ReadOnlyByteStream()
+
+        self.assertEqual(x.getvalue(), b'')
+        self.assertEqual(len(x), 0)
+
+        for buf in (b'abc', bytearray(b'abc'), memoryview(b'abc')):
+            x = util.ReadOnlyByteStream(buf)
+
+            self.assertEqual(x.getvalue(), b'abc')
+            self.assertEqual(x.tell(), 0)
+            self.assertEqual(len(x), 3)
+
+        self.assertRaises(TypeError, util.ReadOnlyByteStream, object())
+
+    def test_no_copy(self):
+        buf = b'hello world'
+        x = util.ReadOnlyByteStream(buf)
+
+        self.assertIdentical(x.getvalue(), buf)
+
+        buf = bytearray(b'abc')
+        x = util.ReadOnlyByteStream(buf)
+        buf[0] = ord('z')
+
+        self.assertEqual(x.read(), b'zbc')
+
+    def test_read(self):
+        x = util.ReadOnlyByteStream(bytearray(b'hello'))
+
+        self.assertRaises(IOError, x.read, 10)
+        self.assertRaises(IOError, x.read, -2)
+        self.assertEqual(x.read(2), b'he')
+        self.assertEqual(type(x.read(1)), bytes)
+        self.assertEqual(x.read(), b'lo')
+        self.assertTrue(x.at_eof())
+        self.assertRaises(IOError, x.read)
+
+    def test_seek(self):
+        x = util.ReadOnlyByteStream(b'abcdef')
+
+        x.seek(2)
+        self.assertEqual(x.peek(2), b'cd')
+        x.seek(1, 1)
+        self.assertEqual(x.tell(), 3)
+        x.seek(-1, 2)
+        self.assertEqual(x.read(), b'f')
+        self.assertEqual(x.remaining(), 0)
+        self.assertRaises(ValueError, x.seek, -1)
+
+    def test_read_types(self):
+        data = (
+            b'\xff\x80\x00\x01\xff\xfe\x00\x00\x00\x02'
+            b'\xff\xff\xff\xfd?\xf0\x00\x00\x00\x00\x00\x00'
+            b'?\x80\x00\x00\xe1\x9a\xa0'
+        )
+        x = util.ReadOnlyByteStream(data)
+
+        self.assertEqual(x.read_uchar(), 255)
+        self.assertEqual(x.read_char(), -128)
+        self.assertEqual(x.read_ushort(), 1)
+        self.assertEqual(x.read_short(), -2)
+        self.assertEqual(x.read_ulong(), 2)
+        self.assertEqual(x.read_long(), -3)
+        self.assertEqual(x.read_double(), 1.0)
+        self.assertEqual(x.read_float(), 1.0)
+        self.assertEqual(x.read_utf8_string(3), '\u16a0')
+        self.assertTrue(x.at_eof())
+
+        for meth in ('read_uchar', 'read_ushort', 'read_double'):
+            self.assertRaises(IOError, getattr(x, meth))
+
+        self.assertRaises(IOError, x.read_utf8_string, 1)
+        self.assertEqual(x.tell(), len(data))
+
+    def test_endian(self):
+        x = util.ReadOnlyByteStream(b'\x01\x00')
+        x.endian = util.BufferedByteStream.ENDIAN_LITTLE
+
+        self.assertEqual(x.read_ushort(), 1)
+
+    def test_read_only(self):
+        x = util.ReadOnlyByteStream(b'abc')
+
+        self.assertRaises(IOError, x.write, b'd')
+        self.assertRaises(IOError, x.write_uchar, 1)
+        self.assertRaises(IOError, x.truncate)
+        self.assertRaises(IOError, x.consume)
+
+    def test_append(self):
+        x = util.ReadOnlyByteStream(b'abc')
+        x.read(2)
+        x.append(b'def')
+
+        self.assertEqual(x.tell(), 2)
+        self.assertEqual(x.read(), b'cdef')
+
+    def test_get_read_stream(self):
+        x = util.get_read_stream(b'abc')
+
+        self.assertTrue(isinstance(x, util.BufferedByteStream))
+        self.assertEqual(x.read(), b'abc')
+
+        x = util.get_read_stream(None)
+        self.assertEqual(x.getvalue(), b'')
+
+        x = util.BufferedByteStream()
+        self.assertIdentical(util.get_read_stream(x), x)
+
+    def test_close(self):
+        buf = bytearray(b'abc')
+        x = util.ReadOnlyByteStream(buf)
+        x.close()
+
+        # the bytearray can be resized once the view is released
+        buf.extend(b'def')
+
+        self.assertEqual(len(x), 0)
+        self.assertRaises(IOError, x.read_uchar)
+
+    def test_mmap_stream(self):
+        fd, name = tempfile.mkstemp()
+        os.write(fd, b'\x06\x07foo')
+        os.close(fd)
+
+        try:
+            with util.mmap_stream(name) as stream:
+                self.assertEqual(stream.read(), b'\x06\x07foo')
+
+            self.assertRaises(ValueError, util.mmap_stream(object()).__enter__)
+        finally:
+            os.unlink(name)
+
+    def test_decode(self):
+        data = bytearray(b'\x02\x00\x05hello\x00?\xf0' + b'\x00' * 6)
+
+        self.assertEqual(
+            list(pyamf.decode(data, encoding=pyamf.AMF0)),
+            ['hello', 1.0]
+        )
+        self.assertEqual(
+            list(pyamf.decode(memoryview(b'\x06\x0bhello'),
+                              encoding=pyamf.AMF3)),
+            ['hello']
+        )
+
+
 class DummyAlias(pyamf.ClassAlias):
     pass
 
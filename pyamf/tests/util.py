@@ -130,6 +130,7 @@ class ClassCacheClearingTestCase(unittest.TestCase):
 
         pyamf.CLASS_CACHE = self._class_cache
         pyamf.CLASS_LOADERS = self._class_loaders
+        pyamf.TRAITS_CACHE.clear()
 
     def assertBuffer(self, first, second, msg=None):
         assert_buffer(self, first, second, msg)
@@ -225,6 +226,43 @@ class NullFileDescriptor(object):
         pass
 
 
+def load_module(name, modules):
+    """
+    Loads a private copy of the PyAMF module C{name} with C{modules} (a
+    C{dict} of module name to module) importable while it is being executed.
+    Used to test the gateways of frameworks that are not installed against
+    minimal stand-ins for the parts of the framework they use.
+
+    The copy is not added to C{sys.modules}.
+    """
+    import importlib.util
+    import sys
+
+    spec = importlib.util.find_spec(name)
+    copy_spec = importlib.util.spec_from_file_location(
+        '_test_' + name.replace('.', '_'),
+        spec.origin
+    )
+    module = importlib.util.module_from_spec(copy_spec)
+
+    saved = {}
+
+    for k, v in modules.items():
+        saved[k] = sys.modules.get(k, None)
+        sys.modules[k] = v
+
+    try:
+        copy_spec.loader.exec_module(module)
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                del sys.modules[k]
+            else:
+                sys.modules[k] = v
+
+    return module
+
+
 def get_fqcn(klass):
     return '%s.%s' % (klass.__module__, klass.__name__)
 
@@ -8,8 +8,10 @@ AMF Utilities.
 """
 
 import calendar
+import contextlib
 import datetime
 import inspect
+import mmap
 
 import pyamf
 from pyamf import python
@@ -19,9 +21,15 @@ try:
 except ImportError:
     from pyamf.util.pure import BufferedByteStream
 
+from pyamf.util import pure
+from pyamf.util.pure import ReadOnlyByteStream
+
 
 __all__ = [
     'BufferedByteStream',
+    'ReadOnlyByteStream',
+    'get_read_stream',
+    'mmap_stream',
     'get_timestamp',
     'get_datetime',
     'get_properties',
@@ -38,6 +46,76 @@ __all__ = [
 negative_timestamp_broken = False
 
 
+def get_read_stream(buf):
+    """
+    Returns a stream suitable for decoding C{buf}.
+
+    C{bytes} like objects are wrapped in a L{ReadOnlyByteStream} so that they
+    are not copied (the compiled decoders need a L{BufferedByteStream} so this
+    only happens when the pure Python version is in use). C{str} and C{None}
+    are handed to L{BufferedByteStream}, anything else is returned as is.
+
+    @since: 0.8.9
+    """
+    if isinstance(buf, python.buffer_types):
+        if BufferedByteStream is pure.BufferedByteStream:
+            return ReadOnlyByteStream(buf)
+
+        return BufferedByteStream(bytes(buf))
+
+    if buf is None or isinstance(buf, python.str_types):
+        return BufferedByteStream(buf)
+
+    return buf
+
+
+@contextlib.contextmanager
+def mmap_stream(name_or_file):
+    """
+    Memory maps a file and provides a read only stream over it, so that large
+    files can be decoded without reading them into memory first. The map (and
+    the file, if it was opened here) is closed when the block exits.
+
+    Usage::
+
+        with mmap_stream('traffic.amf') as stream:
+            decoder = pyamf.get_decoder(pyamf.AMF0, stream)
+
+    @param name_or_file: Name of file, or an open file object that supports
+        C{fileno}.
+    @since: 0.8.9
+    """
+    f = name_or_file
+    opened = False
+
+    if isinstance(name_or_file, str):
+        f = open(name_or_file, 'rb')
+        opened = True
+    elif not hasattr(f, 'fileno'):
+        raise ValueError('File like object with fileno expected')
+
+    try:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            buf = None
+
+        stream = get_read_stream(buf)
+
+        try:
+            yield stream
+        finally:
+            if isinstance(stream, ReadOnlyByteStream):
+                stream.close()
+
+            if buf is not None:
+                buf.close()
+    finally:
+        if opened:
+            f.close()
+
+
 def get_timestamp(d):
     """
     Returns a UTC timestamp for a C{datetime.datetime} object.
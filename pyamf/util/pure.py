@@ -66,6 +66,15 @@ class BytesIOProxy(object):
         """
         return self._buffer.getvalue()
 
+    def getbuffer(self):
+        """
+        Returns a C{memoryview} of the contents of the stream without copying
+        it. The view must be released before the stream is written to.
+
+        @since: 0.8.9
+        """
+        return self._buffer.getbuffer()
+
     def read(self, n=-1):
         """
         Reads C{n} bytes from the stream.
@@ -615,6 +624,267 @@ class BufferedByteStream(BytesIOProxy, DataTypeMixIn):
         return new
 
 
+class ReadOnlyByteStream(BufferedByteStream):
+    """
+    A read only L{BufferedByteStream} that reads directly from a C{bytes} like
+    object (C{bytes}, C{bytearray}, C{memoryview} or anything supporting the
+    buffer protocol) by keeping an offset into it.
+
+    Unlike L{BufferedByteStream}, the supplied buffer is not copied into a
+    C{BytesIO}. Reads return C{bytes} slices of the buffer and numbers are
+    unpacked in place.
+
+    Writing to the stream is not supported. L{append} is, but it will copy
+    the buffer.
+
+    @since: 0.8.9
+    """
+
+    def __init__(self, buf=None, min_buf_size=None):
+        """
+        @param buf: The data to read from.
+        @param min_buf_size: Ignored.
+        @raise TypeError: C{buf} does not support the buffer protocol.
+        """
+        if buf is None:
+            buf = b''
+
+        if isinstance(buf, bytes):
+            self._buffer = buf
+            self._view = memoryview(buf)
+        else:
+            try:
+                self._view = self._buffer = memoryview(buf).cast('B')
+            except TypeError:
+                raise TypeError("Unable to create a view of %r" % (buf,))
+
+        self._pos = 0
+        self._len = len(self._buffer)
+
+    def _slice(self, start, end):
+        data = self._buffer[start:end]
+
+        if type(data) is memoryview:
+            return data.tobytes()
+
+        return data
+
+    def _unpack(self, fmt, size):
+        pos = self._pos
+
+        if pos + size > self._len:
+            raise IOError("Tried to read %d byte(s) from the stream" % size)
+
+        self._pos = pos + size
+
+        return struct.unpack_from(self.endian + fmt, self._buffer, pos)[0]
+
+    def getvalue(self):
+        """
+        Get raw data from buffer.
+        """
+        return self._slice(0, self._len)
+
+    def getbuffer(self):
+        """
+        Returns a C{memoryview} of the underlying buffer. Releasing it does
+        not affect the stream.
+        """
+        return memoryview(self._buffer)
+
+    def read(self, length=-1):
+        """
+        Reads C{length} bytes from the stream.
+
+        @raise IOError: Attempted to read past the end of the buffer.
+        """
+        pos = self._pos
+
+        if length == -1:
+            if pos >= self._len:
+                raise IOError(
+                    'Attempted to read from the buffer but already at the '
+                    'end')
+
+            end = self._len
+        elif length < -1:
+            raise IOError('Cannot read backwards')
+        elif pos + length > self._len:
+            raise IOError(
+                'Attempted to read %d bytes from the buffer but only %d '
+                'remain' % (length, self._len - pos)
+            )
+        else:
+            end = pos + length
+
+        self._pos = end
+
+        return self._slice(pos, end)
+
+    def peek(self, size=1):
+        """
+        Looks C{size} bytes ahead in the stream, returning what it finds,
+        returning the stream pointer to its initial position.
+
+        @raise ValueError: Trying to peek backwards.
+        """
+        if size == -1:
+            return self._slice(self._pos, self._len)
+
+        if size < -1:
+            raise ValueError("Cannot peek backwards")
+
+        return self._slice(self._pos, min(self._pos + size, self._len))
+
+    def seek(self, pos, mode=0):
+        """
+        Sets the offset, measured from the beginning of this stream, at which
+        the next read operation will occur.
+        """
+        if mode == 1:
+            pos += self._pos
+        elif mode == 2:
+            pos += self._len
+
+        if pos < 0:
+            raise ValueError('negative seek value %d' % (pos,))
+
+        self._pos = pos
+
+        return pos
+
+    def tell(self):
+        """
+        Returns the position of the stream pointer.
+        """
+        return self._pos
+
+    def __len__(self):
+        return self._len
+
+    def write(self, s, size=None):
+        """
+        @raise IOError: The stream is read only.
+        """
+        raise IOError('Cannot write to a read only stream')
+
+    def truncate(self, size=0):
+        """
+        @raise IOError: The stream is read only.
+        """
+        raise IOError('Cannot truncate a read only stream')
+
+    def consume(self):
+        """
+        @raise IOError: The stream is read only.
+        """
+        raise IOError('Cannot consume a read only stream')
+
+    def append(self, data):
+        """
+        Append data to the end of the stream. The pointer will not move. This
+        copies the underlying buffer.
+        """
+        if hasattr(data, 'getvalue'):
+            data = data.getvalue()
+
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        self._buffer = self._slice(0, self._len) + bytes(data)
+        self._view = memoryview(self._buffer)
+        self._len = len(self._buffer)
+
+    def close(self):
+        """
+        Releases the underlying buffer. Required before closing an C{mmap}
+        that the stream reads from.
+        """
+        view, buf = self._view, self._buffer
+
+        self._buffer = b''
+        self._view = memoryview(self._buffer)
+        self._pos = self._len = 0
+
+        view.release()
+
+        if type(buf) is memoryview:
+            buf.release()
+
+    def read_uchar(self):
+        """
+        Reads an C{unsigned char} from the stream.
+        """
+        pos = self._pos
+
+        if pos >= self._len:
+            raise IOError("Tried to read 1 byte(s) from the stream")
+
+        self._pos = pos + 1
+
+        return self._buffer[pos]
+
+    def read_char(self):
+        """
+        Reads a C{char} from the stream.
+        """
+        return self._unpack('b', 1)
+
+    def read_ushort(self):
+        """
+        Reads a 2 byte unsigned integer from the stream.
+        """
+        return self._unpack('H', 2)
+
+    def read_short(self):
+        """
+        Reads a 2 byte integer from the stream.
+        """
+        return self._unpack('h', 2)
+
+    def read_ulong(self):
+        """
+        Reads a 4 byte unsigned integer from the stream.
+        """
+        return self._unpack('L', 4)
+
+    def read_long(self):
+        """
+        Reads a 4 byte integer from the stream.
+        """
+        return self._unpack('l', 4)
+
+    def read_double(self):
+        """
+        Reads an 8 byte float from the stream.
+        """
+        return self._unpack('d', 8)
+
+    def read_float(self):
+        """
+        Reads a 4 byte float from the stream.
+        """
+        return self._unpack('f', 4)
+
+    def read_utf8_string(self, length):
+        """
+        Reads a UTF-8 string from the stream, decoding it in place.
+
+        @rtype: C{unicode}
+        """
+        pos = self._pos
+
+        if pos + length > self._len:
+            raise IOError(
+                'Attempted to read %d bytes from the buffer but only %d '
+                'remain' % (length, self._len - pos)
+            )
+
+        self._pos = pos + length
+
+        return str(self._view[pos:pos + length], 'utf-8')
+
+
 def is_float_broken():
     """
     Older versions of Python (<=2.5) and the Windows platform are renowned for